@@ -0,0 +1,54 @@
+import copy
+import time
+
+from grafq import Field
+
+SIZES = (10, 100, 1_000, 10_000)
+ROUNDS = 20
+
+
+def tree(size: int) -> Field:
+    """A blueprint with ``size`` leaves, ten per inner field."""
+    root = Field("root")
+    for group in range(max(size // 10, 1)):
+        root.select(
+            Field(f"group{group}", first=10).select(
+                *(f"leaf{leaf}" for leaf in range(10))
+            )
+        )
+    return root
+
+
+def best_of(fn) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def modified(blueprint: Field):
+    # the typical per request tweak: one argument on one nested field
+    blueprint.select(Field("group0", first=20))
+
+
+def main():
+    print(
+        f"{'leaves':>7} {'deepcopy us':>12} {'clone us':>9} "
+        f"{'deepcopy+edit us':>17} {'clone+edit us':>14}"
+    )
+    for size in SIZES:
+        base = tree(size)
+        deep = best_of(lambda: copy.deepcopy(base))
+        cow = best_of(lambda: base.clone())
+        deep_edit = best_of(lambda: modified(copy.deepcopy(base)))
+        cow_edit = best_of(lambda: modified(base.clone()))
+        print(
+            f"{size:>7} {deep * 1e6:>12.1f} {cow * 1e6:>9.1f} "
+            f"{deep_edit * 1e6:>17.1f} {cow_edit * 1e6:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import time
+
+from grafq import Field, Query
+from grafq.parser import parse
+
+ROUNDS = 5
+
+TYPICAL = """
+query Search($query: String! = "grafq", $first: Int) {
+  search(query: $query, first: $first, filter: {state: OPEN, minStars: 10}) {
+    id
+    name
+    url
+    stargazerCount
+    owner {
+      ...OwnerFields
+      repositories(states: [OPEN, CLOSED]) @include(if: true) {
+        name
+        url
+      }
+    }
+  }
+}
+
+fragment OwnerFields on User {
+  id
+  login
+  name
+  avatarUrl(size: 200)
+}
+"""
+
+
+def large(size: int) -> str:
+    """A pretty printed document with ``size`` leaves, ten per field."""
+    return (
+        Query()
+        .select(
+            *(
+                Field(f"group{group}", first=10, names=["a", "b"]).select(
+                    *(f"leaf{leaf}" for leaf in range(10))
+                )
+                for group in range(size // 10)
+            )
+        )
+        .build()
+        .pretty()
+    )
+
+
+DOCUMENTS = {
+    "typical": TYPICAL,
+    "10k fields": large(10_000),
+    "100k fields": large(100_000),
+}
+
+
+def best_of(fn) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(
+        f"{'document':>12} {'KiB':>8} {'parse us':>11} {'MiB/s':>7} {'cached us':>10}"
+    )
+    for label, document in DOCUMENTS.items():
+        cold = best_of(lambda: parse.__wrapped__(document))
+        parse(document)
+        warm = best_of(lambda: parse(document))
+        print(
+            f"{label:>12} {len(document) / 1024:>8.1f} {cold * 1e6:>11.1f} "
+            f"{len(document) / cold / 2**20:>7.1f} {warm * 1e6:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
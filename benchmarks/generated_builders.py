@@ -0,0 +1,116 @@
+import json
+import time
+import types
+
+from grafq.codegen import generate
+from grafq.schema import Schema
+
+TYPES = 500
+FIELDS = 20
+ROUNDS = 5
+
+
+def ref(spec: str) -> dict:
+    if spec.endswith("!"):
+        return {"kind": "NON_NULL", "name": None, "ofType": ref(spec[:-1])}
+    kind = "SCALAR" if spec in ("Int", "String") else "OBJECT"
+    return {"kind": kind, "name": spec, "ofType": None}
+
+
+def field(name: str, spec: str, *args: str) -> dict:
+    return {
+        "name": name,
+        "description": None,
+        "args": [
+            {"name": arg, "description": None, "type": ref("Int"), "defaultValue": None}
+            for arg in args
+        ],
+        "type": ref(spec),
+        "isDeprecated": False,
+        "deprecationReason": None,
+    }
+
+
+def object_type(name: str, fields: list[dict]) -> dict:
+    return {"kind": "OBJECT", "name": name, "description": None, "fields": fields}
+
+
+def introspection() -> dict:
+    """A schema of ``TYPES`` objects, each with scalars and links to the next ones."""
+    types_ = [
+        object_type(
+            f"Type{index}",
+            [field(f"scalar{n}", "String") for n in range(FIELDS // 2)]
+            + [
+                field(f"link{n}", f"Type{(index + n + 1) % TYPES}!", "first")
+                for n in range(FIELDS // 2)
+            ],
+        )
+        for index in range(TYPES)
+    ]
+    query = object_type(
+        "Query", [field(f"root{index}", f"Type{index}") for index in range(TYPES)]
+    )
+    scalars = [
+        {"kind": "SCALAR", "name": name, "description": None}
+        for name in ("Int", "String")
+    ]
+    return {
+        "__schema": {
+            "queryType": {"name": "Query"},
+            "types": [query, *types_, *scalars],
+        }
+    }
+
+
+def traverse(root, depth: int = 3):
+    """Selects every scalar of a tree of linked fields, the typical builder usage."""
+    fields = []
+    for index in range(0, TYPES, 50):
+        pending = [(getattr(root, f"root{index}"), 0)]
+        while pending:
+            builder, level = pending.pop()
+            fields.append(builder.scalar0)
+            if level < depth:
+                for n in range(3):
+                    pending.append((getattr(builder, f"link{n}")(first=10), level + 1))
+    return fields
+
+
+def best_of(fn) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    spec = introspection()
+    # what Schema.load decodes
+    document = json.dumps(spec)
+    # importing a generated module runs its (cached) bytecode
+    code = compile(generate(Schema(introspection=spec)), "generated.py", "exec")
+
+    def load_generated():
+        module = types.ModuleType("generated")
+        exec(code, module.__dict__)
+        return module.root
+
+    schema_start = best_of(lambda: traverse(Schema(introspection=json.loads(document))))
+    generated_start = best_of(lambda: traverse(load_generated()))
+    schema = Schema(introspection=spec)
+    traverse(schema)
+    root = load_generated()
+    schema_warm = best_of(lambda: traverse(schema))
+    generated_warm = best_of(lambda: traverse(root))
+    print(f"{'builders':>10} {'startup+first use ms':>21} {'traversal ms':>13}")
+    print(f"{'schema':>10} {schema_start * 1e3:>21.1f} {schema_warm * 1e3:>13.1f}")
+    print(
+        f"{'generated':>10} {generated_start * 1e3:>21.1f} {generated_warm * 1e3:>13.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
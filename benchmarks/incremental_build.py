@@ -0,0 +1,52 @@
+import time
+
+from grafq import Field, Query
+
+SIZES = (100, 1_000, 10_000)
+ROUNDS = 20
+
+
+def blueprint(size: int) -> tuple[Query, Field]:
+    """A query with ``size`` leaves, ten per field, and the first of those fields."""
+    fields = [
+        Field(f"group{group}", first=10).select(*(f"leaf{leaf}" for leaf in range(10)))
+        for group in range(max(size // 10, 1))
+    ]
+    return Query().select(Field("root").select(*fields)), fields[0]
+
+
+def best_of(fn) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'leaves':>7} {'full build+render us':>21} {'rebuild+render us':>18}")
+    for size in SIZES:
+
+        def full():
+            query, _ = blueprint(size)
+            str(query.build())
+
+        query, first = blueprint(size)
+        str(query.build())
+        counter = iter(range(10**9))
+
+        def incremental():
+            # one argument changes between requests
+            first.arg("first", next(counter))
+            str(query.build())
+
+        # the full build includes creating the blueprint, measure that alone too
+        setup = best_of(lambda: blueprint(size))
+        cold = best_of(full) - setup
+        warm = best_of(incremental)
+        print(f"{size:>7} {cold * 1e6:>21.1f} {warm * 1e6:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
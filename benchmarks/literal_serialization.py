@@ -0,0 +1,57 @@
+import time
+from enum import Enum
+
+from grafq.language import Value
+
+SIZE = 100_000
+ROUNDS = 5
+
+
+class State(Enum):
+    OPEN = 1
+    CLOSED = 2
+
+
+def recursive(value) -> str:
+    """The previous serializer: recursive f-string formatting without escaping."""
+    if isinstance(value, str):
+        return f'"{value}"'
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, list):
+        return "[" + ", ".join(recursive(v) for v in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{k}: {recursive(v)}" for k, v in value.items()) + "}"
+    return str(value)
+
+
+PAYLOADS = {
+    "strings": [f"item-{i}" for i in range(SIZE)],
+    "ints": list(range(SIZE)),
+    "mixed": [i if i % 2 else f"item-{i}" for i in range(SIZE)],
+    "objects": [
+        {"id": i, "name": f"item-{i}", "tags": ["a", "b"], "state": State.OPEN}
+        for i in range(SIZE)
+    ],
+}
+
+
+def best_of(fn, value) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn(value)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'payload':>8} {'recursive ms':>13} {'encoder ms':>11} {'speedup':>8}")
+    for name, payload in PAYLOADS.items():
+        old = best_of(recursive, payload)
+        new = best_of(lambda value: str(Value(value)), payload)
+        print(f"{name:>8} {old * 1000:>13.1f} {new * 1000:>11.1f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import time
+
+from grafq import Query
+
+SIZES = (10_000, 100_000)
+ROUNDS = 3
+
+
+def paths(size: int) -> list[str]:
+    """``size`` generated paths, three levels deep, as produced from a field list."""
+    return [
+        f"root.group{index // 100}.item{index // 10 % 10}.leaf{index % 10}"
+        for index in range(size)
+    ]
+
+
+def best_of(fn) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'paths':>7} {'select ms':>10} {'select_paths ms':>16}")
+    for size in SIZES:
+        generated = paths(size)
+        one_by_one = best_of(lambda: Query().select(*generated))
+        bulk = best_of(lambda: Query().select_paths(generated))
+        print(f"{size:>7} {one_by_one * 1e3:>10.1f} {bulk * 1e3:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import json
+import time
+
+from grafq import Field, Query
+from grafq.language import ID
+from grafq.response import wrap
+from grafq.schema import Schema
+from tests.unit.introspection import INTROSPECTION
+
+SIZES = (1_000, 10_000, 100_000)
+ROUNDS = 5
+
+SCHEMA = Schema(introspection=INTROSPECTION)
+QUERY = (
+    Query(schema=SCHEMA)
+    .select(
+        Field("viewer").select(
+            "login", Field("repositories").select("id", "name", "url", "state")
+        )
+    )
+    .build()
+)
+
+
+def document(size: int) -> str:
+    repositories = [
+        {"id": f"r{index}", "name": f"repo{index}", "url": "https://x", "state": "OPEN"}
+        for index in range(size)
+    ]
+    return json.dumps({"viewer": {"login": "octocat", "repositories": repositories}})
+
+
+def convert_eagerly(data: dict) -> dict:
+    """Converts every ID up front, the way a typed response would without proxies."""
+    viewer = data["viewer"]
+    return {
+        "viewer": {
+            "login": viewer["login"],
+            "repositories": [
+                {**repository, "id": ID(repository["id"])}
+                for repository in viewer["repositories"]
+            ],
+        }
+    }
+
+
+def best_of(fn) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(
+        f"{'nodes':>7} {'decode ms':>10} {'eager ms':>9} "
+        f"{'lazy, 10 reads ms':>18} {'lazy, all reads ms':>19}"
+    )
+    for size in SIZES:
+        text = document(size)
+        decoded = json.loads(text)
+
+        def lazy_sample():
+            repositories = wrap(decoded, QUERY, SCHEMA).viewer.repositories
+            [repositories[index].id for index in range(10)]
+
+        def lazy_all():
+            for repository in wrap(decoded, QUERY, SCHEMA).viewer.repositories:
+                repository.id
+
+        decode = best_of(lambda: json.loads(text))
+        eager = best_of(lambda: convert_eagerly(decoded))
+        sample = best_of(lazy_sample)
+        full = best_of(lazy_all)
+        print(
+            f"{size:>7} {decode * 1e3:>10.2f} {eager * 1e3:>9.2f} "
+            f"{sample * 1e3:>18.3f} {full * 1e3:>19.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from grafq import Query
+from grafq.client import Client
+
+LATENCY = 0.02
+REQUESTS_PER_WORKER = 25
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(LATENCY)
+        body = json.dumps({"data": {"viewer": {"login": "octocat"}}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/graphql"
+    query = Query().select("viewer.login").build()
+
+    client = Client(url, thread_safe=True)
+    baseline = None
+    print(f"{'workers':>8} {'requests':>9} {'seconds':>8} {'req/s':>8} {'scaling':>8}")
+    for workers in (1, 2, 4, 8, 16, 32):
+        total = workers * REQUESTS_PER_WORKER
+        start = time.perf_counter()
+        with ThreadPoolExecutor(workers) as executor:
+            for _ in executor.map(lambda _: client.post(query), range(total)):
+                pass
+        elapsed = time.perf_counter() - start
+        throughput = total / elapsed
+        baseline = baseline or throughput
+        print(
+            f"{workers:>8} {total:>9} {elapsed:>8.2f} {throughput:>8.1f} "
+            f"{throughput / baseline:>7.2f}x"
+        )
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,9 @@
-from .blueprints import QueryBlueprint as Query, FieldBlueprint as Field
+from .blueprints import (
+    QueryBlueprint as Query,
+    FieldBlueprint as Field,
+    FragmentBlueprint as Fragment,
+    InlineFragmentBlueprint as InlineFragment,
+)
 from .language import (
     VarRef as Var,
     Null,
@@ -1,2 +1,3 @@
-from .field import FieldBlueprint, TypedFieldBlueprint
+from .field import FieldBlueprint, GeneratedFieldBlueprint, TypedFieldBlueprint
+from .fragment import FragmentBlueprint, InlineFragmentBlueprint
 from .query import QueryBlueprint
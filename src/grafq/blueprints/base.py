@@ -1,7 +1,92 @@
+from __future__ import annotations
+
+import weakref
 from abc import abstractmethod, ABC
+from collections.abc import Iterator
+from typing import Optional, TYPE_CHECKING, Union
+
+from grafq.language import Argument, Directive, Value, ValueRawType, VarRef
+
+if TYPE_CHECKING:
+    from grafq.language import FragmentDefinition, SelectionType
 
 
 class Blueprint(ABC):
+    """Builds an AST, cached until the blueprint or anything it selects changes.
+
+    Blueprints selecting another are registered as its dependents, so changes
+    only invalidate the path up to the roots and rebuilds reuse untouched subtrees.
+    Dependents are weakly referenced, so selecting a shared blueprint into many
+    short-lived queries doesn't keep those alive.
+    """
+
+    __slots__ = ("_cached", "_dependents", "__weakref__")
+
+    def __init__(self):
+        self._cached = None
+        self._dependents: weakref.WeakSet[Blueprint] = weakref.WeakSet()
+
+    def _invalidate(self):
+        pending = [self]
+        while pending:
+            blueprint = pending.pop()
+            # dependents are only built after what they select, so an empty cache
+            # means theirs are empty already
+            if blueprint._cached is not None:
+                blueprint._cached = None
+                pending.extend(blueprint._dependents)
+
     @abstractmethod
     def build(self):
         pass
+
+
+class FragmentSelection(Blueprint):
+    """Fragments, which can be selected alongside fields."""
+
+    @abstractmethod
+    def selection(self) -> SelectionType:
+        pass
+
+    @abstractmethod
+    def definitions(self) -> Iterator[FragmentDefinition]:
+        """Named fragment definitions this fragment depends on, itself included."""
+        pass
+
+
+class Directable:
+    """Selections that can be annotated with directives, such as ``@include``."""
+
+    __slots__ = ()
+    _directives: dict[str, dict[str, ValueRawType]]
+
+    def directive(self, name: str, **arguments: ValueRawType):
+        self._directives[name] = arguments
+        self._invalidate()
+        return self
+
+    def include(self, condition: Union[bool, VarRef]):
+        """Only selects this if the condition, usually a Boolean variable, holds."""
+        return self.directive("include", **{"if": _condition(condition)})
+
+    def skip(self, condition: Union[bool, VarRef]):
+        """Leaves this out if the condition, usually a Boolean variable, holds."""
+        return self.directive("skip", **{"if": _condition(condition)})
+
+    def _build_directives(self) -> Optional[list[Directive]]:
+        return [
+            Directive(
+                name,
+                [Argument(key, Value(value)) for key, value in arguments.items()]
+                or None,
+            )
+            for name, arguments in self._directives.items()
+        ] or None
+
+
+def _condition(condition: Union[bool, VarRef]) -> Union[bool, VarRef]:
+    if not isinstance(condition, (bool, VarRef)):
+        raise TypeError(
+            f"Directive condition must be a boolean or variable, got {type(condition)}"
+        )
+    return condition
@@ -1,2 +1,3 @@
 from .default import DefaultFieldBlueprint as FieldBlueprint
 from .typed import TypedFieldBlueprint
+from .generated import GeneratedFieldBlueprint
@@ -1,18 +1,25 @@
 from __future__ import annotations
 
-import copy
-from collections.abc import Iterable
-from typing import Optional, Union
+import functools
+import weakref
+from collections.abc import Callable, Iterable, Iterator
+from typing import Optional, TYPE_CHECKING, Union
 
-from grafq.blueprints.base import Blueprint
+from grafq.blueprints.base import Blueprint, Directable, FragmentSelection
 from grafq.language import (
     Argument,
     Value,
     Field,
+    FragmentDefinition,
     Selection,
     ValueRawType,
 )
 
+if TYPE_CHECKING:
+    from grafq.schema import Schema
+
+SelectionSpec = Union[str, "FieldBlueprint", FragmentSelection]
+
 
 def coerce(field: Union[str, FieldBlueprint]) -> FieldBlueprint:
     if isinstance(field, str):
@@ -32,51 +39,318 @@ def coerce(field: Union[str, FieldBlueprint]) -> FieldBlueprint:
         raise TypeError(f"Illegal type given to select: {type(field)}")
 
 
-class FieldBlueprint(Blueprint):
+def select_into(
+    children: dict[str, FieldBlueprint],
+    fragments: list[FragmentSelection],
+    specs: Iterable[SelectionSpec],
+    owner: Blueprint,
+) -> list[FieldBlueprint]:
+    """Adds fields and fragments to the selection of ``owner``, returning the new field blueprints."""
+    fields = []
+    for spec in specs:
+        if isinstance(spec, FragmentSelection):
+            if spec not in fragments:
+                fragments.append(spec)
+                spec._dependents.add(owner)
+        else:
+            fields.append(coerce(spec))
+    FieldBlueprint.combine(children, fields, owner)
+    owner._invalidate()
+    return fields
+
+
+def select_paths_into(
+    paths: Iterable[str],
+    root_child: Callable[[str], FieldBlueprint],
+    schema: Optional[Schema] = None,
+    root_type: Optional[str] = None,
+):
+    """Inserts dotted paths into a selection in one pass, walking it like a trie.
+
+    Nodes are resolved once per prefix, so sibling paths only cost a lookup for
+    their last field. With a schema, every field is checked to exist, starting
+    from ``root_type``.
+    """
+    resolved: dict[str, tuple[FieldBlueprint, Optional[str]]] = {}
+
+    def resolve(path: str) -> tuple[FieldBlueprint, Optional[str]]:
+        entry = resolved.get(path)
+        if entry is None:
+            prefix, _, name = path.rpartition(".")
+            parent, parent_type = resolve(prefix) if prefix else (None, root_type)
+            field_type = None
+            if schema is not None:
+                fields = schema.get_type_fields(parent_type) if parent_type else None
+                if not fields or name not in fields:
+                    raise TypeError(
+                        f"Field {name} does not exist on type {parent_type}"
+                    )
+                field_type = fields[name].type.core_type.name
+            node = parent._child(name) if parent is not None else root_child(name)
+            entry = resolved[path] = (node, field_type)
+        return entry
+
+    for path in paths:
+        resolve(path)
+
+
+def fragment_definitions(
+    children: Iterable[FieldBlueprint], fragments: Iterable[FragmentSelection]
+) -> Iterator[FragmentDefinition]:
+    for fragment in fragments:
+        yield from fragment.definitions()
+    for child in children:
+        yield from child.fragment_definitions()
+
+
+@functools.cache
+def _state(cls: type) -> tuple[str, ...]:
+    return tuple(
+        slot
+        for klass in cls.__mro__
+        for slot in klass.__dict__.get("__slots__", ())
+        if slot != "__weakref__"
+    )
+
+
+# bumped by every fork, so nodes modified since the last one can skip detaching
+_forks_made = 0
+
+
+class FieldBlueprint(Directable, Blueprint):
+    """A field and its selections, built into a Field AST.
+
+    Blueprints are copy-on-write: ``clone`` shares the whole tree with the original,
+    and nodes are copied lazily along the paths modified afterwards. A fork borrows
+    the containers of its ``_source`` until it's modified, then keeps the source's
+    children it hasn't modified as ``_lent``. A node modified in place first makes
+    its forks and those of its ancestors stop sharing it, so changes never leak
+    between copies, whichever references they're made through.
+    """
+
+    __slots__ = (
+        "_name",
+        "_arguments",
+        "_children",
+        "_alias",
+        "_parent",
+        "_fragments",
+        "_directives",
+        "_source",
+        "_forks",
+        "_lent",
+        "_owned_at",
+    )
+
     def __init__(self, name: str, parent: Optional[FieldBlueprint] = None):
+        super().__init__()
+        if parent is not None:
+            self._dependents.add(parent)
         self._name = name
         self._arguments: dict[str, ValueRawType] = {}
         self._children: dict[str, FieldBlueprint] = {}
         self._alias: Optional[str] = None
         self._parent: Optional[FieldBlueprint] = parent
+        self._fragments: list[FragmentSelection] = []
+        self._directives: dict[str, dict[str, ValueRawType]] = {}
+        self._source: Optional[FieldBlueprint] = None
+        self._forks: Optional[weakref.WeakSet[FieldBlueprint]] = None
+        self._lent: Optional[set[str]] = None
+        self._owned_at = _forks_made
+
+    def _own(self):
+        """Stops forks sharing the node or its containers before it's modified in place."""
+        if self._owned_at != _forks_made:
+            for parent in list(self._dependents):
+                if isinstance(parent, FieldBlueprint):
+                    parent._own()
+                    parent._recall(self)
+            for fork in list(self._forks or ()):
+                if fork._lent is None:
+                    fork._materialize()
+            if self._source is not None and self._lent is None:
+                self._materialize()
+            self._owned_at = _forks_made
+
+    def _materialize(self):
+        """Gives a borrowing fork its own containers, still holding the source's children."""
+        self._copy_containers()
+        self._lent = set(self._children)
+        if not self._lent:
+            self._detach()
+        for fragment in self._fragments:
+            fragment._dependents.add(self)
+
+    def _recall(self, child: FieldBlueprint):
+        """Replaces ``child`` with a copy in the forks it's lent to."""
+        for fork in list(self._forks or ()):
+            if fork._lent is None:
+                fork._materialize()
+            if fork._lent and child._name in fork._lent:
+                fork._unlend(child._name)
+
+    def _unlend(self, name: str):
+        child = self._children[name]
+        self._recall(child)
+        self._children[name] = child._fork(self)
+        self._lent.discard(name)
+        if not self._lent:
+            self._detach()
+
+    def _detach(self):
+        self._source._forks.discard(self)
+        self._source = self._lent = None
+
+    def _copy_containers(self):
+        self._arguments = dict(self._arguments)
+        self._children = dict(self._children)
+        self._fragments = list(self._fragments)
+        self._directives = dict(self._directives)
+
+    def _fork(self, owner: Optional[Blueprint]) -> FieldBlueprint:
+        global _forks_made
+        _forks_made += 1
+        cls = type(self)
+        fork = cls.__new__(cls)
+        for slot in _state(cls):
+            setattr(fork, slot, getattr(self, slot))
+        fork._parent = owner if isinstance(owner, FieldBlueprint) else None
+        fork._dependents = weakref.WeakSet()
+        if owner is not None:
+            fork._dependents.add(owner)
+            self._dependents.discard(owner)
+        # a node still borrowing can only lend what it borrowed
+        source = self if self._source is None or self._lent else self._source
+        if source._forks is None:
+            source._forks = weakref.WeakSet()
+        source._forks.add(fork)
+        fork._source = source
+        fork._forks = fork._lent = None
+        return fork
+
+    def _writable_child(self, name: str) -> FieldBlueprint:
+        self._own()
+        if self._lent and name in self._lent:
+            self._unlend(name)
+        return self._children[name]
+
+    def _child(self, name: str) -> FieldBlueprint:
+        """The child selecting ``name``, created if missing, ready to be modified."""
+        if name in self._children:
+            return self._writable_child(name)
+        child = self._new_child(name)
+        self._own()
+        self._children[name] = child
+        child._dependents.add(self)
+        self._invalidate()
+        return child
+
+    def _new_child(self, name: str) -> FieldBlueprint:
+        return FieldBlueprint(name)
 
     def arg(self, name: str, value: ValueRawType) -> FieldBlueprint:
+        self._own()
         self._arguments[name] = value
+        self._invalidate()
         return self
 
+    def directive(self, name: str, **arguments: ValueRawType) -> FieldBlueprint:
+        self._own()
+        return super().directive(name, **arguments)
+
     @staticmethod
-    def combine(original: dict[str, FieldBlueprint], new: Iterable[FieldBlueprint]):
+    def combine(
+        original: dict[str, FieldBlueprint],
+        new: Iterable[FieldBlueprint],
+        owner: Optional[Blueprint] = None,
+    ):
         for blueprint in new:
             if original_blueprint := original.get(blueprint._name):
+                if isinstance(owner, FieldBlueprint):
+                    original_blueprint = owner._writable_child(blueprint._name)
+                original_blueprint._own()
                 original_blueprint._arguments |= blueprint._arguments
+                original_blueprint._directives |= blueprint._directives
                 FieldBlueprint.combine(
-                    original_blueprint._children, blueprint._children.values()
+                    original_blueprint._children,
+                    blueprint._children.values(),
+                    original_blueprint,
                 )
                 original_blueprint._alias = (
                     blueprint._alias or original_blueprint._alias
                 )
+                for fragment in blueprint._fragments:
+                    if fragment not in original_blueprint._fragments:
+                        original_blueprint._fragments.append(fragment)
+                        fragment._dependents.add(original_blueprint)
+                original_blueprint._invalidate()
             else:
                 original[blueprint._name] = blueprint
+                if owner is not None:
+                    blueprint._dependents.add(owner)
 
-    def select(self, *specs: Union[str, FieldBlueprint]) -> FieldBlueprint:
-        FieldBlueprint.combine(self._children, (coerce(spec) for spec in specs))
+    def select(self, *specs: SelectionSpec) -> FieldBlueprint:
+        self._own()
+        select_into(self._children, self._fragments, specs, self)
+        return self
+
+    def select_paths(self, paths: Iterable[str]) -> FieldBlueprint:
+        """Selects many dotted paths at once, much faster than ``select`` for large batches."""
+        select_paths_into(paths, self._child)
         return self
 
     def alias(self, alias: str) -> FieldBlueprint:
+        self._own()
         self._alias = alias
+        self._invalidate()
         return self
 
+    def _build(self) -> tuple[Field, tuple[FragmentDefinition, ...]]:
+        if self._cached is None:
+            self._cached = (
+                Field(
+                    self._name,
+                    self._alias,
+                    [
+                        Argument(name, Value(value))
+                        for name, value in self._arguments.items()
+                    ]
+                    or None,
+                    [Selection(child.build()) for child in self._children.values()]
+                    + [fragment.selection() for fragment in self._fragments]
+                    or None,
+                    self._build_directives(),
+                ),
+                tuple(fragment_definitions(self._children.values(), self._fragments)),
+            )
+        return self._cached
+
     def build(self) -> Field:
-        return Field(
-            self._name,
-            self._alias,
-            [Argument(name, Value(value)) for name, value in self._arguments.items()]
-            or None,
-            [Selection(child.build()) for child in self._children.values()] or None,
-        )
+        return self._build()[0]
+
+    def fragment_definitions(self) -> Iterator[FragmentDefinition]:
+        return iter(self._build()[1])
 
     def clone(self) -> FieldBlueprint:
-        return copy.deepcopy(self)
+        """Copies the blueprint in constant time, sharing structure until either side changes.
+
+        Cloning a nested blueprint copies the path from its root, so the clone keeps
+        its ancestors.
+        """
+        path = []
+        node = self
+        while (
+            node._parent is not None and node._parent._children.get(node._name) is node
+        ):
+            path.append(node._name)
+            node = node._parent
+        if node._parent is not None:
+            # not reachable from its parent, so it can only be copied on its own
+            return self._fork(None)
+        clone = node._fork(None)
+        for name in reversed(path):
+            clone = clone._writable_child(name)
+        return clone
 
     def root(self) -> FieldBlueprint:
         node = self
@@ -7,6 +7,8 @@ from .base import FieldBlueprint
 
 
 class DefaultFieldBlueprint(FieldBlueprint):
+    __slots__ = ()
+
     def __init__(self, field_name: str, **kwargs: ValueRawType):
         super().__init__(field_name)
         self._arguments = kwargs
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from typing import NamedTuple, Optional, Union
+
+from grafq.language import ValueRawType, VarRef
+from grafq.validation import ValidatorCache, compile_input_validator
+from .base import FieldBlueprint
+
+# kind of every input type, with the names of enum values or the (name, type,
+# default value) of input object fields
+InputTypes = dict[str, Union[tuple[str], tuple[str, tuple]]]
+
+
+class EnumChoice(NamedTuple):
+    name: str
+
+
+class InputField(NamedTuple):
+    name: str
+    type: InputType
+    default_value: Optional[str]
+
+
+class InputType:
+    """Stands in for ``SchemaType`` in validators, over precomputed input types."""
+
+    __slots__ = ("kind", "name", "of_type", "core_type", "_types", "_signature")
+
+    def __init__(self, signature: str, types: InputTypes):
+        self._signature = signature
+        self._types = types
+        self.of_type: Optional[InputType] = None
+        self.name: Optional[str] = None
+        if signature.endswith("!"):
+            self.kind = "NON_NULL"
+            self.of_type = InputType(signature[:-1], types)
+        elif signature.startswith("["):
+            self.kind = "LIST"
+            self.of_type = InputType(signature[1:-1], types)
+        else:
+            self.kind = types[signature][0]
+            self.name = signature
+        self.core_type = self.of_type.core_type if self.of_type else self
+
+    @property
+    def enum_values(self) -> Optional[list[EnumChoice]]:
+        if self.kind != "ENUM":
+            return None
+        return [EnumChoice(name) for name in self._types[self.name][1]]
+
+    @property
+    def input_fields(self) -> Optional[list[InputField]]:
+        if self.kind != "INPUT_OBJECT":
+            return None
+        return [
+            InputField(name, InputType(signature, self._types), default_value)
+            for name, signature, default_value in self._types[self.name][1]
+        ]
+
+    def __str__(self) -> str:
+        return self._signature
+
+
+class FieldSpec(NamedTuple):
+    type: str
+    builder: type[GeneratedFieldBlueprint]
+    # argument names and their type signatures
+    arguments: dict[str, str]
+
+
+class GeneratedFieldBlueprint(FieldBlueprint):
+    """Base of the builders emitted by ``grafq.codegen``, one subclass per type.
+
+    Fields, arguments and input types are class attributes precomputed from the
+    schema, so selecting and validating never consults one.
+    """
+
+    __slots__ = ("_spec", "_var_types")
+
+    _type_name = ""
+    _fields: dict[str, FieldSpec] = {}
+    _input_types: InputTypes = {}
+    _strict = False
+    _validators: ValidatorCache = {}
+
+    def __init__(
+        self,
+        name: str,
+        spec: FieldSpec,
+        parent: Optional[GeneratedFieldBlueprint] = None,
+    ):
+        super().__init__(name, parent=parent)
+        self._spec = spec
+        self._var_types: dict[VarRef, tuple[str, InputType]] = {}
+
+    @classmethod
+    def _root_field(cls, name: str) -> GeneratedFieldBlueprint:
+        spec = cls._fields[name]
+        return spec.builder(name, spec)
+
+    def _copy_containers(self):
+        super()._copy_containers()
+        self._var_types = dict(self._var_types)
+
+    def _new_child(self, name: str) -> FieldBlueprint:
+        spec = self._fields.get(name)
+        if spec is None:
+            raise TypeError(f"Field {name} does not exist on type {self._type_name}")
+        return spec.builder(name, spec, parent=self)
+
+    def get_name(self) -> str:
+        return self._name
+
+    def get_variable_types(self) -> dict[VarRef, tuple[str, InputType]]:
+        return self._var_types
+
+    def __call__(self, **kwargs: ValueRawType) -> GeneratedFieldBlueprint:
+        supported_args = self._spec.arguments
+        if not supported_args:
+            raise TypeError(f"Field {self._name} does not support arguments")
+        self._own()
+        self._invalidate()
+        for name, value in kwargs.items():
+            if name not in supported_args:
+                raise TypeError(f"Invalid argument {name} for field {self._name}")
+            arg_type = InputType(supported_args[name], self._input_types)
+            if isinstance(value, VarRef):
+                # checked by QueryBlueprint, which knows the variable types
+                self._var_types[value] = (name, arg_type)
+                self._arguments[name] = value
+            elif compile_input_validator(arg_type, self._strict, self._validators)(
+                value
+            ):
+                self._arguments[name] = value
+            else:
+                raise TypeError(
+                    f"Invalid argument type for {name} at field {self._name}"
+                )
+        return self
+
+    def __getitem__(self, name: str) -> FieldBlueprint:
+        if not isinstance(name, str):
+            raise TypeError("key must be a string")
+        if name not in self._children and name not in self._fields:
+            raise KeyError(name)
+        return self._child(name)
+
+
+class GeneratedRoot:
+    """Base of the generated entry point, whose properties start new root fields."""
+
+    __slots__ = ()
+
+    _type: type[GeneratedFieldBlueprint]
+
+    def __getitem__(self, name: str) -> GeneratedFieldBlueprint:
+        if not isinstance(name, str):
+            raise TypeError("key must be a string")
+        return self._type._root_field(name)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import Optional
+
+from grafq.blueprints.base import Directable, FragmentSelection
+from grafq.blueprints.field.base import (
+    FieldBlueprint,
+    SelectionSpec,
+    fragment_definitions,
+    select_into,
+)
+from grafq.language import (
+    FragmentDefinition,
+    FragmentSpread,
+    InlineFragment,
+    Selection,
+    ValueRawType,
+)
+
+
+class FragmentBlueprint(Directable, FragmentSelection):
+    """Named fragment, selected as a spread and defined once per query.
+
+    Directives apply to every spread of the fragment, not to its definition.
+    """
+
+    def __init__(self, name: str, on: str):
+        super().__init__()
+        self._name = name
+        self._type_condition = on
+        self._children: dict[str, FieldBlueprint] = {}
+        self._fragments: list[FragmentSelection] = []
+        self._directives: dict[str, dict[str, ValueRawType]] = {}
+
+    def select(self, *specs: SelectionSpec) -> FragmentBlueprint:
+        select_into(self._children, self._fragments, specs, self)
+        return self
+
+    def _build(self) -> tuple[FragmentDefinition, ...]:
+        if self._cached is None:
+            definition = FragmentDefinition(
+                self._name,
+                self._type_condition,
+                [Selection(child.build()) for child in self._children.values()]
+                + [fragment.selection() for fragment in self._fragments],
+            )
+            self._cached = (
+                definition,
+                *fragment_definitions(self._children.values(), self._fragments),
+            )
+        return self._cached
+
+    def build(self) -> FragmentDefinition:
+        return self._build()[0]
+
+    def selection(self) -> FragmentSpread:
+        return FragmentSpread(self._name, self._build_directives())
+
+    def definitions(self) -> Iterator[FragmentDefinition]:
+        return iter(self._build())
+
+
+class InlineFragmentBlueprint(Directable, FragmentSelection):
+    """Anonymous fragment, e.g. to select fields of a subtype or toggle a group of fields."""
+
+    def __init__(self, on: Optional[str] = None):
+        super().__init__()
+        self._type_condition = on
+        self._children: dict[str, FieldBlueprint] = {}
+        self._fragments: list[FragmentSelection] = []
+        self._directives: dict[str, dict[str, ValueRawType]] = {}
+
+    def select(self, *specs: SelectionSpec) -> InlineFragmentBlueprint:
+        select_into(self._children, self._fragments, specs, self)
+        return self
+
+    def _build(self) -> tuple[InlineFragment, tuple[FragmentDefinition, ...]]:
+        if self._cached is None:
+            self._cached = (
+                InlineFragment(
+                    [Selection(child.build()) for child in self._children.values()]
+                    + [fragment.selection() for fragment in self._fragments],
+                    self._type_condition,
+                    self._build_directives(),
+                ),
+                tuple(fragment_definitions(self._children.values(), self._fragments)),
+            )
+        return self._cached
+
+    def build(self) -> InlineFragment:
+        return self._build()[0]
+
+    def selection(self) -> InlineFragment:
+        return self.build()
+
+    def definitions(self) -> Iterator[FragmentDefinition]:
+        return iter(self._build()[1])
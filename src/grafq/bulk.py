@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import dataclasses
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from typing import Optional, TypeVar, Union
+
+from grafq.concurrency import AdaptiveLimiter
+from grafq.errors import OperationErrors
+from grafq.fragments import expand_fragments, response_keys
+from grafq.language import (
+    Argument,
+    Directive,
+    Field,
+    InlineFragment,
+    Query,
+    Selection,
+    SelectionType,
+    Value,
+    ValueRawType,
+    VariableDefinition,
+    VarRef,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class BulkResult:
+    index: int
+    variables: Optional[dict[str, ValueRawType]]
+    data: Optional[dict] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _limited(
+    fn: Callable[[T], R],
+    limiter: AdaptiveLimiter,
+    failed: Optional[Callable[[R], bool]],
+) -> Callable[[T], R]:
+    def run(task: T) -> R:
+        started = time.monotonic()
+        try:
+            result = fn(task)
+        except Exception:
+            limiter.observe(time.monotonic() - started, False, started)
+            raise
+        ok = failed is None or not failed(result)
+        limiter.observe(time.monotonic() - started, ok, started)
+        return result
+
+    return run
+
+
+def dispatch(
+    tasks: Iterable[T],
+    fn: Callable[[T], R],
+    concurrency: Union[int, AdaptiveLimiter],
+    failed: Optional[Callable[[R], bool]] = None,
+    ordered: bool = False,
+) -> Iterator[R]:
+    """Runs ``fn`` over ``tasks`` in a thread pool, yielding results as they complete.
+
+    Tasks are pulled lazily, so at most a couple of tasks per worker are pending at
+    any time and arbitrarily long iterables can be streamed. Given an
+    AdaptiveLimiter, the number of running tasks follows its current limit instead,
+    fed with each task's latency and whether it raised or its result is ``failed``.
+
+    With ``ordered``, results are yielded in the order of their tasks. Results
+    finished early are held back, but no more than a few per worker: past that,
+    no new tasks start until the oldest one finishes.
+    """
+    if isinstance(concurrency, AdaptiveLimiter):
+        limiter = concurrency
+        fn = _limited(fn, limiter, failed)
+        workers = limiter.max_limit
+    else:
+        limiter = None
+        workers = concurrency
+    executor = ThreadPoolExecutor(max_workers=workers)
+    window = 4 * workers
+    pending: set[Future] = set()
+    # every future not yielded yet, in the order of their tasks
+    submitted: deque[Future] = deque()
+
+    def wait_for_any() -> Iterator[R]:
+        nonlocal pending
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        if not ordered:
+            for future in done:
+                yield future.result()
+        while submitted and submitted[0].done():
+            yield submitted.popleft().result()
+
+    try:
+        for task in tasks:
+            future = executor.submit(fn, task)
+            pending.add(future)
+            if ordered:
+                submitted.append(future)
+            while (
+                len(pending)
+                >= (limiter.limit if limiter is not None else 2 * concurrency)
+                or len(submitted) >= window
+            ):
+                yield from wait_for_any()
+        while pending:
+            yield from wait_for_any()
+        while submitted:
+            yield submitted.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _rename_value(value: ValueRawType, suffix: str) -> ValueRawType:
+    if isinstance(value, VarRef):
+        return VarRef(value.name + suffix)
+    if isinstance(value, list):
+        return [_rename_value(item, suffix) for item in value]
+    if isinstance(value, dict):
+        return {key: _rename_value(item, suffix) for key, item in value.items()}
+    return value
+
+
+def _rename_arguments(
+    arguments: Optional[list[Argument]], suffix: str
+) -> Optional[list[Argument]]:
+    if not arguments:
+        return arguments
+    return [
+        Argument(argument.name, Value(_rename_value(argument.value.inner, suffix)))
+        for argument in arguments
+    ]
+
+
+def _rename_directives(
+    directives: Optional[list[Directive]], suffix: str
+) -> Optional[list[Directive]]:
+    if not directives:
+        return directives
+    return [
+        Directive(directive.name, _rename_arguments(directive.arguments, suffix))
+        for directive in directives
+    ]
+
+
+def _rename_field(field: Field, suffix: str) -> Field:
+    return dataclasses.replace(
+        field,
+        arguments=_rename_arguments(field.arguments, suffix),
+        directives=_rename_directives(field.directives, suffix),
+        selection_set=(
+            _rename_selections(field.selection_set, suffix)
+            if field.selection_set
+            else field.selection_set
+        ),
+    )
+
+
+def _rename_selections(
+    selections: list[SelectionType], suffix: str, index: Optional[int] = None
+) -> list[SelectionType]:
+    # given the copy's index, fields are also aliased as root fields of that copy
+    result = []
+    for selection in selections:
+        if isinstance(selection, InlineFragment):
+            result.append(
+                dataclasses.replace(
+                    selection,
+                    selection_set=_rename_selections(
+                        selection.selection_set, suffix, index
+                    ),
+                    directives=_rename_directives(selection.directives, suffix),
+                )
+            )
+            continue
+        field = _rename_field(selection.field, suffix)
+        if index is not None:
+            field = dataclasses.replace(
+                field, alias=batch_alias(index, field.alias or field.name)
+            )
+        result.append(Selection(field))
+    return result
+
+
+def batch_alias(index: int, key: str) -> str:
+    return f"b{index}_{key}"
+
+
+def batch_query(query: Query, size: int) -> Query:
+    """Folds ``size`` copies of a query into one, aliasing root fields and variables per copy.
+
+    Fragments are inlined, as their variables differ between copies.
+    """
+    query = expand_fragments(query)
+    selection_set = []
+    variable_definitions = []
+    for index in range(size):
+        suffix = f"_{index}"
+        selection_set.extend(_rename_selections(query.selection_set, suffix, index))
+        variable_definitions.extend(
+            VariableDefinition(
+                definition.name + suffix, definition.type, definition.default_value
+            )
+            for definition in query.variable_definitions or ()
+        )
+    return Query(
+        selection_set=selection_set,
+        name=query.name,
+        variable_definitions=variable_definitions,
+        shorthand=query.shorthand,
+        client=query.client,
+    )
+
+
+def batch_variables(
+    chunk: list[tuple[int, Optional[dict[str, ValueRawType]]]],
+) -> dict[str, ValueRawType]:
+    return {
+        f"{name}_{position}": value
+        for position, (_, variables) in enumerate(chunk)
+        for name, value in (variables or {}).items()
+    }
+
+
+def split_batch(
+    query: Query,
+    chunk: list[tuple[int, Optional[dict[str, ValueRawType]]]],
+    decoded: dict,
+) -> list[BulkResult]:
+    data = decoded.get("data") or {}
+    keys = list(dict.fromkeys(response_keys(expand_fragments(query).selection_set)))
+    errors_by_position: dict[int, list[dict]] = {}
+    for error in decoded.get("errors") or ():
+        path = error.get("path")
+        positions = range(len(chunk))
+        if path:
+            prefix = str(path[0]).split("_", 1)[0]
+            if prefix.startswith("b") and prefix[1:].isdigit():
+                position = int(prefix[1:])
+                error = {**error, "path": [path[0].split("_", 1)[1], *path[1:]]}
+                positions = (position,)
+        for position in positions:
+            errors_by_position.setdefault(position, []).append(error)
+    results = []
+    for position, (index, variables) in enumerate(chunk):
+        if errors := errors_by_position.get(position):
+            results.append(BulkResult(index, variables, error=OperationErrors(errors)))
+        else:
+            results.append(
+                BulkResult(
+                    index,
+                    variables,
+                    data={key: data.get(batch_alias(position, key)) for key in keys},
+                )
+            )
+    return results
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from grafq.language import ValueRawType
+
+
+def cache_key(document: str, variables: Optional[dict[str, ValueRawType]]) -> str:
+    """Stable hash of a rendered document and its variables, regardless of key order."""
+    canonical = json.dumps(
+        variables or {}, sort_keys=True, separators=(",", ":"), default=str
+    )
+    digest = hashlib.sha256(document.encode())
+    digest.update(b"\0")
+    digest.update(canonical.encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class SQLiteCacheBackend:
+    """Persistent cache tier, shared between processes using the same database file."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def get(self, key: str, now: float) -> Optional[tuple[dict, float]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires = row
+        if expires <= now:
+            self.delete(key)
+            return None
+        return json.loads(value), expires
+
+    def set(self, key: str, value: dict, expires: float):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires),
+            )
+
+    def delete(self, key: str):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses")
+
+    def close(self):
+        self._connection.close()
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of decoded responses with per-entry expiry.
+
+    Cached data is shared between hits, so callers must not mutate it. TTLs can be
+    overridden per operation name through ``set_ttl``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 60.0,
+        backend: Optional[SQLiteCacheBackend] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._ttls: dict[str, float] = {}
+        self._backend = backend
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+    def set_ttl(self, operation_name: str, ttl: float):
+        self._ttls[operation_name] = ttl
+
+    def ttl_for(self, operation_name: Optional[str]) -> float:
+        return self._ttls.get(operation_name, self._ttl)
+
+    def get(self, key: str) -> Optional[dict]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return entry[0]
+                del self._entries[key]
+                self.stats.expirations += 1
+        if self._backend is not None and (entry := self._backend.get(key, now)):
+            with self._lock:
+                self._store(key, entry)
+                self.stats.hits += 1
+            return entry[0]
+        with self._lock:
+            self.stats.misses += 1
+        return None
+
+    def set(self, key: str, value: dict, ttl: Optional[float] = None):
+        expires = self._clock() + (self._ttl if ttl is None else ttl)
+        with self._lock:
+            self._store(key, (value, expires))
+        if self._backend is not None:
+            self._backend.set(key, value, expires)
+
+    def _store(self, key: str, entry: tuple[dict, float]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self._backend is not None:
+            self._backend.delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self._backend is not None:
+            self._backend.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
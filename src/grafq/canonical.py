@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+from typing import Optional
+
+from grafq.language import (
+    Argument,
+    Directive,
+    Field,
+    FragmentSpread,
+    InlineFragment,
+    Query,
+    Selection,
+    SelectionType,
+    Value,
+    ValueRawType,
+)
+
+
+def _canonical_value(value: ValueRawType) -> ValueRawType:
+    if isinstance(value, Value):
+        return Value(_canonical_value(value.inner))
+    if isinstance(value, list):
+        return [_canonical_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _canonical_value(value[key]) for key in sorted(value)}
+    return value
+
+
+def _canonical_arguments(arguments: Optional[list[Argument]]) -> list[Argument]:
+    return sorted(
+        (
+            Argument(argument.name, Value(_canonical_value(argument.value.inner)))
+            for argument in arguments or ()
+        ),
+        key=lambda argument: argument.name,
+    )
+
+
+def _canonical_directives(directives: Optional[list[Directive]]) -> list[Directive]:
+    # repeating a directive is invalid, so sorting by name never reorders repeats
+    return sorted(
+        (
+            Directive(directive.name, _canonical_arguments(directive.arguments) or None)
+            for directive in directives or ()
+        ),
+        key=lambda directive: directive.name,
+    )
+
+
+def _canonical_selections(selections: list[SelectionType]) -> list[SelectionType]:
+    # fields sharing a response key, name and arguments are the same field, their
+    # selections are merged; anything else is kept apart for the server to reject.
+    # Fragment spreads follow the fields, then inline fragments merged per type
+    merged: dict[tuple[str, str, str, str], Field] = {}
+    spreads: dict[tuple[str, str], FragmentSpread] = {}
+    inline: dict[tuple[str, str], InlineFragment] = {}
+    for selection in selections:
+        if isinstance(selection, FragmentSpread):
+            directives = _canonical_directives(selection.directives)
+            key = (selection.name, ",".join(map(str, directives)))
+            spreads[key] = FragmentSpread(selection.name, directives or None)
+            continue
+        if isinstance(selection, InlineFragment):
+            directives = _canonical_directives(selection.directives)
+            key = (selection.type_condition or "", ",".join(map(str, directives)))
+            existing = inline.get(key)
+            inline[key] = InlineFragment(
+                (existing.selection_set if existing else []) + selection.selection_set,
+                selection.type_condition,
+                directives or None,
+            )
+            continue
+        field = selection.field
+        arguments = _canonical_arguments(field.arguments)
+        directives = _canonical_directives(field.directives)
+        key = (
+            field.alias or field.name,
+            field.name,
+            ",".join(str(argument) for argument in arguments),
+            ",".join(str(directive) for directive in directives),
+        )
+        existing = merged.get(key)
+        children = list(field.selection_set or ())
+        if existing is not None:
+            children = list(existing.selection_set or ()) + children
+        merged[key] = Field(
+            field.name,
+            alias=field.alias if field.alias != field.name else None,
+            arguments=arguments or None,
+            selection_set=children or None,
+            directives=directives or None,
+        )
+    return [
+        *(
+            Selection(
+                dataclasses.replace(
+                    field,
+                    selection_set=(
+                        _canonical_selections(field.selection_set)
+                        if field.selection_set
+                        else None
+                    ),
+                )
+            )
+            for _, field in sorted(merged.items(), key=lambda item: item[0])
+        ),
+        *(spread for _, spread in sorted(spreads.items(), key=lambda item: item[0])),
+        *(
+            dataclasses.replace(
+                fragment, selection_set=_canonical_selections(fragment.selection_set)
+            )
+            for _, fragment in sorted(inline.items(), key=lambda item: item[0])
+        ),
+    ]
+
+
+def canonicalize(query: Query) -> Query:
+    """Rewrites a query in a deterministic form, without changing its meaning.
+
+    Fields are sorted by response key, arguments, input object keys, variable
+    definitions and fragments by name, and duplicate fields are merged. Queries
+    selecting the same data in a different order canonicalize to the same document.
+    """
+    return dataclasses.replace(
+        query,
+        selection_set=_canonical_selections(query.selection_set),
+        fragments=(
+            sorted(
+                (
+                    dataclasses.replace(
+                        definition,
+                        selection_set=_canonical_selections(definition.selection_set),
+                    )
+                    for definition in query.fragments
+                ),
+                key=lambda definition: definition.name,
+            )
+            if query.fragments
+            else query.fragments
+        ),
+        variable_definitions=(
+            sorted(
+                (
+                    (
+                        dataclasses.replace(
+                            definition,
+                            default_value=_canonical_value(definition.default_value),
+                        )
+                        if definition.default_value is not None
+                        else definition
+                    )
+                    for definition in query.variable_definitions
+                ),
+                key=lambda definition: definition.name,
+            )
+            if query.variable_definitions
+            else query.variable_definitions
+        ),
+    )
+
+
+def fingerprint(query: Query) -> str:
+    """Stable sha256 of a query's canonical document, usable as a cache key."""
+    return hashlib.sha256(str(canonicalize(query)).encode()).hexdigest()
@@ -1,51 +1,707 @@
-from json import JSONDecodeError
-from typing import Optional
+import functools
+import hashlib
+import json
+import threading
+import time
+import weakref
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional, Union
+from urllib.parse import urlencode
 
 import requests
 
 from grafq.blueprints.query import QueryBlueprint
-from grafq.errors import OperationErrors, RemoteError
+from grafq.bulk import (
+    BulkResult,
+    batch_query,
+    batch_variables,
+    chunked,
+    dispatch,
+    split_batch,
+)
+from grafq.cache import ResponseCache, cache_key
+from grafq.canonical import canonicalize
+from grafq.concurrency import AdaptiveLimiter
+from grafq.normalized import NormalizedCache
+from grafq.partial import PartialResult
+from grafq.response import ResponseObject, wrap
+from grafq.singleflight import SingleFlight
+from grafq.errors import DeadlineExceeded, OperationErrors, RemoteError
+from grafq.fragments import expand_fragments, response_keys
+from grafq.hedging import HedgePolicy
+from grafq.httpcache import HTTPCache
+from grafq.instrumentation import (
+    Hook,
+    Instrumentation,
+    OperationTimings,
+    is_introspecting,
+)
 from grafq.language import Query, ValueRawType
 from grafq.schema import Schema
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class _ThreadSession:
+    """Holds the session of a thread, which is closed once the thread is gone."""
+
+    __slots__ = ("session", "__weakref__")
+
+    def __init__(self, session: requests.Session):
+        self.session = session
+
 
 class Client:
-    def __init__(self, url: str, token: Optional[str] = None):
+    """GraphQL client over HTTP.
+
+    With ``thread_safe=True`` every thread gets its own ``requests.Session`` (sessions
+    are not guaranteed to be thread-safe), so one client can be shared by a thread
+    pool. ``run_many`` makes the client thread safe too, as it runs requests from a
+    pool of its own. Lazy schema initialization is always locked, so concurrent
+    callers of ``schema()`` trigger a single introspection.
+
+    ``timeout`` is the default deadline in seconds for each ``get``/``post`` call;
+    whatever remains of it is passed to the transport. With a ``hedge`` policy, a
+    duplicate request is sent when the first one is slower than the policy's delay,
+    and the first response wins. grafq only builds queries, which are safe to repeat.
+    Hedging runs requests on a thread pool, so it implies per-thread sessions.
+
+    ``execute`` sends queries as GET when the URL stays under ``max_url_length``, so
+    CDNs can cache them, and as POST otherwise. With ``persisted_queries``, documents
+    are sent as Apollo-style sha256 hashes and only uploaded when the server doesn't
+    know them yet. An ``http_cache`` honours ``Cache-Control`` and revalidates GET
+    responses with ``If-None-Match``.
+
+    With ``canonical=True`` documents are canonicalized before being sent, so
+    equivalent queries share server-side, persisted query and response cache entries.
+    With ``response_objects=True``, ``get``, ``post`` and ``execute`` return lazy
+    ``ResponseObject`` views of the data. Once ``schema()`` has been called, they're
+    typed by it, with field types looked up as responses arrive rather than when
+    the views are read.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        token: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+        normalized_cache: Optional[NormalizedCache] = None,
+        deduplicate: bool = False,
+        thread_safe: bool = False,
+        hooks: Iterable[Hook] = (),
+        timeout: Optional[float] = None,
+        hedge: Optional[HedgePolicy] = None,
+        persisted_queries: bool = False,
+        http_cache: Optional[HTTPCache] = None,
+        max_url_length: int = 2048,
+        canonical: bool = False,
+        response_objects: bool = False,
+    ):
         self._url = url
-        self._session = requests.Session()
-        if token:
-            self._session.headers["Authorization"] = f"Bearer {token}"
+        self._cache = cache
+        self._normalized_cache = normalized_cache
+        self._single_flight = SingleFlight() if deduplicate else None
+        self.instrumentation = Instrumentation(hooks)
+        self._token = token
+        self._session = self._new_session()
+        self._timeout = timeout
+        self._hedge = hedge
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._persisted_queries = persisted_queries
+        self._http_cache = http_cache
+        self._max_url_length = max_url_length
+        self._canonical = canonical
+        self._response_objects = response_objects
+        self._local = threading.local() if thread_safe or hedge else None
+        self._sessions = [self._session]
+        # reentrant, as sessions of finished threads may be dropped while it's held
+        self._sessions_lock = threading.RLock()
         self._schema: Optional[Schema] = None
+        self._schema_lock = threading.RLock()
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        if self._token:
+            session.headers["Authorization"] = f"Bearer {self._token}"
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        if self._local is None:
+            return self._session
+        holder = getattr(self._local, "session", None)
+        if holder is None:
+            holder = self._local.session = _ThreadSession(self._new_session())
+            # threads come and go, e.g. the workers of each run_many call
+            weakref.finalize(holder, self._drop_session, holder.session)
+            with self._sessions_lock:
+                self._sessions.append(holder.session)
+        return holder.session
+
+    def _drop_session(self, session: requests.Session):
+        with self._sessions_lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+        session.close()
+
+    @property
+    def is_thread_safe(self) -> bool:
+        return self._local is not None
+
+    def _make_thread_safe(self):
+        """Gives every other thread its own session from now on."""
+        with self._sessions_lock:
+            if self._local is None:
+                local = threading.local()
+                # the calling thread keeps the session it has been using
+                local.session = _ThreadSession(self._session)
+                self._local = local
+
+    def close(self):
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False, cancel_futures=True)
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
 
     def get(
-        self, query: Query, variables: Optional[dict[str, ValueRawType]] = None
+        self,
+        query: Query,
+        variables: Optional[dict[str, ValueRawType]] = None,
+        validate: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Union[dict, ResponseObject]:
+        variables = query.bind(variables)
+        if validate:
+            self.validate_variables(query, variables)
+        return self._respond(
+            query,
+            self._execute_query("GET", query, variables, self._deadline(timeout)),
+        )
+
+    def post(
+        self,
+        query: Query,
+        variables: Optional[dict[str, ValueRawType]] = None,
+        validate: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Union[dict, ResponseObject]:
+        variables = query.bind(variables)
+        if validate:
+            self.validate_variables(query, variables)
+        return self._respond(
+            query,
+            self._execute_query("POST", query, variables, self._deadline(timeout)),
+        )
+
+    def execute(
+        self,
+        query: Query,
+        variables: Optional[dict[str, ValueRawType]] = None,
+        validate: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Union[dict, ResponseObject]:
+        """Like ``get``, falling back to POST when the URL would be too long."""
+        variables = query.bind(variables)
+        if validate:
+            self.validate_variables(query, variables)
+        return self._respond(
+            query,
+            self._execute_query("AUTO", query, variables, self._deadline(timeout)),
+        )
+
+    def _respond(self, query: Query, data: dict) -> Union[dict, ResponseObject]:
+        # the schema reads introspection results as plain dicts
+        if not self._response_objects or is_introspecting():
+            return data
+        # type lookups may need the network, so they happen here rather than when
+        # reading the response
+        return wrap(data, query, self._schema, resolve=self._schema is not None)
+
+    def run_partial(
+        self,
+        query: Query,
+        variables: Optional[dict[str, ValueRawType]] = None,
+        retries: int = 0,
+        method: str = "POST",
+        timeout: Optional[float] = None,
+    ) -> PartialResult:
+        """Runs a query, returning partial data together with any GraphQL errors.
+
+        Up to ``retries`` times, only the subtrees affected by errors are re-issued
+        and their data merged into the result.
+        """
+        deadline = self._deadline(timeout)
+        variables = query.bind(variables)
+        result = PartialResult(
+            query, *self._execute_partial(method, query, variables, deadline)
+        )
+        while result.errors and result.retries < retries:
+            retry = result.retry_query()
+            names = {definition.name for definition in retry.variable_definitions}
+            result = result.merged(
+                *self._execute_partial(
+                    method,
+                    retry,
+                    {
+                        name: value
+                        for name, value in (variables or {}).items()
+                        if name in names
+                    },
+                    deadline,
+                )
+            )
+        return result
+
+    def _execute_partial(
+        self,
+        method: str,
+        query: Query,
+        variables: Optional[dict[str, ValueRawType]],
+        deadline: Optional[float],
+    ) -> tuple[Optional[dict], list]:
+        try:
+            return self._execute_query(method, query, variables, deadline), []
+        except OperationErrors as e:
+            return e.data, e.errors
+
+    def run_many(
+        self,
+        query: Query,
+        variables_iter: Iterable[Optional[dict[str, ValueRawType]]],
+        concurrency: Union[int, AdaptiveLimiter] = 8,
+        ordered: bool = True,
+        batch_size: int = 1,
+        timeout: Optional[float] = None,
+    ) -> Iterator[BulkResult]:
+        """Runs a query once per set of variables, streaming results as they arrive.
+
+        Errors are captured per item rather than raised. With ``batch_size`` above
+        one, groups of variable sets are folded into a single aliased request.
+        ``concurrency`` is either a fixed number of workers or an AdaptiveLimiter,
+        which backs off on transport failures and slow responses. ``timeout``, or
+        the client's, applies to each request.
+
+        Sessions can't be shared between threads, so the client becomes thread safe,
+        giving each worker its own.
+        """
+        self._make_thread_safe()
+        if query.variables:
+            variables_iter = map(query.bind, variables_iter)
+        items = enumerate(variables_iter)
+        if batch_size > 1:
+            batched = {}
+
+            def run(chunk: list[tuple[int, Optional[dict]]]) -> list[BulkResult]:
+                if (document := batched.get(len(chunk))) is None:
+                    document = batched[len(chunk)] = self._render(
+                        batch_query(query, len(chunk)), None
+                    )
+                timings = None
+                if self.instrumentation.enabled:
+                    timings = self.instrumentation.start("POST", query.name)
+                deadline = self._deadline(timeout)
+                try:
+                    decoded = self._send(
+                        "POST",
+                        document,
+                        batch_variables(chunk),
+                        timings,
+                        self._remaining(deadline),
+                    )
+                    # malformed responses fail the items of the batch, too
+                    return split_batch(query, chunk, decoded)
+                except Exception as e:
+                    if timings is not None:
+                        timings.error = e
+                    return [
+                        BulkResult(index, variables, error=e)
+                        for index, variables in chunk
+                    ]
+                finally:
+                    if timings is not None:
+                        self.instrumentation.finish(timings)
+
+            results = dispatch(
+                chunked(items, batch_size),
+                run,
+                concurrency,
+                _transport_failed,
+                ordered,
+            )
+        else:
+            document = self._render(query, None)
+
+            def run(item: tuple[int, Optional[dict]]) -> list[BulkResult]:
+                index, variables = item
+                try:
+                    return [
+                        BulkResult(
+                            index,
+                            variables,
+                            data=self._execute(
+                                "POST",
+                                document,
+                                variables,
+                                query.name,
+                                deadline=self._deadline(timeout),
+                            ),
+                        )
+                    ]
+                except Exception as e:
+                    return [BulkResult(index, variables, error=e)]
+
+            results = dispatch(items, run, concurrency, _transport_failed, ordered)
+        for group in results:
+            yield from group
+
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        return self._cache
+
+    @property
+    def normalized_cache(self) -> Optional[NormalizedCache]:
+        return self._normalized_cache
+
+    @property
+    def single_flight(self) -> Optional[SingleFlight]:
+        return self._single_flight
+
+    @property
+    def http_cache(self) -> Optional[HTTPCache]:
+        return self._http_cache
+
+    @property
+    def hedge(self) -> Optional[HedgePolicy]:
+        return self._hedge
+
+    def _deadline(self, timeout: Optional[float]) -> Optional[float]:
+        if timeout is None:
+            timeout = self._timeout
+        return None if timeout is None else time.monotonic() + timeout
+
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("deadline exceeded")
+        return remaining
+
+    def _execute_query(
+        self,
+        method: str,
+        query: Query,
+        variables: Optional[dict[str, ValueRawType]],
+        deadline: Optional[float] = None,
     ) -> dict:
-        payload = {"query": str(query)}
-        if variables:
-            payload["variables"] = variables
-        resp = self._session.get(self._url, params=payload)
+        timings = None
+        if self.instrumentation.enabled:
+            timings = self.instrumentation.start(method, query.name)
+        if timings is None:
+            return self._run_query(method, query, variables, deadline)
         try:
-            decoded = resp.json()
-        except JSONDecodeError as e:
-            raise RemoteError(resp.text) from e
-        if errors := decoded.get("errors"):
-            raise OperationErrors(errors)
-        return decoded.get("data")
+            return self._run_query(method, query, variables, deadline, timings)
+        except Exception as e:
+            timings.error = e
+            raise
+        finally:
+            self.instrumentation.finish(timings)
 
-    def post(
-        self, query: Query, variables: Optional[dict[str, ValueRawType]] = None
+    def _run_query(
+        self,
+        method: str,
+        query: Query,
+        variables: Optional[dict[str, ValueRawType]],
+        deadline: Optional[float],
+        timings: Optional[OperationTimings] = None,
+    ) -> dict:
+        if self._normalized_cache is None:
+            return self._fetch(
+                method,
+                self._render(query, timings),
+                variables,
+                query.name,
+                timings,
+                deadline,
+            )
+        data, missing = self._normalized_cache.read(query, variables)
+        if missing is None:
+            if timings is not None:
+                timings.cached = True
+            return data
+        names = {definition.name for definition in missing.variable_definitions}
+        missing_variables = {
+            name: value for name, value in (variables or {}).items() if name in names
+        }
+        keys = list(dict.fromkeys(response_keys(expand_fragments(query).selection_set)))
+        try:
+            fetched = self._fetch(
+                method,
+                self._render(missing, timings),
+                missing_variables,
+                query.name,
+                timings,
+                deadline,
+            )
+        except OperationErrors as e:
+            if e.data is not None:
+                data.update(e.data)
+                e.data = {key: data[key] for key in keys if key in data}
+            raise
+        self._normalized_cache.write(missing, fetched, missing_variables)
+        data.update(fetched)
+        # fields left out by directives are absent rather than null
+        return {key: data[key] for key in keys if key in data}
+
+    def _render(self, query: Query, timings: Optional[OperationTimings]) -> str:
+        start = time.perf_counter()
+        document = str(canonicalize(query) if self._canonical else query)
+        if timings is not None:
+            timings.render = time.perf_counter() - start
+        return document
+
+    def _execute(
+        self,
+        method: str,
+        document: str,
+        variables: Optional[dict[str, ValueRawType]],
+        operation_name: Optional[str] = None,
+        timings: Optional[OperationTimings] = None,
+        deadline: Optional[float] = None,
+    ) -> dict:
+        if timings is None and self.instrumentation.enabled:
+            timings = self.instrumentation.start(method, operation_name)
+        if timings is None:
+            return self._fetch(
+                method, document, variables, operation_name, deadline=deadline
+            )
+        try:
+            return self._fetch(
+                method, document, variables, operation_name, timings, deadline
+            )
+        except Exception as e:
+            timings.error = e
+            raise
+        finally:
+            self.instrumentation.finish(timings)
+
+    def _fetch(
+        self,
+        method: str,
+        document: str,
+        variables: Optional[dict[str, ValueRawType]],
+        operation_name: Optional[str],
+        timings: Optional[OperationTimings] = None,
+        deadline: Optional[float] = None,
+    ) -> dict:
+        key = None
+        if self._cache is not None:
+            key = cache_key(document, variables)
+            if (data := self._cache.get(key)) is not None:
+                if timings is not None:
+                    timings.cached = True
+                return data
+
+        def fetch() -> dict:
+            if self._hedge is None:
+                decoded = self._send(
+                    method, document, variables, timings, self._remaining(deadline)
+                )
+            else:
+                decoded = self._send_hedged(
+                    method, document, variables, timings, deadline
+                )
+            if errors := decoded.get("errors"):
+                start = time.perf_counter()
+                error = OperationErrors(errors, decoded.get("data"))
+                if timings is not None:
+                    timings.error_parsing = time.perf_counter() - start
+                raise error
+            data = decoded.get("data")
+            if self._cache is not None and data is not None:
+                self._cache.set(key, data, self._cache.ttl_for(operation_name))
+            return data
+
+        if self._single_flight is None:
+            return fetch()
+        start = time.perf_counter()
+        try:
+            return self._single_flight.do(key or cache_key(document, variables), fetch)
+        finally:
+            if timings is not None and not timings.network:
+                # collapsed into another caller's request, which we waited on
+                timings.deduplicated = True
+                timings.network = time.perf_counter() - start
+
+    def _send_hedged(
+        self,
+        method: str,
+        document: str,
+        variables: Optional[dict[str, ValueRawType]],
+        timings: Optional[OperationTimings],
+        deadline: Optional[float],
+    ) -> dict:
+        policy = self._hedge
+        start = time.perf_counter()
+        delay = policy.delay()
+        if delay is None:
+            decoded = self._send(
+                method, document, variables, timings, self._remaining(deadline)
+            )
+            policy.observe(time.perf_counter() - start)
+            return decoded
+        if self._hedge_executor is None:
+            with self._sessions_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(policy.max_workers)
+
+        def attempt() -> tuple[dict, Optional[OperationTimings]]:
+            # attempts may overlap, so each one records into its own timings
+            own = None if timings is None else OperationTimings(method)
+            return (
+                self._send(method, document, variables, own, self._remaining(deadline)),
+                own,
+            )
+
+        remaining = self._remaining(deadline)
+        primary = self._hedge_executor.submit(attempt)
+        pending = {primary}
+        done, _ = wait(
+            pending, timeout=delay if remaining is None else min(delay, remaining)
+        )
+        hedged = not done
+        if hedged:
+            pending.add(self._hedge_executor.submit(attempt))
+        errors = []
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=self._remaining(deadline),
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                raise DeadlineExceeded("deadline exceeded")
+            for future in done:
+                if future.exception() is not None:
+                    errors.append(future.exception())
+                    continue
+                for other in pending:
+                    # requests can't be interrupted mid-flight, the loser's response
+                    # is discarded once it arrives
+                    other.cancel()
+                elapsed = time.perf_counter() - start
+                policy.observe(elapsed, hedged, future is not primary)
+                decoded, own = future.result()
+                if timings is not None:
+                    timings.hedged = hedged
+                    timings.encode = own.encode
+                    timings.decode = own.decode
+                    timings.network = elapsed - own.encode - own.decode
+                    timings.bytes_sent = own.bytes_sent
+                    timings.bytes_received = own.bytes_received
+                return decoded
+        raise errors[0]
+
+    def _send(
+        self,
+        method: str,
+        document: str,
+        variables: Optional[dict[str, ValueRawType]],
+        timings: Optional[OperationTimings] = None,
+        timeout: Optional[float] = None,
     ) -> dict:
-        payload = {"query": str(query)}
+        payload = {}
         if variables:
             payload["variables"] = variables
-        resp = self._session.post(self._url, json=payload)
+        if not self._persisted_queries:
+            return self._request(
+                method, {"query": document, **payload}, timings, timeout
+            )
+        payload["extensions"] = {
+            "persistedQuery": {"version": 1, "sha256Hash": _sha256(document)}
+        }
+        decoded = self._request(method, payload, timings, timeout)
+        if _persisted_query_not_found(decoded):
+            # first use of this document, register it by sending it along the hash
+            decoded = self._request(
+                method, {"query": document, **payload}, timings, timeout
+            )
+        return decoded
+
+    def _request(
+        self,
+        method: str,
+        payload: dict,
+        timings: Optional[OperationTimings],
+        timeout: Optional[float],
+    ) -> dict:
+        session = self.session
+        start = time.perf_counter()
+        url = None
+        if method != "POST":
+            url = self._url + "?" + urlencode(_get_params(payload))
+            if method == "AUTO" and len(url) > self._max_url_length:
+                url = None
+        cached = None
+        headers = JSON_HEADERS
+        if url is not None and self._http_cache is not None:
+            cached = self._http_cache.get(url)
+            if cached is not None and self._http_cache.is_fresh(cached):
+                if timings is not None:
+                    timings.method = "GET"
+                    timings.cached = True
+                return cached.decoded
+            if cached is not None and cached.etag is not None:
+                headers = {**JSON_HEADERS, "If-None-Match": cached.etag}
+        try:
+            if url is not None:
+                encoded = time.perf_counter()
+                resp = session.get(url, headers=headers, timeout=timeout)
+                bytes_sent = len(url)
+            else:
+                body = json.dumps(payload).encode()
+                encoded = time.perf_counter()
+                resp = session.post(
+                    self._url, data=body, headers=JSON_HEADERS, timeout=timeout
+                )
+                bytes_sent = len(body)
+        except requests.Timeout as e:
+            raise DeadlineExceeded(str(e)) from e
+        received = time.perf_counter()
+        content = resp.content
         try:
-            decoded = resp.json()
-        except JSONDecodeError as e:
+            if resp.status_code == 304 and cached is not None:
+                decoded = self._http_cache.revalidated(url, cached, resp.headers)
+            else:
+                decoded = json.loads(content)
+        except ValueError as e:
             raise RemoteError(resp.text) from e
-        if errors := decoded.get("errors"):
-            raise OperationErrors(errors)
-        return decoded.get("data")
+        finally:
+            if timings is not None:
+                timings.method = "GET" if url is not None else "POST"
+                timings.encode += encoded - start
+                timings.network += received - encoded
+                timings.decode += time.perf_counter() - received
+                timings.bytes_sent += bytes_sent
+                timings.bytes_received += len(content)
+                timings.not_modified = resp.status_code == 304
+        if (
+            url is not None
+            and self._http_cache is not None
+            and resp.status_code == 200
+            and not decoded.get("errors")
+        ):
+            self._http_cache.store(url, resp.headers, decoded)
+        return decoded
+
+    def validate_variables(
+        self, query: Query, variables: Optional[dict[str, ValueRawType]]
+    ):
+        schema = self._schema or self.schema()
+        schema.variables_validator(query).validate(variables)
 
     def new_query(self, with_schema: bool = True) -> QueryBlueprint:
         return QueryBlueprint(
@@ -53,6 +709,38 @@ class Client:
         )
 
     def schema(self, strict: bool = False) -> Schema:
-        if self._schema is None or strict != self._schema.is_strict:
-            self._schema = Schema(client=self, strict=strict)
-        return self._schema
+        schema = self._schema
+        if schema is not None and strict == schema.is_strict:
+            return schema
+        with self._schema_lock:
+            if self._schema is None or strict != self._schema.is_strict:
+                self._schema = Schema(client=self, strict=strict)
+            return self._schema
+
+
+def _transport_failed(results: list[BulkResult]) -> bool:
+    # GraphQL errors are answers, only failures to get one signal an overloaded server
+    return any(
+        isinstance(result.error, (RemoteError, requests.RequestException))
+        for result in results
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _sha256(document: str) -> str:
+    return hashlib.sha256(document.encode()).hexdigest()
+
+
+def _get_params(payload: dict) -> dict[str, str]:
+    return {
+        key: value if key == "query" else json.dumps(value, separators=(",", ":"))
+        for key, value in payload.items()
+    }
+
+
+def _persisted_query_not_found(decoded: dict) -> bool:
+    return any(
+        error.get("message") == "PersistedQueryNotFound"
+        or (error.get("extensions") or {}).get("code") == "PERSISTED_QUERY_NOT_FOUND"
+        for error in decoded.get("errors") or ()
+    )
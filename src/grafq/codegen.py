@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import argparse
+import keyword
+import os
+from collections.abc import Iterator
+from typing import Optional, Union
+
+from grafq.blueprints import GeneratedFieldBlueprint
+from grafq.response import ResponseObject
+from grafq.schema import FieldMeta, Schema
+
+COMPOSITE_KINDS = ("OBJECT", "INTERFACE", "UNION")
+
+# module level names of generated modules
+_RESERVED = frozenset(
+    (
+        "annotations",
+        "root",
+        "INPUT_TYPES",
+        "RESPONSES",
+        "_generated",
+        "_response",
+        "_Builder",
+        "_Root",
+        "_Spec",
+    )
+)
+
+
+def _class_name(type_name: str) -> str:
+    if keyword.iskeyword(type_name) or type_name in _RESERVED:
+        return type_name + "_"
+    return type_name
+
+
+def _has_property(field_name: str) -> bool:
+    # other fields, like those shadowed by builder methods, are selected by key
+    return not (
+        keyword.iskeyword(field_name)
+        or field_name.startswith("__")
+        or hasattr(GeneratedFieldBlueprint, field_name)
+    )
+
+
+def _response_names(composite: list[str], classes: dict[str, str]) -> dict[str, str]:
+    taken = set(classes.values()) | _RESERVED
+    names = {}
+    for name in composite:
+        response_name = classes[name] + "Response"
+        while response_name in taken:
+            response_name += "_"
+        taken.add(response_name)
+        names[name] = response_name
+    return names
+
+
+def _has_attribute(field_name: str) -> bool:
+    # other fields, like those shadowed by mapping methods, are read by key
+    return not (
+        keyword.iskeyword(field_name)
+        or field_name.startswith("__")
+        or hasattr(ResponseObject, field_name)
+    )
+
+
+def _docstring(description, indent: str) -> Iterator[str]:
+    # descriptions of fields may not have been fetched
+    if isinstance(description, str) and description:
+        yield f"{indent}{description!r}"
+
+
+def _input_type(schema: Schema, name: str) -> Optional[tuple]:
+    kind = schema.get_type_kind(name)
+    if kind == "SCALAR":
+        return (kind,)
+    if kind == "ENUM":
+        values = schema.get_type_enum_values(name) or ()
+        return kind, tuple(value.name for value in values)
+    if kind == "INPUT_OBJECT":
+        fields = schema.get_type_input_fields(name) or ()
+        return kind, tuple(
+            (field.name, str(field.type), field.default_value) for field in fields
+        )
+    return None
+
+
+def _builder(
+    name: str, description: Optional[str], fields: dict[str, FieldMeta], classes
+) -> Iterator[str]:
+    yield ""
+    yield ""
+    yield f"class {classes[name]}(_Builder):"
+    yield from _docstring(description, "    ")
+    yield "    __slots__ = ()"
+    yield f"    _type_name = {name!r}"
+    for field in fields.values():
+        if not _has_property(field.name):
+            continue
+        yield ""
+        yield "    @property"
+        yield (
+            f"    def {field.name}(self) -> "
+            f"{classes.get(field.type.core_type.name, '_Builder')}:"
+        )
+        yield from _docstring(field.description, "        ")
+        yield f"        return self._child({field.name!r})"
+
+
+def _specs(name: str, fields: dict[str, FieldMeta], classes) -> Iterator[str]:
+    yield f"{classes[name]}._fields = {{"
+    for field in fields.values():
+        arguments = {argument.name: str(argument.type) for argument in field.args}
+        builder = classes.get(field.type.core_type.name, "_Builder")
+        yield f"    {field.name!r}: _Spec({str(field.type)!r}, {builder}, {arguments!r}),"
+    yield "}"
+
+
+def _response(
+    name: str, description: Optional[str], fields: dict[str, FieldMeta], responses
+) -> Iterator[str]:
+    yield ""
+    yield ""
+    yield f"class {responses[name]}(_response.ResponseObject):"
+    yield from _docstring(description, "    ")
+    yield "    __slots__ = ()"
+    for field in fields.values():
+        if not _has_attribute(field.name):
+            continue
+        if "[" in str(field.type):
+            annotation = " -> _response.ResponseList"
+        elif field.type.core_type.name in responses:
+            annotation = f" -> {responses[field.type.core_type.name]}"
+        else:
+            annotation = ""
+        yield ""
+        yield "    @property"
+        yield f"    def {field.name}(self){annotation}:"
+        yield from _docstring(field.description, "        ")
+        yield f"        return self._attribute({field.name!r})"
+
+
+def _response_types(
+    schema: Schema, fields: dict[str, dict[str, FieldMeta]], responses
+) -> Iterator[str]:
+    yield ""
+    yield ""
+    yield "RESPONSES = _response.ResponseTypes("
+    yield f"    {schema.query_type!r},"
+    yield "    {"
+    for name in fields:
+        yield f"        {name!r}: {responses[name]},"
+    yield "    },"
+    yield "    {"
+    for name, type_fields in fields.items():
+        types = {
+            field.name: (field.type.core_type.name, field.type.core_type.kind)
+            for field in type_fields.values()
+        }
+        yield f"        {name!r}: {types!r},"
+    yield "    },"
+    yield ")"
+
+
+def _root(schema: Schema, classes) -> Iterator[str]:
+    query_type = schema.query_type
+    yield ""
+    yield ""
+    yield "class _Root(_generated.GeneratedRoot):"
+    yield "    __slots__ = ()"
+    yield f"    _type = {classes[query_type]}"
+    for field in (schema.get_type_fields(query_type) or {}).values():
+        if not _has_property(field.name):
+            continue
+        yield ""
+        yield "    @property"
+        yield (
+            f"    def {field.name}(self) -> "
+            f"{classes.get(field.type.core_type.name, '_Builder')}:"
+        )
+        yield from _docstring(field.description, "        ")
+        yield f"        return self._type._root_field({field.name!r})"
+    yield ""
+    yield ""
+    yield "root = _Root()"
+
+
+def generate(schema: Union[Schema, str, os.PathLike]) -> str:
+    """Source of a module with builders for every type of a schema, or schema file.
+
+    The module has a slotted builder class per object, interface and union type,
+    with the fields, arguments and input types they use as precomputed class
+    attributes. Its builders behave like those obtained from the ``Schema``, but
+    importing and using them never consults one::
+
+        python -m grafq.codegen schema.json github.py
+
+        from github import root
+        Query().select(root.viewer.repositories(first=5).url)
+
+    Each of those types also gets a slotted response class, with a property per
+    field. Its ``RESPONSES`` are given to ``wrap`` in place of the schema::
+
+        from github import RESPONSES
+        wrap(data, query, types=RESPONSES).viewer  # a UserResponse
+    """
+    if not isinstance(schema, Schema):
+        schema = Schema.load(schema)
+    names = sorted(
+        name for name in schema.get_type_names() if not name.startswith("__")
+    )
+    composite = [
+        name for name in names if schema.get_type_kind(name) in COMPOSITE_KINDS
+    ]
+    classes = {name: _class_name(name) for name in composite}
+    responses = _response_names(composite, classes)
+    fields = {name: schema.get_type_fields(name) or {} for name in composite}
+    lines = [
+        f'"""Builders for the {schema.query_type} schema, generated by grafq.codegen."""',
+        "",
+        "from __future__ import annotations",
+        "",
+        "from grafq import response as _response",
+        "from grafq.blueprints.field import generated as _generated",
+        "",
+        "_Spec = _generated.FieldSpec",
+        "",
+        "INPUT_TYPES: _generated.InputTypes = {",
+    ]
+    for name in names:
+        if (input_type := _input_type(schema, name)) is not None:
+            lines.append(f"    {name!r}: {input_type!r},")
+    lines += [
+        "}",
+        "",
+        "",
+        "class _Builder(_generated.GeneratedFieldBlueprint):",
+        "    __slots__ = ()",
+        "    _input_types = INPUT_TYPES",
+        f"    _strict = {schema.is_strict}",
+        "    # validators are keyed by type name, which is only unique per schema",
+        "    _validators = {}",
+    ]
+    for name in composite:
+        description = schema.get_type_description(name)
+        lines.extend(_builder(name, description, fields[name], classes))
+    lines.append("")
+    lines.append("")
+    # assigned once every class exists, as fields refer to each other's types
+    for name in composite:
+        lines.extend(_specs(name, fields[name], classes))
+    lines.extend(_root(schema, classes))
+    for name in composite:
+        description = schema.get_type_description(name)
+        lines.extend(_response(name, description, fields[name], responses))
+    lines.extend(_response_types(schema, fields, responses))
+    return "\n".join(lines) + "\n"
+
+
+def main(args: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m grafq.codegen",
+        description="Generates typed builders from a schema saved by Schema.save.",
+    )
+    parser.add_argument("schema", help="path of the introspection result")
+    parser.add_argument("output", help="path of the module to write")
+    parser.add_argument(
+        "--strict", action="store_true", help="validate arguments strictly"
+    )
+    options = parser.parse_args(args)
+    source = generate(Schema.load(options.schema, strict=options.strict))
+    with open(options.output, "w", encoding="utf-8") as f:
+        f.write(source)
+
+
+if __name__ == "__main__":
+    main()
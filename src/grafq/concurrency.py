@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class LimiterStats:
+    increases: int = 0
+    decreases: int = 0
+
+
+class AdaptiveLimiter:
+    """Concurrency limit adjusted by additive-increase/multiplicative-decrease (AIMD).
+
+    Every healthy response grows the limit by ``1 / limit``, i.e. by roughly one per
+    round of requests. A failure, or a latency above ``tolerance`` times the best
+    recent latency (plus ``slack`` seconds, to ignore jitter on very fast
+    responses), multiplies it by ``backoff``. Responses to requests started before
+    the last decrease don't shrink it again, so one slow spell counts as one event.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff: float = 0.75,
+        tolerance: float = 2.0,
+        slack: float = 0.005,
+        window: int = 100,
+    ):
+        if not min_limit <= initial <= max_limit:
+            raise ValueError("initial limit must be between min_limit and max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.slack = slack
+        self._limit = float(initial)
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+        self.stats = LimiterStats()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def observe(self, latency: float, ok: bool = True, started: Optional[float] = None):
+        """Adjusts the limit after a request started at ``started`` (``time.monotonic``)."""
+        with self._lock:
+            if ok:
+                self._latencies.append(latency)
+            baseline = min(self._latencies, default=latency)
+            if ok and latency <= self.tolerance * baseline + self.slack:
+                if self._limit < self.max_limit:
+                    self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+                    self.stats.increases += 1
+            elif started is None or started >= self._last_decrease:
+                self._limit = max(self.min_limit, self._limit * self.backoff)
+                self._last_decrease = time.monotonic()
+                self.stats.decreases += 1
@@ -15,8 +15,16 @@ class OperationError:
     path: Optional[list[str]] = None
 
 
+@dataclass
+class ValidationError:
+    message: str
+    path: Optional[list[str]] = None
+
+
 class OperationErrors(Exception):
-    def __init__(self, errors: list[dict]):
+    def __init__(self, errors: list[dict], data: Optional[dict] = None):
+        # whatever the server resolved despite the errors
+        self.data = data
         self.errors = [
             OperationError(
                 error["message"],
@@ -30,5 +38,27 @@ class OperationErrors(Exception):
         ]
 
 
+class GraphQLSyntaxError(ValueError):
+    def __init__(self, message: str, location: Location):
+        super().__init__(f"{message} at line {location.line}, column {location.column}")
+        self.location = location
+
+
 class RemoteError(Exception):
     pass
+
+
+class VariableErrors(TypeError):
+    def __init__(self, errors: list[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+class ValidationErrors(TypeError):
+    def __init__(self, errors: list[ValidationError]):
+        super().__init__("; ".join(error.message for error in errors))
+        self.errors = errors
+
+
+class DeadlineExceeded(RemoteError):
+    pass
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import dataclasses
+from collections import Counter
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Optional
+
+from grafq.language import (
+    Field,
+    FragmentDefinition,
+    FragmentSpread,
+    InlineFragment,
+    Query,
+    Selection,
+    SelectionType,
+    ValueRawType,
+    VarRef,
+    selection_block,
+)
+from grafq.validation import META_ROOT_FIELDS
+
+if TYPE_CHECKING:
+    from grafq.schema import Schema
+
+
+def response_keys(selections: list[SelectionType]) -> Iterator[str]:
+    """Keys of the fields selected, including those of inline fragments."""
+    for selection in selections:
+        if isinstance(selection, Selection):
+            yield selection.field.alias or selection.field.name
+        elif isinstance(selection, InlineFragment):
+            yield from response_keys(selection.selection_set)
+
+
+def _variable_names(value: ValueRawType) -> set[str]:
+    if isinstance(value, VarRef):
+        return {value.name}
+    if isinstance(value, list):
+        return set().union(*(_variable_names(item) for item in value))
+    if isinstance(value, dict):
+        return set().union(*(_variable_names(item) for item in value.values()))
+    return set()
+
+
+def used_variables(selections: list[SelectionType]) -> set[str]:
+    """Variables referenced by the selections, which must not contain fragment spreads."""
+    names = set()
+    for selection in selections:
+        if isinstance(selection, InlineFragment):
+            for directive in selection.directives or ():
+                for argument in directive.arguments or ():
+                    names |= _variable_names(argument.value.inner)
+            names |= used_variables(selection.selection_set)
+            continue
+        for argument in selection.field.arguments or ():
+            names |= _variable_names(argument.value.inner)
+        for directive in selection.field.directives or ():
+            for argument in directive.arguments or ():
+                names |= _variable_names(argument.value.inner)
+        names |= used_variables(selection.field.selection_set or [])
+    return names
+
+
+def expand_fragments(query: Query) -> Query:
+    """Replaces named fragment spreads with equivalent inline fragments."""
+    if not query.fragments:
+        return query
+    definitions = {fragment.name: fragment for fragment in query.fragments}
+
+    def expand(
+        selections: list[SelectionType], visiting: frozenset[str]
+    ) -> list[SelectionType]:
+        result = []
+        for selection in selections:
+            if isinstance(selection, FragmentSpread):
+                definition = definitions.get(selection.name)
+                if definition is None:
+                    raise ValueError(f"Unknown fragment: {selection.name}")
+                if selection.name in visiting:
+                    raise ValueError(f"Fragment {selection.name} spreads itself")
+                result.append(
+                    InlineFragment(
+                        expand(definition.selection_set, visiting | {selection.name}),
+                        definition.type_condition,
+                        selection.directives,
+                    )
+                )
+            elif isinstance(selection, InlineFragment):
+                result.append(
+                    dataclasses.replace(
+                        selection,
+                        selection_set=expand(selection.selection_set, visiting),
+                    )
+                )
+            elif selection.field.selection_set:
+                result.append(
+                    Selection(
+                        dataclasses.replace(
+                            selection.field,
+                            selection_set=expand(
+                                selection.field.selection_set, visiting
+                            ),
+                        )
+                    )
+                )
+            else:
+                result.append(selection)
+        return result
+
+    return dataclasses.replace(
+        query, selection_set=expand(query.selection_set, frozenset()), fragments=None
+    )
+
+
+class _Extractor:
+    def __init__(self, query: Query, schema: Schema):
+        self._schema = schema
+        self._selection_set = query.selection_set
+        self._fragments = list(query.fragments or ())
+        self._names = {fragment.name for fragment in self._fragments}
+
+    def _field_type(
+        self, field: Field, type_name: Optional[str], root: bool
+    ) -> Optional[str]:
+        if root and field.name in META_ROOT_FIELDS:
+            return META_ROOT_FIELDS[field.name]
+        fields = self._schema.get_type_fields(type_name) if type_name else None
+        meta = fields.get(field.name) if fields else None
+        return meta.type.core_type.name if meta else None
+
+    def _trees(self) -> Iterator[tuple[list[SelectionType], Optional[str], bool]]:
+        yield self._selection_set, self._schema.query_type, True
+        for fragment in self._fragments:
+            yield fragment.selection_set, fragment.type_condition, False
+
+    def _count(
+        self,
+        selections: list[SelectionType],
+        type_name: Optional[str],
+        root: bool,
+        counts: Counter,
+        blocks: dict,
+    ):
+        for selection in selections:
+            if isinstance(selection, InlineFragment):
+                self._count(
+                    selection.selection_set,
+                    selection.type_condition or type_name,
+                    root,
+                    counts,
+                    blocks,
+                )
+            elif isinstance(selection, Selection) and selection.field.selection_set:
+                field_type = self._field_type(selection.field, type_name, root)
+                self._count(
+                    selection.field.selection_set, field_type, False, counts, blocks
+                )
+                if field_type is not None:
+                    key = (field_type, selection_block(selection.field.selection_set))
+                    counts[key] += 1
+                    blocks[key] = selection.field.selection_set
+
+    def _replace(
+        self,
+        selections: list[SelectionType],
+        type_name: Optional[str],
+        root: bool,
+        key: tuple[str, str],
+        name: str,
+    ) -> list[SelectionType]:
+        result = []
+        for selection in selections:
+            if isinstance(selection, InlineFragment):
+                selection = dataclasses.replace(
+                    selection,
+                    selection_set=self._replace(
+                        selection.selection_set,
+                        selection.type_condition or type_name,
+                        root,
+                        key,
+                        name,
+                    ),
+                )
+            elif isinstance(selection, Selection) and selection.field.selection_set:
+                field = selection.field
+                field_type = self._field_type(field, type_name, root)
+                if (field_type, selection_block(field.selection_set)) == key:
+                    selection_set = [FragmentSpread(name)]
+                else:
+                    selection_set = self._replace(
+                        field.selection_set, field_type, False, key, name
+                    )
+                selection = Selection(
+                    dataclasses.replace(field, selection_set=selection_set)
+                )
+            result.append(selection)
+        return result
+
+    def _fresh_name(self, type_name: str) -> str:
+        base = type_name.lstrip("_") + "Fields"
+        name, counter = base, 2
+        while name in self._names:
+            name = f"{base}{counter}"
+            counter += 1
+        self._names.add(name)
+        return name
+
+    def _best(self) -> Optional[tuple[tuple[str, str], list[SelectionType]]]:
+        counts: Counter = Counter()
+        blocks: dict = {}
+        for selections, type_name, root in self._trees():
+            self._count(selections, type_name, root, counts, blocks)
+        best, best_saving = None, 0
+        for key, count in counts.items():
+            if count < 2:
+                continue
+            type_name, block = key
+            # every occurrence but one is saved, at the cost of the definition and
+            # a spread per occurrence (names are roughly as long as the type name)
+            overhead = len(f"fragment {type_name}Fields on {type_name}")
+            saving = (count - 1) * len(block) - overhead - count * (len(type_name) + 9)
+            if saving > best_saving:
+                best, best_saving = key, saving
+        return (best, blocks[best]) if best else None
+
+    def run(self) -> tuple[list[SelectionType], list[FragmentDefinition]]:
+        while (found := self._best()) is not None:
+            key, selection_set = found
+            name = self._fresh_name(key[0])
+            self._selection_set = self._replace(
+                self._selection_set, self._schema.query_type, True, key, name
+            )
+            self._fragments = [
+                dataclasses.replace(
+                    fragment,
+                    selection_set=self._replace(
+                        fragment.selection_set,
+                        fragment.type_condition,
+                        False,
+                        key,
+                        name,
+                    ),
+                )
+                for fragment in self._fragments
+            ]
+            self._fragments.append(FragmentDefinition(name, key[0], selection_set))
+        return self._selection_set, self._fragments
+
+
+def extract_fragments(query: Query, schema: Schema) -> Query:
+    """Factors selection sets repeated on fields of the same type into named fragments.
+
+    Subtrees are extracted largest first, for as long as doing so shortens the
+    document. Fragment type conditions are looked up in the schema, so fields it
+    doesn't know are left as they are.
+    """
+    selection_set, fragments = _Extractor(query, schema).run()
+    return dataclasses.replace(
+        query, selection_set=selection_set, fragments=fragments or None
+    )
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class HedgeStats:
+    requests: int = 0
+    hedged: int = 0
+    won: int = 0
+
+
+class HedgePolicy:
+    """Decides when to send a duplicate of a slow request.
+
+    The hedge delay is the given percentile of a rolling window of observed latencies,
+    so only the slowest ``1 - percentile`` share of requests gets duplicated. Until
+    ``min_samples`` latencies have been observed no request is hedged.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        window: int = 512,
+        min_samples: int = 20,
+        min_delay: float = 0.0,
+        max_workers: int = 16,
+    ):
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_workers = max_workers
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._delay: Optional[float] = None
+        self._stale = 0
+        self.stats = HedgeStats()
+
+    def observe(self, seconds: float, hedged: bool = False, won: bool = False):
+        """Records the latency of a request, and whether a hedge was sent and won."""
+        with self._lock:
+            self._samples.append(seconds)
+            self._stale += 1
+            self.stats.requests += 1
+            self.stats.hedged += hedged
+            self.stats.won += won
+
+    def delay(self) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            # re-sorting the window on every request is wasteful, the percentile
+            # moves slowly enough to be refreshed every few observations
+            if self._delay is None or self._stale >= 16:
+                ordered = sorted(self._samples)
+                rank = math.ceil(self.percentile * len(ordered)) - 1
+                self._delay = max(ordered[rank], self.min_delay)
+                self._stale = 0
+            return self._delay
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import dataclasses
+from enum import Enum
+from typing import TYPE_CHECKING, Optional
+
+from grafq.language import (
+    ID,
+    Argument,
+    EnumLiteral,
+    FragmentSpread,
+    InlineFragment,
+    ListType,
+    NamedType,
+    NonNullType,
+    NullType,
+    Query,
+    ScalarExtension,
+    Selection,
+    SelectionType,
+    Value,
+    ValueRawType,
+    VariableDefinition,
+    VariableType,
+    VarRef,
+)
+
+if TYPE_CHECKING:
+    from grafq.schema import Schema, SchemaType
+
+
+def _is_literal(value: ValueRawType) -> bool:
+    if isinstance(value, Value):
+        return _is_literal(value.inner)
+    if isinstance(value, VarRef):
+        return False
+    if isinstance(value, list):
+        return all(_is_literal(item) for item in value)
+    if isinstance(value, dict):
+        return all(_is_literal(item) for item in value.values())
+    return True
+
+
+def to_variable_value(value: ValueRawType):
+    """Converts a literal into its JSON representation as a variable value."""
+    if isinstance(value, Value):
+        return to_variable_value(value.inner)
+    if isinstance(value, NullType):
+        return None
+    if isinstance(value, (Enum, EnumLiteral)):
+        return value.name
+    if isinstance(value, ScalarExtension):
+        return to_variable_value(value.value)
+    if isinstance(value, ID):
+        return value.value
+    if isinstance(value, list):
+        return [to_variable_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_variable_value(item) for key, item in value.items()}
+    return value
+
+
+def _variable_type(schema_type: SchemaType) -> VariableType:
+    if schema_type.kind == "NON_NULL":
+        return NonNullType(_variable_type(schema_type.of_type))
+    if schema_type.kind == "LIST":
+        return ListType(_variable_type(schema_type.of_type))
+    return NamedType(schema_type.name)
+
+
+def hoist_literals(query: Query, schema: Schema) -> Query:
+    """Replaces literal arguments with variables typed after the schema.
+
+    The literals become the query's bound variables, so the rendered document only
+    depends on the query's shape. Variable names are derived from argument names in
+    selection order, and arguments the schema doesn't know are left inline.
+    """
+    taken = {definition.name for definition in query.variable_definitions or ()}
+    definitions = list(query.variable_definitions or ())
+    bound = dict(query.variables or {})
+
+    def fresh(name: str) -> str:
+        candidate, counter = name, 2
+        while candidate in taken:
+            candidate = f"{name}{counter}"
+            counter += 1
+        taken.add(candidate)
+        return candidate
+
+    def hoist(
+        selections: list[SelectionType], type_name: Optional[str]
+    ) -> list[SelectionType]:
+        fields = schema.get_type_fields(type_name) if type_name else None
+        result = []
+        for selection in selections:
+            if isinstance(selection, FragmentSpread):
+                result.append(selection)
+                continue
+            if isinstance(selection, InlineFragment):
+                result.append(
+                    dataclasses.replace(
+                        selection,
+                        selection_set=hoist(
+                            selection.selection_set,
+                            selection.type_condition or type_name,
+                        ),
+                    )
+                )
+                continue
+            field = selection.field
+            meta = fields.get(field.name) if fields else None
+            arguments = field.arguments
+            if meta is not None and arguments:
+                arguments = []
+                for argument in field.arguments:
+                    arg_type = meta.arg_types.get(argument.name)
+                    if arg_type is None or not _is_literal(argument.value.inner):
+                        arguments.append(argument)
+                        continue
+                    name = fresh(argument.name)
+                    definitions.append(
+                        VariableDefinition(name, _variable_type(arg_type))
+                    )
+                    bound[name] = to_variable_value(argument.value.inner)
+                    arguments.append(Argument(argument.name, Value(VarRef(name))))
+            selection_set = field.selection_set
+            if selection_set:
+                selection_set = hoist(
+                    selection_set, meta.type.core_type.name if meta else None
+                )
+            result.append(
+                Selection(
+                    dataclasses.replace(
+                        field, arguments=arguments, selection_set=selection_set
+                    )
+                )
+            )
+        return result
+
+    selection_set = hoist(query.selection_set, schema.query_type)
+    fragments = query.fragments and [
+        dataclasses.replace(
+            definition,
+            selection_set=hoist(definition.selection_set, definition.type_condition),
+        )
+        for definition in query.fragments
+    ]
+    return dataclasses.replace(
+        query,
+        selection_set=selection_set,
+        fragments=fragments,
+        variable_definitions=definitions,
+        variables=bound or None,
+    )
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+@dataclass
+class HTTPCacheEntry:
+    decoded: dict
+    etag: Optional[str]
+    expires: float
+
+
+class HTTPCache:
+    """Remembers GET responses for conditional requests, following HTTP caching headers.
+
+    Responses are fresh for their ``Cache-Control: max-age`` and served without a
+    request until then. Afterwards a request carrying ``If-None-Match`` revalidates
+    them, which the server can answer with a bodiless 304.
+    """
+
+    def __init__(
+        self, max_entries: int = 512, clock: Callable[[], float] = time.monotonic
+    ):
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[str, HTTPCacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[HTTPCacheEntry]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def is_fresh(self, entry: HTTPCacheEntry) -> bool:
+        return entry.expires > self._clock()
+
+    def store(self, url: str, headers: Mapping[str, str], decoded: dict):
+        headers = _lowercase(headers)
+        cache_control = headers.get("cache-control", "").lower()
+        etag = headers.get("etag")
+        if "no-store" in cache_control:
+            return
+        max_age = 0
+        if "no-cache" not in cache_control and (
+            match := _MAX_AGE.search(cache_control)
+        ):
+            max_age = int(match.group(1))
+        if etag is None and not max_age:
+            return
+        with self._lock:
+            self._entries[url] = HTTPCacheEntry(decoded, etag, self._clock() + max_age)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def revalidated(
+        self, url: str, entry: HTTPCacheEntry, headers: Mapping[str, str]
+    ) -> dict:
+        """Refreshes an entry confirmed by a 304, returning its data.
+
+        The entry is the one the request was conditioned on, since it may have
+        been evicted from the cache while the request was in flight.
+        """
+        self.store(url, {"etag": entry.etag, **_lowercase(headers)}, entry.decoded)
+        return entry.decoded
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _lowercase(headers: Mapping[str, str]) -> dict[str, str]:
+    return {name.lower(): value for name, value in headers.items()}
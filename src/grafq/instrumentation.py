@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+_build_time: ContextVar[float] = ContextVar("grafq_build_time", default=0.0)
+_introspecting: ContextVar[bool] = ContextVar("grafq_introspecting", default=False)
+
+
+def record_build(seconds: float):
+    """Attributes blueprint build time to the next operation executed in this context."""
+    _build_time.set(seconds)
+
+
+def _take_build_time() -> float:
+    seconds = _build_time.get()
+    if seconds:
+        _build_time.set(0.0)
+    return seconds
+
+
+@contextmanager
+def introspecting() -> Iterator[None]:
+    """Marks operations executed within the block as schema introspection."""
+    token = _introspecting.set(True)
+    try:
+        yield
+    finally:
+        _introspecting.reset(token)
+
+
+def is_introspecting() -> bool:
+    return _introspecting.get()
+
+
+@dataclass
+class OperationTimings:
+    """Breakdown of one operation, all durations in seconds."""
+
+    method: str
+    operation_name: Optional[str] = None
+    build: float = 0.0
+    render: float = 0.0
+    encode: float = 0.0
+    network: float = 0.0
+    decode: float = 0.0
+    error_parsing: float = 0.0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    introspection: bool = False
+    cached: bool = False
+    deduplicated: bool = False
+    hedged: bool = False
+    not_modified: bool = False
+    error: Optional[BaseException] = None
+
+    @property
+    def total(self) -> float:
+        return (
+            self.build
+            + self.render
+            + self.encode
+            + self.network
+            + self.decode
+            + self.error_parsing
+        )
+
+
+Hook = Callable[[OperationTimings], None]
+
+
+class Instrumentation:
+    """Reports an OperationTimings to every registered hook once an operation finishes.
+
+    Start hooks are called with the same (still empty) timings object when the
+    operation begins. Timings are only collected while at least one hook is
+    registered.
+    """
+
+    def __init__(self, hooks: Iterable[Hook] = (), start_hooks: Iterable[Hook] = ()):
+        self._hooks: list[Hook] = list(hooks)
+        self._start_hooks: list[Hook] = list(start_hooks)
+        self._lock = threading.Lock()
+        self.introspection_round_trips = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._hooks or self._start_hooks)
+
+    def add_hook(self, hook: Hook):
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Hook):
+        self._hooks.remove(hook)
+
+    def add_start_hook(self, hook: Hook):
+        self._start_hooks.append(hook)
+
+    def remove_start_hook(self, hook: Hook):
+        self._start_hooks.remove(hook)
+
+    def start(self, method: str, operation_name: Optional[str]) -> OperationTimings:
+        timings = OperationTimings(
+            method=method,
+            operation_name=operation_name,
+            build=_take_build_time(),
+            introspection=_introspecting.get(),
+        )
+        for hook in self._start_hooks:
+            hook(timings)
+        return timings
+
+    def finish(self, timings: OperationTimings):
+        if timings.introspection and not (timings.cached or timings.deduplicated):
+            with self._lock:
+                self.introspection_round_trips += 1
+        for hook in self._hooks:
+            hook(timings)
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import math
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from dataclasses import dataclass
 from enum import Enum
+from functools import cached_property
+from itertools import repeat
+from json.encoder import encode_basestring
+from operator import attrgetter
 from typing import Optional, Union, TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -27,7 +33,7 @@ class ID:
     value: str
 
     def __str__(self):
-        return f'"{self.value}"'
+        return encode_basestring(self.value)
 
 
 @dataclass(frozen=True, order=True)
@@ -56,21 +62,115 @@ class VarRef:
         return f"${self.name}"
 
 
+@dataclass(frozen=True, order=True)
+class EnumLiteral:
+    """An enum value known only by its name, e.g. as parsed from a document."""
+
+    name: str
+
+    def __str__(self):
+        return self.name
+
+
 ValueRawType = Union[
-    str, int, float, bool, NullType, Enum, list[Value], dict[str, Value], VarRef
+    str,
+    int,
+    float,
+    bool,
+    NullType,
+    Enum,
+    EnumLiteral,
+    list[Value],
+    dict[str, Value],
+    VarRef,
 ]
 
 
+def _float(value: float) -> str:
+    if not math.isfinite(value):
+        raise ValueError(f"Not representable: {value}")
+    return repr(value)
+
+
+# JSON string escapes are all valid GraphQL escapes, so the C encoder can be reused
+_SCALARS = {
+    str: encode_basestring,
+    bool: lambda value: "true" if value else "false",
+    int: int.__repr__,
+    float: _float,
+}
+
+
+def _leaf(value) -> Optional[str]:
+    """Encodes anything but lists and objects, which are left to the caller."""
+    kind = type(value)
+    encode = _SCALARS.get(kind)
+    if encode is None:
+        if isinstance(value, (list, dict, Value)):
+            return None
+        if isinstance(value, Enum):
+            encode = attrgetter("name")
+        elif isinstance(value, str):
+            encode = encode_basestring
+        elif isinstance(value, float):
+            encode = _float
+        else:
+            # ints, variable references, null, IDs and scalar extensions
+            encode = str
+        # remembered per type, so repeated enums and references take the fast path
+        _SCALARS[kind] = encode
+    return encode(value)
+
+
 def _str(value: ValueRawType) -> str:
-    if isinstance(value, str):
-        return f'"{value}"'
-    if isinstance(value, bool):
-        return str(value).lower()
-    if isinstance(value, list):
-        return "[" + ", ".join(_str(v) for v in value) + "]"
-    if isinstance(value, dict):
-        return "{" + ", ".join(f"{k}: {_str(v)}" for k, v in value.items()) + "}"
-    return str(value)
+    while isinstance(value, Value):
+        value = value.inner
+    if (encoded := _leaf(value)) is not None:
+        return encoded
+    # iterative, so deeply nested literals can't exhaust the recursion limit: each
+    # open list or object is a frame of (remaining entries, encoded entries, closing
+    # bracket, key in the parent object)
+    stack: list[tuple[Iterator, list[str], str, Optional[str]]] = []
+    entries: Iterator = iter(((None, value),))
+    encoded_entries: list[str] = []
+    closing, parent_key = "", None
+    while True:
+        for key, item in entries:
+            kind = type(item)
+            encode = _SCALARS.get(kind)
+            if encode is not None:
+                encoded = encode(item)
+            elif kind is list:
+                encoded = None
+                # lists of one scalar type are joined in a single pass
+                kinds = set(map(type, item))
+                if len(kinds) == 1 and (encode := _SCALARS.get(kinds.pop())):
+                    encoded = "[" + ", ".join(map(encode, item)) + "]"
+            elif kind is dict:
+                encoded = None
+            else:
+                while isinstance(item, Value):
+                    item = item.inner
+                encoded = _leaf(item)
+            if encoded is not None:
+                encoded_entries.append(encoded if key is None else f"{key}: {encoded}")
+                continue
+            stack.append((entries, encoded_entries, closing, parent_key))
+            if isinstance(item, list):
+                entries, closing = zip(repeat(None), item), "]"
+            else:
+                entries, closing = iter(item.items()), "}"
+            encoded_entries, parent_key = [], key
+            break
+        else:
+            if not stack:
+                return encoded_entries[0]
+            encoded = (
+                ("[" if closing == "]" else "{") + ", ".join(encoded_entries) + closing
+            )
+            key = parent_key
+            entries, encoded_entries, closing, parent_key = stack.pop()
+            encoded_entries.append(encoded if key is None else f"{key}: {encoded}")
 
 
 @dataclass(frozen=True, order=True)
@@ -144,12 +244,31 @@ class Argument:
         return f"{self.name}:{self.value}"
 
 
+@dataclass(frozen=True, order=True)
+class Directive:
+    name: str
+    arguments: Optional[list[Argument]] = None
+
+    def pretty(self) -> str:
+        s = "@" + self.name
+        if self.arguments:
+            s += "(" + ", ".join(argument.pretty() for argument in self.arguments) + ")"
+        return s
+
+    def __str__(self) -> str:
+        s = "@" + self.name
+        if self.arguments:
+            s += "(" + ",".join(str(argument) for argument in self.arguments) + ")"
+        return s
+
+
 @dataclass(frozen=True, order=True)
 class Field:
     name: str
     alias: Optional[str] = None
     arguments: Optional[list[Argument]] = None
-    selection_set: Optional[list[Selection]] = None
+    selection_set: Optional[list[SelectionType]] = None
+    directives: Optional[list[Directive]] = None
 
     def pretty(self) -> str:
         s = ""
@@ -158,6 +277,8 @@ class Field:
         s += self.name
         if self.arguments:
             s += "(" + ", ".join(argument.pretty() for argument in self.arguments) + ")"
+        for directive in self.directives or ():
+            s += " " + directive.pretty()
         if self.selection_set:
             selections = "\n".join(
                 _indent(selection.pretty()) for selection in self.selection_set
@@ -166,12 +287,19 @@ class Field:
         return s
 
     def __str__(self) -> str:
+        return self._rendered
+
+    @cached_property
+    def _rendered(self) -> str:
+        # nodes are immutable, so unchanged subtrees of rebuilt queries render once
         s = ""
         if self.alias:
             s += self.alias + ":"
         s += self.name
         if self.arguments:
             s += "(" + ",".join(str(argument) for argument in self.arguments) + ")"
+        for directive in self.directives or ():
+            s += str(directive)
         if self.selection_set:
             s += (
                 "{" + ",".join(str(selection) for selection in self.selection_set) + "}"
@@ -190,23 +318,114 @@ class Selection:
         return str(self.field)
 
 
+@dataclass(frozen=True, order=True)
+class FragmentSpread:
+    name: str
+    directives: Optional[list[Directive]] = None
+
+    def pretty(self) -> str:
+        s = f"...{self.name}"
+        for directive in self.directives or ():
+            s += " " + directive.pretty()
+        return s
+
+    def __str__(self) -> str:
+        s = f"...{self.name}"
+        for directive in self.directives or ():
+            s += str(directive)
+        return s
+
+
+def selection_block(selection_set: list[SelectionType]) -> str:
+    return "{" + ",".join(str(selection) for selection in selection_set) + "}"
+
+
+def _pretty_selection_block(selection_set: list[SelectionType]) -> str:
+    selections = "\n".join(_indent(selection.pretty()) for selection in selection_set)
+    return "{\n" + selections + "\n}"
+
+
+@dataclass(frozen=True, order=True)
+class InlineFragment:
+    selection_set: list[SelectionType]
+    type_condition: Optional[str] = None
+    directives: Optional[list[Directive]] = None
+
+    def pretty(self) -> str:
+        s = "..."
+        if self.type_condition:
+            s += " on " + self.type_condition
+        for directive in self.directives or ():
+            s += " " + directive.pretty()
+        return s + " " + _pretty_selection_block(self.selection_set)
+
+    def __str__(self) -> str:
+        return self._rendered
+
+    @cached_property
+    def _rendered(self) -> str:
+        s = "..."
+        if self.type_condition:
+            s += "on " + self.type_condition
+        for directive in self.directives or ():
+            s += str(directive)
+        return s + selection_block(self.selection_set)
+
+
+SelectionType = Union[Selection, FragmentSpread, InlineFragment]
+
+
+@dataclass(frozen=True, order=True)
+class FragmentDefinition:
+    name: str
+    type_condition: str
+    selection_set: list[SelectionType]
+
+    def pretty(self) -> str:
+        return (
+            f"fragment {self.name} on {self.type_condition} "
+            + _pretty_selection_block(self.selection_set)
+        )
+
+    def __str__(self) -> str:
+        return self._rendered
+
+    @cached_property
+    def _rendered(self) -> str:
+        return f"fragment {self.name} on {self.type_condition}" + selection_block(
+            self.selection_set
+        )
+
+
 @dataclass(frozen=True)
 class Query:
-    selection_set: list[Selection]
+    selection_set: list[SelectionType]
     name: Optional[str] = None
     variable_definitions: Optional[list[VariableDefinition]] = None
     shorthand: bool = True
     client: Optional[Client] = None
+    # values bound at build time, e.g. hoisted literals
+    variables: Optional[dict[str, ValueRawType]] = None
+    fragments: Optional[list[FragmentDefinition]] = None
+
+    def bind(
+        self, variables: Optional[dict[str, ValueRawType]]
+    ) -> Optional[dict[str, ValueRawType]]:
+        """Merges the bound variables with those given at run time, which take precedence."""
+        if not self.variables:
+            return variables
+        return {**self.variables, **(variables or {})}
 
     def run(
         self,
         variables: Optional[dict[str, ValueRawType]] = None,
         client: Optional[Client] = None,
+        validate: bool = False,
     ) -> dict:
         client = client or self.client
         if not client:
             raise RuntimeError("Must provide a client to execute query")
-        return client.post(self, variables)
+        return client.post(self, variables, validate=validate)
 
     def pretty(self) -> str:
         if self.shorthand and not self.variable_definitions:
@@ -226,16 +445,15 @@ class Query:
             else:
                 s += " "
         if self.selection_set:
-            return (
-                s
-                + "{\n"
-                + "\n".join(
-                    _indent(selection.pretty()) for selection in self.selection_set
-                )
-                + "\n}"
+            s += "{\n" + "\n".join(
+                _indent(selection.pretty()) for selection in self.selection_set
             )
+            s += "\n}"
         else:
-            return s + "{ }"
+            s += "{ }"
+        for fragment in self.fragments or ():
+            s += "\n\n" + fragment.pretty()
+        return s
 
     def __str__(self) -> str:
         if self.shorthand and not self.variable_definitions:
@@ -252,6 +470,7 @@ class Query:
                     )
                     + ")"
                 )
-        return (
-            s + "{" + ",".join(str(selection) for selection in self.selection_set) + "}"
-        )
+        s += "{" + ",".join(str(selection) for selection in self.selection_set) + "}"
+        for fragment in self.fragments or ():
+            s += str(fragment)
+        return s
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from collections import Counter
+from collections.abc import Sequence
+from typing import Optional, TYPE_CHECKING
+
+from grafq.instrumentation import OperationTimings
+
+if TYPE_CHECKING:
+    from grafq.client import Client
+    from grafq.concurrency import AdaptiveLimiter
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ANONYMOUS = "anonymous"
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # the last slot counts observations above every bucket bound
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        total = 0
+        result = []
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket containing the q-quantile."""
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+class MetricsCollector:
+    """Aggregates operation timings in memory, exported as a snapshot or in Prometheus format.
+
+    Attach it to a client with ``attach``, which registers the instrumentation hooks
+    and picks up the client's cache and deduplication statistics.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self._buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._latencies: dict[str, Histogram] = {}
+        self._operations: Counter[str] = Counter()
+        self._errors: Counter[tuple[str, str]] = Counter()
+        self._cached: Counter[str] = Counter()
+        self._bytes_sent = 0
+        self._bytes_received = 0
+        self._in_flight = 0
+        self._client: Optional[Client] = None
+        self._limiter: Optional[AdaptiveLimiter] = None
+
+    def attach(self, client: Client) -> MetricsCollector:
+        self._client = client
+        client.instrumentation.add_start_hook(self.on_start)
+        client.instrumentation.add_hook(self)
+        return self
+
+    def watch_limiter(self, limiter: AdaptiveLimiter) -> MetricsCollector:
+        """Exports the current limit of an adaptive concurrency limiter."""
+        self._limiter = limiter
+        return self
+
+    def on_start(self, timings: OperationTimings):
+        with self._lock:
+            self._in_flight += 1
+
+    def __call__(self, timings: OperationTimings):
+        name = timings.operation_name or ANONYMOUS
+        with self._lock:
+            self._in_flight -= 1
+            self._operations[name] += 1
+            if timings.cached:
+                self._cached[name] += 1
+            else:
+                if (histogram := self._latencies.get(name)) is None:
+                    histogram = self._latencies[name] = Histogram(self._buckets)
+                histogram.observe(timings.total)
+            if timings.error is not None:
+                self._errors[(name, type(timings.error).__name__)] += 1
+            self._bytes_sent += timings.bytes_sent
+            self._bytes_received += timings.bytes_received
+
+    def latency(self, operation_name: Optional[str] = None) -> Optional[Histogram]:
+        return self._latencies.get(operation_name or ANONYMOUS)
+
+    def _gauges(self) -> dict[str, float]:
+        gauges = {}
+        if self._limiter is not None:
+            gauges["concurrency_limit"] = self._limiter.limit
+        if self._client is not None and self._client.cache is not None:
+            gauges["response_cache_hit_rate"] = self._client.cache.stats.hit_rate
+        return gauges
+
+    def _counters(self) -> dict[str, int]:
+        """Totals kept by the client and its policies, which only ever increase."""
+        client = self._client
+        if client is None:
+            return {}
+        counters = {
+            "introspection_round_trips": (
+                client.instrumentation.introspection_round_trips
+            )
+        }
+        if client.cache is not None:
+            counters["response_cache_hits"] = client.cache.stats.hits
+            counters["response_cache_misses"] = client.cache.stats.misses
+        if client.single_flight is not None:
+            counters["deduplicated_requests"] = client.single_flight.stats.collapsed
+        if client.hedge is not None:
+            counters["hedged_requests"] = client.hedge.stats.hedged
+            counters["hedges_won"] = client.hedge.stats.won
+        return counters
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            operations = {}
+            for name, count in self._operations.items():
+                histogram = self._latencies.get(name)
+                errors = {
+                    error: errors
+                    for (operation, error), errors in self._errors.items()
+                    if operation == name
+                }
+                operations[name] = {
+                    "count": count,
+                    "cached": self._cached[name],
+                    "errors": errors,
+                    "error_rate": sum(errors.values()) / count,
+                    "latency": (
+                        {
+                            "count": histogram.count,
+                            "sum": histogram.sum,
+                            "p50": histogram.quantile(0.5),
+                            "p95": histogram.quantile(0.95),
+                            "p99": histogram.quantile(0.99),
+                        }
+                        if histogram
+                        else None
+                    ),
+                }
+            return {
+                "operations": operations,
+                "in_flight": self._in_flight,
+                "bytes_sent": self._bytes_sent,
+                "bytes_received": self._bytes_received,
+                **self._counters(),
+                **self._gauges(),
+            }
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# HELP grafq_operation_duration_seconds Latency of uncached operations.",
+            "# TYPE grafq_operation_duration_seconds histogram",
+        ]
+        with self._lock:
+            for name, histogram in sorted(self._latencies.items()):
+                label = f'operation="{_escape(name)}"'
+                for bound, total in histogram.cumulative():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        f'grafq_operation_duration_seconds_bucket{{{label},le="{le}"}} {total}'
+                    )
+                lines.append(
+                    f"grafq_operation_duration_seconds_sum{{{label}}} {histogram.sum}"
+                )
+                lines.append(
+                    f"grafq_operation_duration_seconds_count{{{label}}} {histogram.count}"
+                )
+            lines.append("# TYPE grafq_operations_total counter")
+            for name, count in sorted(self._operations.items()):
+                lines.append(
+                    f'grafq_operations_total{{operation="{_escape(name)}"}} {count}'
+                )
+            lines.append("# TYPE grafq_cached_operations_total counter")
+            for name, count in sorted(self._cached.items()):
+                lines.append(
+                    f'grafq_cached_operations_total{{operation="{_escape(name)}"}} {count}'
+                )
+            lines.append("# TYPE grafq_operation_errors_total counter")
+            for (name, error), count in sorted(self._errors.items()):
+                lines.append(
+                    f'grafq_operation_errors_total{{operation="{_escape(name)}",type="{error}"}} {count}'
+                )
+            lines.append("# TYPE grafq_operations_in_flight gauge")
+            lines.append(f"grafq_operations_in_flight {self._in_flight}")
+            lines.append("# TYPE grafq_bytes_sent_total counter")
+            lines.append(f"grafq_bytes_sent_total {self._bytes_sent}")
+            lines.append("# TYPE grafq_bytes_received_total counter")
+            lines.append(f"grafq_bytes_received_total {self._bytes_received}")
+        for name, value in self._counters().items():
+            lines.append(f"# TYPE grafq_{name}_total counter")
+            lines.append(f"grafq_{name}_total {value}")
+        for name, value in self._gauges().items():
+            lines.append(f"# TYPE grafq_{name} gauge")
+            lines.append(f"grafq_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
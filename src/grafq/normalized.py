@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import threading
+from dataclasses import dataclass
+from typing import Optional, TYPE_CHECKING
+
+from grafq.fragments import expand_fragments, response_keys, used_variables
+from grafq.language import (
+    Directive,
+    Field,
+    FragmentSpread,
+    InlineFragment,
+    Query,
+    Selection,
+    SelectionType,
+    ValueRawType,
+    VarRef,
+)
+
+if TYPE_CHECKING:
+    from grafq.schema import Schema
+
+
+TYPENAME = "__typename"
+
+
+@dataclass(frozen=True)
+class EntityRef:
+    key: str
+
+
+def _condition_key(type_name: str) -> str:
+    return f"... on {type_name}"
+
+
+class _Missing:
+    pass
+
+
+Missing = _Missing()
+
+
+def _resolve(value: ValueRawType, variables: dict[str, ValueRawType]):
+    if isinstance(value, VarRef):
+        return variables.get(value.name)
+    if isinstance(value, list):
+        return [_resolve(item, variables) for item in value]
+    if isinstance(value, dict):
+        return {key: _resolve(item, variables) for key, item in value.items()}
+    return value
+
+
+def _storage_key(field: Field, variables: dict[str, ValueRawType]) -> str:
+    if not field.arguments:
+        return field.name
+    arguments = {
+        argument.name: _resolve(argument.value.inner, variables)
+        for argument in field.arguments
+    }
+    return f"{field.name}({json.dumps(arguments, sort_keys=True, default=str)})"
+
+
+def is_included(
+    directives: Optional[list[Directive]], variables: dict[str, ValueRawType]
+) -> bool:
+    """Whether ``@include`` and ``@skip`` let a selection through, given the variables."""
+    for directive in directives or ():
+        if directive.name in ("include", "skip"):
+            condition = next(
+                (
+                    argument.value.inner
+                    for argument in directive.arguments or ()
+                    if argument.name == "if"
+                ),
+                None,
+            )
+            if bool(_resolve(condition, variables)) != (directive.name == "include"):
+                return False
+    return True
+
+
+def with_identity_fields(query: Query, schema: Optional[Schema] = None) -> Query:
+    """Adds ``__typename`` (and ``id`` where the schema defines it) to every object selection."""
+
+    def identify(
+        selections: list[SelectionType],
+        type_name: Optional[str],
+        root: bool = False,
+        fragment: bool = False,
+    ) -> list[SelectionType]:
+        fields = schema.get_type_fields(type_name) if schema and type_name else None
+        result = []
+        for selection in selections:
+            if isinstance(selection, FragmentSpread):
+                result.append(selection)
+                continue
+            if isinstance(selection, InlineFragment):
+                result.append(
+                    dataclasses.replace(
+                        selection,
+                        selection_set=identify(
+                            selection.selection_set,
+                            selection.type_condition or type_name,
+                            root,
+                            fragment=True,
+                        ),
+                    )
+                )
+                continue
+            field = selection.field
+            if field.selection_set:
+                meta = fields.get(field.name) if fields else None
+                field = dataclasses.replace(
+                    field,
+                    selection_set=identify(
+                        field.selection_set,
+                        meta.type.core_type.name if meta else None,
+                    ),
+                )
+            result.append(Selection(field))
+        if not root and not fragment:
+            names = {
+                selection.field.name
+                for selection in result
+                if isinstance(selection, Selection)
+            }
+            if TYPENAME not in names:
+                result.append(Selection(Field(TYPENAME)))
+            if fields and "id" in fields and "id" not in names:
+                result.append(Selection(Field("id")))
+        return result
+
+    return dataclasses.replace(
+        query,
+        selection_set=identify(
+            query.selection_set, schema.query_type if schema else None, root=True
+        ),
+        # the identity of objects selected through fragments is added by their parent
+        fragments=(
+            [
+                dataclasses.replace(
+                    definition,
+                    selection_set=identify(
+                        definition.selection_set,
+                        definition.type_condition,
+                        fragment=True,
+                    ),
+                )
+                for definition in query.fragments
+            ]
+            if query.fragments
+            else query.fragments
+        ),
+    )
+
+
+class NormalizedCache:
+    """Apollo-style store splitting responses into entities keyed by ``__typename`` and ``id``.
+
+    Objects without both identity fields are embedded in their parent record. Queries
+    are answered from the store per root field: fully cached root fields are served
+    locally and only the remaining ones need to be fetched, and fields left out by
+    ``@include`` or ``@skip`` are never missing. Objects remember which
+    fragment type conditions other than their ``__typename`` applied to them, as
+    interfaces and unions can't be resolved without the schema.
+    """
+
+    def __init__(self):
+        self._root: dict = {}
+        self._entities: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def entity(self, typename: str, id_: str) -> Optional[dict]:
+        return self._entities.get(f"{typename}:{id_}")
+
+    def clear(self):
+        with self._lock:
+            self._root.clear()
+            self._entities.clear()
+
+    def write(
+        self,
+        query: Query,
+        data: dict,
+        variables: Optional[dict[str, ValueRawType]] = None,
+    ):
+        query = expand_fragments(query)
+        variables = self._with_defaults(query, variables)
+        with self._lock:
+            self._write_selections(self._root, query.selection_set, data, variables)
+
+    def _write_selections(
+        self,
+        record: dict,
+        selections: list[SelectionType],
+        data: dict,
+        variables: dict[str, ValueRawType],
+    ):
+        for selection in selections:
+            if isinstance(selection, InlineFragment):
+                if not is_included(selection.directives, variables):
+                    continue
+                condition = selection.type_condition
+                applies = True
+                if condition is not None:
+                    # the condition may name an interface or union, which the server
+                    # resolved for us if the fragment's fields came back
+                    applies = condition == data.get(TYPENAME) or all(
+                        key in data for key in response_keys(selection.selection_set)
+                    )
+                    record[_condition_key(condition)] = applies
+                if applies:
+                    self._write_selections(
+                        record, selection.selection_set, data, variables
+                    )
+                continue
+            field = selection.field
+            response_key = field.alias or field.name
+            if response_key not in data:
+                continue
+            key = _storage_key(field, variables)
+            record[key] = self._normalize(
+                record.get(key), field, data[response_key], variables
+            )
+
+    def _normalize(self, existing, field: Field, value, variables):
+        if value is None or not field.selection_set:
+            return value
+        if isinstance(value, list):
+            return [self._normalize(None, field, item, variables) for item in value]
+        typename, id_ = value.get(TYPENAME), value.get("id")
+        if typename is not None and id_ is not None:
+            key = f"{typename}:{id_}"
+            entity = self._entities.setdefault(key, {})
+            self._write_selections(entity, field.selection_set, value, variables)
+            return EntityRef(key)
+        embedded = existing if isinstance(existing, dict) else {}
+        self._write_selections(embedded, field.selection_set, value, variables)
+        return embedded
+
+    def read(
+        self,
+        query: Query,
+        variables: Optional[dict[str, ValueRawType]] = None,
+    ) -> tuple[dict, Optional[Query]]:
+        """Answers a query from the store.
+
+        Returns the data of every root field that could be fully resolved, and a query
+        selecting only the remaining root fields (or None if nothing is missing).
+        """
+        query = expand_fragments(query)
+        variables = self._with_defaults(query, variables)
+        data = {}
+        missing = []
+        with self._lock:
+            for selection in query.selection_set:
+                if isinstance(selection, InlineFragment):
+                    missing.append(selection)
+                    continue
+                field = selection.field
+                if not is_included(field.directives, variables):
+                    continue
+                value = self._read_field(self._root, field, variables)
+                if value is Missing:
+                    missing.append(selection)
+                else:
+                    data[field.alias or field.name] = value
+        if not missing:
+            return data, None
+        used = used_variables(missing)
+        return data, dataclasses.replace(
+            query,
+            selection_set=missing,
+            fragments=None,
+            variable_definitions=[
+                definition
+                for definition in query.variable_definitions or ()
+                if definition.name in used
+            ],
+        )
+
+    def _read_field(self, record: dict, field: Field, variables):
+        key = _storage_key(field, variables)
+        if key not in record:
+            return Missing
+        return self._denormalize(record[key], field, variables)
+
+    def _denormalize(self, value, field: Field, variables):
+        if value is None or not field.selection_set:
+            return value
+        if isinstance(value, list):
+            items = []
+            for item in value:
+                item = self._denormalize(item, field, variables)
+                if item is Missing:
+                    return Missing
+                items.append(item)
+            return items
+        if isinstance(value, EntityRef):
+            value = self._entities.get(value.key)
+            if value is None:
+                return Missing
+        result = {}
+        if not self._read_selections(value, field.selection_set, variables, result):
+            return Missing
+        return result
+
+    def _read_selections(
+        self, record: dict, selections: list[SelectionType], variables, result: dict
+    ) -> bool:
+        for selection in selections:
+            if isinstance(selection, InlineFragment):
+                if not is_included(selection.directives, variables):
+                    continue
+                condition = selection.type_condition
+                if condition not in (None, record.get(TYPENAME)):
+                    applies = record.get(_condition_key(condition))
+                    if applies is None:
+                        return False
+                    if not applies:
+                        continue
+                if not self._read_selections(
+                    record, selection.selection_set, variables, result
+                ):
+                    return False
+                continue
+            child = selection.field
+            if not is_included(child.directives, variables):
+                continue
+            child_value = self._read_field(record, child, variables)
+            if child_value is Missing:
+                return False
+            result[child.alias or child.name] = child_value
+        return True
+
+    @staticmethod
+    def _with_defaults(
+        query: Query, variables: Optional[dict[str, ValueRawType]]
+    ) -> dict[str, ValueRawType]:
+        resolved = {
+            definition.name: definition.default_value.inner
+            for definition in query.variable_definitions or ()
+            if definition.default_value is not None
+        }
+        resolved.update(variables or {})
+        return resolved
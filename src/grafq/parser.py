@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import re
+from typing import Optional, Union
+
+from grafq.errors import GraphQLSyntaxError, Location
+from grafq.language import (
+    Argument,
+    Directive,
+    EnumLiteral,
+    Field,
+    FragmentDefinition,
+    FragmentSpread,
+    InlineFragment,
+    ListType,
+    NamedType,
+    NonNullType,
+    Null,
+    Query,
+    Selection,
+    SelectionType,
+    Value,
+    ValueRawType,
+    VariableDefinition,
+    VariableType,
+    VarRef,
+)
+
+_NAME = "name"
+_INT = "int"
+_FLOAT = "float"
+_STRING = "string"
+_BLOCK_STRING = "block string"
+_EOF = "end of document"
+
+# one alternation for every token, so the document is scanned in a single pass of
+# C-level matching; punctuators are their own token kind
+_TOKEN = re.compile(
+    r"""
+    (?P<ignored>[\s,\ufeff]+|\#[^\n\r]*)
+    |(?P<punctuator>\.\.\.|[!$&():=@\[\]{}|])
+    |(?P<name>[_A-Za-z][_0-9A-Za-z]*)
+    |(?P<float>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+(?:[eE][+-]?[0-9]+)?|[eE][+-]?[0-9]+)
+        (?![_A-Za-z.0-9]))
+    |(?P<int>-?(?:0|[1-9][0-9]*)(?![_A-Za-z.0-9]))
+    |(?P<block>\"\"\"(?:\\\"\"\"|(?!\"\"\").)*\"\"\")
+    |(?P<string>"(?:[^"\\\n\r]|\\(?:["\\/bfnrt]|u[0-9A-Fa-f]{4}))*")
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_KINDS = {
+    "name": _NAME,
+    "float": _FLOAT,
+    "int": _INT,
+    "block": _BLOCK_STRING,
+    "string": _STRING,
+}
+
+_CONSTANTS = {"true": True, "false": False, "null": Null}
+
+Token = tuple[str, str, int]
+
+
+def _location(document: str, position: int) -> Location:
+    line = document.count("\n", 0, position) + 1
+    return Location(line, position - document.rfind("\n", 0, position))
+
+
+def _tokenize(document: str) -> list[Token]:
+    """Splits a document into (kind, text, position) tokens, ending with one for EOF."""
+    tokens = []
+    append = tokens.append
+    match = _TOKEN.match
+    position, end = 0, len(document)
+    while position < end:
+        found = match(document, position)
+        if found is None:
+            message = (
+                "Unterminated string"
+                if document[position] == '"'
+                else f"Unexpected character {document[position]!r}"
+            )
+            raise GraphQLSyntaxError(message, _location(document, position))
+        group = found.lastgroup
+        if group != "ignored":
+            text = found.group()
+            append((text if group == "punctuator" else _KINDS[group], text, position))
+        position = found.end()
+    append((_EOF, "", end))
+    return tokens
+
+
+def _block_string_value(token: str) -> str:
+    """The value of a block string, with its common indentation and blank edges removed."""
+    lines = token[3:-3].replace('\\"""', '"""').splitlines()
+    indents = [
+        len(line) - len(line.lstrip(" \t")) for line in lines[1:] if line.strip(" \t")
+    ]
+    if indents:
+        common = min(indents)
+        lines[1:] = [line[common:] for line in lines[1:]]
+    while lines and not lines[0].strip(" \t"):
+        lines.pop(0)
+    while lines and not lines[-1].strip(" \t"):
+        lines.pop()
+    return "\n".join(lines)
+
+
+class _Parser:
+    """Recursive descent over the tokens of an executable document."""
+
+    def __init__(self, document: str):
+        self._document = document
+        self._tokens = _tokenize(document)
+        self._index = 0
+
+    def _peek(self) -> str:
+        return self._tokens[self._index][0]
+
+    def _skip(self, kind: str) -> bool:
+        if self._tokens[self._index][0] == kind:
+            self._index += 1
+            return True
+        return False
+
+    def _expect(self, kind: str) -> str:
+        token = self._tokens[self._index]
+        if token[0] != kind:
+            raise self._unexpected(f"a {kind}" if kind == _NAME else f'"{kind}"')
+        self._index += 1
+        return token[1]
+
+    def _error(self, message: str) -> GraphQLSyntaxError:
+        position = self._tokens[self._index][2]
+        return GraphQLSyntaxError(message, _location(self._document, position))
+
+    def _unexpected(self, expected: str) -> GraphQLSyntaxError:
+        kind, text, _ = self._tokens[self._index]
+        found = _EOF if kind == _EOF else f'"{text}"'
+        return self._error(f"Expected {expected}, found {found}")
+
+    def document(self) -> Query:
+        operation = None
+        fragments = []
+        while (token := self._tokens[self._index])[0] != _EOF:
+            kind, text, _ = token
+            if kind == "{" or (kind == _NAME and text == "query"):
+                if operation is not None:
+                    raise self._error(
+                        "Documents with more than one operation are not supported"
+                    )
+                operation = self._operation()
+            elif kind == _NAME and text == "fragment":
+                fragments.append(self._fragment_definition())
+            elif kind == _NAME and text in ("mutation", "subscription"):
+                raise self._error(f"Unsupported operation {text}")
+            else:
+                raise self._unexpected("a definition")
+        if operation is None:
+            raise self._error("Document contains no query")
+        selection_set, name, variable_definitions, shorthand = operation
+        return Query(
+            selection_set,
+            name=name,
+            variable_definitions=variable_definitions,
+            shorthand=shorthand,
+            fragments=fragments or None,
+        )
+
+    def _operation(
+        self,
+    ) -> tuple[list[SelectionType], Optional[str], list[VariableDefinition], bool]:
+        if self._peek() == "{":
+            return self._selection_set(), None, [], True
+        self._index += 1
+        name = self._expect(_NAME) if self._peek() == _NAME else None
+        variable_definitions = (
+            self._variable_definitions() if self._peek() == "(" else []
+        )
+        if self._peek() == "@":
+            raise self._error("Directives on operations are not supported")
+        return self._selection_set(), name, variable_definitions, False
+
+    def _variable_definitions(self) -> list[VariableDefinition]:
+        self._expect("(")
+        definitions = []
+        while True:
+            self._expect("$")
+            name = self._expect(_NAME)
+            self._expect(":")
+            variable_type = self._type()
+            default_value = Value(self._value(True)) if self._skip("=") else None
+            if self._peek() == "@":
+                raise self._error("Directives on variables are not supported")
+            definitions.append(VariableDefinition(name, variable_type, default_value))
+            if self._skip(")"):
+                return definitions
+
+    def _type(self) -> VariableType:
+        if self._skip("["):
+            variable_type = ListType(self._type())
+            self._expect("]")
+        else:
+            variable_type = NamedType(self._expect(_NAME))
+        if self._skip("!"):
+            return NonNullType(variable_type)
+        return variable_type
+
+    def _fragment_definition(self) -> FragmentDefinition:
+        self._index += 1
+        if self._tokens[self._index][1] == "on":
+            raise self._unexpected("a fragment name")
+        name = self._expect(_NAME)
+        if self._tokens[self._index][1] != "on":
+            raise self._unexpected('"on"')
+        self._index += 1
+        type_condition = self._expect(_NAME)
+        if self._peek() == "@":
+            raise self._error("Directives on fragment definitions are not supported")
+        return FragmentDefinition(name, type_condition, self._selection_set())
+
+    def _selection_set(self) -> list[SelectionType]:
+        self._expect("{")
+        selections = []
+        while True:
+            selections.append(self._selection())
+            if self._skip("}"):
+                return selections
+
+    def _selection(self) -> SelectionType:
+        if not self._skip("..."):
+            return Selection(self._field())
+        kind, text, _ = self._tokens[self._index]
+        type_condition = None
+        if kind == _NAME:
+            self._index += 1
+            if text != "on":
+                return FragmentSpread(text, self._directives())
+            type_condition = self._expect(_NAME)
+        directives = self._directives()
+        return InlineFragment(self._selection_set(), type_condition, directives)
+
+    def _field(self) -> Field:
+        name = self._expect(_NAME)
+        alias = None
+        if self._skip(":"):
+            alias, name = name, self._expect(_NAME)
+        arguments = self._arguments() if self._peek() == "(" else None
+        directives = self._directives()
+        selection_set = self._selection_set() if self._peek() == "{" else None
+        return Field(name, alias, arguments, selection_set, directives)
+
+    def _arguments(self) -> list[Argument]:
+        self._expect("(")
+        arguments = []
+        while True:
+            name = self._expect(_NAME)
+            self._expect(":")
+            arguments.append(Argument(name, Value(self._value(False))))
+            if self._skip(")"):
+                return arguments
+
+    def _directives(self) -> Optional[list[Directive]]:
+        directives = None
+        while self._skip("@"):
+            name = self._expect(_NAME)
+            arguments = self._arguments() if self._peek() == "(" else None
+            if directives is None:
+                directives = []
+            directives.append(Directive(name, arguments))
+        return directives
+
+    def _value(self, const: bool) -> ValueRawType:
+        kind, text, _ = self._tokens[self._index]
+        self._index += 1
+        if kind == _STRING:
+            # JSON and GraphQL share their escape sequences
+            return json.loads(text, strict=False) if "\\" in text else text[1:-1]
+        if kind == _NAME:
+            if text in _CONSTANTS:
+                return _CONSTANTS[text]
+            return EnumLiteral(text)
+        if kind == _INT:
+            return int(text)
+        if kind == _FLOAT:
+            return float(text)
+        if kind == "$" and not const:
+            return VarRef(self._expect(_NAME))
+        if kind == "[":
+            items = []
+            while not self._skip("]"):
+                items.append(self._value(const))
+            return items
+        if kind == "{":
+            fields = {}
+            while not self._skip("}"):
+                name = self._expect(_NAME)
+                self._expect(":")
+                fields[name] = self._value(const)
+            return fields
+        if kind == _BLOCK_STRING:
+            return _block_string_value(text)
+        self._index -= 1
+        if kind == "$":
+            raise self._error("Variables are not allowed in constant values")
+        raise self._unexpected("a value")
+
+
+@functools.lru_cache(maxsize=256)
+def parse(document: str) -> Query:
+    """Parses a document with one query, and the fragments it uses, into the AST.
+
+    Results are cached by document, so repeated parses share the same query.
+    """
+    return _Parser(document).document()
+
+
+def load(path: Union[str, os.PathLike]) -> Query:
+    with open(path, encoding="utf-8") as file:
+        return parse(file.read())
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+from collections.abc import Iterator
+
+from grafq.errors import OperationError
+from grafq.fragments import expand_fragments, used_variables
+from grafq.language import Field, InlineFragment, Query, Selection, SelectionType
+
+PathKey = Union[str, int]
+
+
+def _fields(selections: list[SelectionType]) -> Iterator[Field]:
+    for selection in selections:
+        if isinstance(selection, InlineFragment):
+            yield from _fields(selection.selection_set)
+        else:
+            yield selection.field
+
+
+def locate(query: Query, path: Optional[list[PathKey]]) -> Optional[Field]:
+    """Finds the field a response path points at, skipping list indices."""
+    if not path:
+        return None
+    selections = expand_fragments(query).selection_set
+    found = None
+    for key in path:
+        if isinstance(key, int):
+            continue
+        found = next(
+            (
+                field
+                for field in _fields(selections)
+                if (field.alias or field.name) == key
+            ),
+            None,
+        )
+        if found is None:
+            return None
+        selections = found.selection_set or []
+    return found
+
+
+def failed_subtree(data: Optional[dict], path: Optional[list[PathKey]]) -> list[str]:
+    """Response keys leading to the topmost null on an error's path.
+
+    Errors on non-null fields null out their parents, so the subtree to re-fetch
+    starts where the data first goes missing. An empty result stands for the whole
+    query.
+    """
+    if data is None or not path:
+        return []
+    node = data
+    prefix = []
+    for key in path:
+        if isinstance(node, dict) and isinstance(key, str):
+            node = node.get(key)
+        elif isinstance(node, list) and isinstance(key, int) and key < len(node):
+            node = node[key]
+        else:
+            node = None
+        if isinstance(key, str):
+            prefix.append(key)
+        if node is None:
+            break
+    return prefix
+
+
+def prune(query: Query, paths: list[list[str]]) -> Query:
+    """Narrows a query down to the given subtrees, keeping the fields leading to them.
+
+    Named fragments are inlined first, since a narrowed fragment would no longer
+    fit its other spreads.
+    """
+    if any(not path for path in paths):
+        return query
+    query = dataclasses.replace(expand_fragments(query), fragments=None)
+    trie: dict = {}
+    for path in paths:
+        node = trie
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+            if node is None:
+                break
+        else:
+            node[path[-1]] = None
+
+    def narrow(selections: list[SelectionType], node: dict) -> list[SelectionType]:
+        result = []
+        for selection in selections:
+            if isinstance(selection, InlineFragment):
+                if narrowed := narrow(selection.selection_set, node):
+                    result.append(
+                        dataclasses.replace(selection, selection_set=narrowed)
+                    )
+                continue
+            key = selection.field.alias or selection.field.name
+            if key not in node:
+                continue
+            child = node[key]
+            if child is None or not selection.field.selection_set:
+                result.append(selection)
+            else:
+                narrowed = narrow(selection.field.selection_set, child)
+                result.append(
+                    Selection(
+                        dataclasses.replace(selection.field, selection_set=narrowed)
+                    )
+                )
+        return result
+
+    selection_set = narrow(query.selection_set, trie)
+    used = used_variables(selection_set)
+    return dataclasses.replace(
+        query,
+        selection_set=selection_set,
+        variable_definitions=[
+            definition
+            for definition in query.variable_definitions or ()
+            if definition.name in used
+        ],
+    )
+
+
+def merge(base, patch):
+    if isinstance(base, dict) and isinstance(patch, dict):
+        return {**base, **{key: merge(base.get(key), patch[key]) for key in patch}}
+    if isinstance(base, list) and isinstance(patch, list) and len(base) == len(patch):
+        return [merge(old, new) for old, new in zip(base, patch)]
+    return patch
+
+
+@dataclass
+class PartialResult:
+    """Data returned alongside GraphQL errors instead of raising them."""
+
+    query: Query
+    data: Optional[dict]
+    errors: list[OperationError] = field(default_factory=list)
+    retries: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def field_for(self, error: OperationError) -> Optional[Field]:
+        """The field of the query whose resolution produced an error.
+
+        Errors map to fields of the built query rather than to blueprints, since
+        that's what was run, and blueprints can change after building.
+        """
+        return locate(self.query, error.path)
+
+    def retry_query(self) -> Query:
+        """A query re-fetching only the subtrees affected by errors."""
+        return prune(
+            self.query, [failed_subtree(self.data, error.path) for error in self.errors]
+        )
+
+    def merged(
+        self, data: Optional[dict], errors: list[OperationError]
+    ) -> PartialResult:
+        """Combines the result of ``retry_query`` into this one.
+
+        The retry covers every failed subtree, so its errors replace the current ones.
+        """
+        return PartialResult(
+            self.query,
+            merge(self.data, data) if data is not None else self.data,
+            errors,
+            self.retries + 1,
+        )
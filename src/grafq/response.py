@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Any, Callable, Optional, TYPE_CHECKING, Union
+
+from grafq.fragments import expand_fragments
+from grafq.language import (
+    ID,
+    InlineFragment,
+    Query,
+    ScalarExtension,
+    Selection,
+    SelectionType,
+)
+
+if TYPE_CHECKING:
+    from grafq.schema import Schema
+
+Converter = Callable[[Any], Any]
+
+# leaves whose values are returned as decoded
+_RAW = object()
+
+
+class ResponseTypes:
+    """Response classes generated by ``grafq.codegen``, and the types of their fields.
+
+    Given to ``wrap`` in place of a schema, they type responses without any
+    lookups, and objects are created as the class of their type.
+    """
+
+    __slots__ = ("query_type", "classes", "fields")
+
+    def __init__(
+        self,
+        query_type: str,
+        classes: dict[str, type[ResponseObject]],
+        fields: dict[str, dict[str, tuple[str, str]]],
+    ):
+        self.query_type = query_type
+        self.classes = classes
+        # name and kind of the core type of every field, by type
+        self.fields = fields
+
+
+class _Context:
+    """Schema or response types, and scalar converters, shared by every shape of one query."""
+
+    def __init__(
+        self,
+        schema: Optional[Schema],
+        scalars: dict[str, Converter],
+        types: Optional[ResponseTypes] = None,
+    ):
+        self.schema = schema
+        self.types = types
+        self._scalars = scalars
+        self._converters: Optional[dict[str, Converter]] = None
+
+    def field_type(
+        self, type_name: Optional[str], name: str
+    ) -> Optional[tuple[str, str]]:
+        """Name and kind of the core type of a field, when known."""
+        if type_name is None:
+            return None
+        if self.types is not None:
+            return self.types.fields.get(type_name, {}).get(name)
+        fields = self.schema.get_type_fields(type_name) if self.schema else None
+        meta = fields.get(name) if fields else None
+        if meta is None:
+            return None
+        core_type = meta.type.core_type
+        return core_type.name, core_type.kind
+
+    def response_class(self, type_name: Optional[str]) -> type[ResponseObject]:
+        if self.types is None:
+            return ResponseObject
+        return self.types.classes.get(type_name, ResponseObject)
+
+    def converter(self, type_name: str) -> Union[Converter, object]:
+        if self._converters is None:
+            # scalar extensions are found by name, like when validating arguments,
+            # and the latest of same-named subclasses wins
+            converters: dict[str, Converter] = {"ID": ID}
+            pending = [ScalarExtension]
+            while pending:
+                for subclass in pending.pop().__subclasses__():
+                    converters[subclass.__name__] = subclass
+                    pending.append(subclass)
+            converters.update(self._scalars)
+            self._converters = converters
+        return self._converters.get(type_name, _RAW)
+
+
+class _Shape:
+    """Response keys of a selection set, resolved against the schema when first read.
+
+    Shapes are shared by every object answering the same selection set, so a list
+    of 100k nodes costs one resolution.
+    """
+
+    __slots__ = ("_selections", "_type_name", "_context", "_keys", "cls")
+
+    def __init__(
+        self,
+        selections: list[SelectionType],
+        type_name: Optional[str],
+        context: _Context,
+    ):
+        self._selections = selections
+        self._type_name = type_name
+        self._context = context
+        self._keys: Optional[dict[str, Union[_Shape, Converter, object]]] = None
+        # class of the objects answering the selection set
+        self.cls = context.response_class(type_name)
+
+    def get(self, key: str) -> Union[_Shape, Converter, object, None]:
+        if self._keys is None:
+            self._keys = self._resolve()
+        return self._keys.get(key)
+
+    def resolve_all(self):
+        """Resolves this and every nested selection set now, rather than when read."""
+        pending = [self]
+        while pending:
+            shape = pending.pop()
+            if shape._keys is None:
+                shape._keys = shape._resolve()
+            pending.extend(
+                kind for kind in shape._keys.values() if isinstance(kind, _Shape)
+            )
+
+    def _resolve(self) -> dict[str, Union[_Shape, Converter, object]]:
+        # fields of inline fragments belong to the object too, typed by the condition
+        grouped: dict[str, tuple[Optional[str], str, list[SelectionType]]] = {}
+        pending = [(self._selections, self._type_name)]
+        while pending:
+            selections, type_name = pending.pop()
+            for selection in selections:
+                if isinstance(selection, InlineFragment):
+                    pending.append(
+                        (selection.selection_set, selection.type_condition or type_name)
+                    )
+                elif isinstance(selection, Selection):
+                    field = selection.field
+                    key = field.alias or field.name
+                    if key not in grouped:
+                        grouped[key] = (type_name, field.name, [])
+                    grouped[key][2].extend(field.selection_set or ())
+        keys = {}
+        for key, (type_name, name, selections) in grouped.items():
+            field_type = self._context.field_type(type_name, name)
+            if selections:
+                keys[key] = _Shape(
+                    selections, field_type[0] if field_type else None, self._context
+                )
+            elif field_type is not None and field_type[1] == "SCALAR":
+                keys[key] = self._context.converter(field_type[0])
+            else:
+                keys[key] = _RAW
+        return keys
+
+
+def _wrap(value, kind: Union[_Shape, Converter, object, None]):
+    if value is None or kind is _RAW:
+        return value
+    if isinstance(value, list):
+        return ResponseList(value, kind)
+    if isinstance(kind, _Shape):
+        return kind.cls(value, kind)
+    if kind is None:
+        # without a query, objects are the only structure known
+        return ResponseObject(value) if isinstance(value, dict) else value
+    return kind(value)
+
+
+class ResponseObject(Mapping):
+    """Read-only view of a response object, wrapping its values when accessed.
+
+    Fields are available as attributes, or as items when they clash with methods
+    (``keys``, ``items``, ``values`` and ``get``) or aren't identifiers. Nested
+    objects and lists are proxies sharing the decoded JSON, and scalars known from
+    the schema, such as ``ID`` and scalar extensions, are converted when read.
+    """
+
+    __slots__ = ("_data", "_shape")
+
+    def __init__(self, data: dict, shape: Optional[_Shape] = None):
+        self._data = data
+        self._shape = shape
+
+    def __getitem__(self, key: str):
+        value = self._data[key]
+        return _wrap(value, self._shape.get(key) if self._shape else None)
+
+    def __getattr__(self, name: str):
+        if name in ResponseObject.__slots__ or (
+            name.startswith("__") and name != "__typename"
+        ):
+            # special methods, and the state of instances still being constructed
+            raise AttributeError(name)
+        return self._attribute(name)
+
+    def _attribute(self, name: str):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __repr__(self) -> str:
+        return f"ResponseObject({self._data!r})"
+
+
+class ResponseList(Sequence):
+    """Read-only view of a response list, wrapping items when accessed."""
+
+    __slots__ = ("_items", "_kind")
+
+    def __init__(self, items: list, kind: Union[_Shape, Converter, object, None]):
+        self._items = items
+        self._kind = kind
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ResponseList(self._items[index], self._kind)
+        return _wrap(self._items[index], self._kind)
+
+    def __iter__(self) -> Iterator:
+        kind = self._kind
+        if isinstance(kind, _Shape):
+            # the common case of object lists, only dispatching nested lists and nulls
+            cls = kind.cls
+            return (
+                (cls(item, kind) if isinstance(item, dict) else _wrap(item, kind))
+                for item in self._items
+            )
+        return (_wrap(item, kind) for item in self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __repr__(self) -> str:
+        return f"ResponseList({self._items!r})"
+
+
+def wrap(
+    data: dict,
+    query: Optional[Query] = None,
+    schema: Optional[Schema] = None,
+    scalars: Optional[dict[str, Converter]] = None,
+    resolve: bool = False,
+    types: Optional[ResponseTypes] = None,
+) -> ResponseObject:
+    """Wraps the data of a response in lazy, read-only response objects.
+
+    With the query, and the schema to type its fields, scalars are converted when
+    read: ``ID`` fields to ``ID`` and custom scalars to the ``ScalarExtension``
+    subclass of the same name, or by the converters in ``scalars``, keyed by name.
+
+    Field types are looked up when first read, unless ``resolve`` is set, which
+    looks them all up now. A schema that isn't offline may fetch types over the
+    network, so resolving upfront keeps its errors out of attribute access.
+
+    The ``RESPONSES`` of a module generated by ``grafq.codegen`` type fields like
+    the schema would, and objects are instances of its response classes.
+    """
+    if query is None:
+        return ResponseObject(data)
+    query = expand_fragments(query)
+    context = _Context(schema, scalars or {}, types)
+    if types is not None:
+        root_type = types.query_type
+    else:
+        root_type = schema.query_type if schema else None
+    shape = _Shape(query.selection_set, root_type, context)
+    if resolve:
+        shape.resolve_all()
+    return shape.cls(data, shape)
+
+
+def unwrap(value: Union[ResponseObject, ResponseList]) -> Union[dict, list]:
+    """The decoded JSON behind a response object or list, shared rather than copied."""
+    if isinstance(value, ResponseObject):
+        return value._data
+    return value._items
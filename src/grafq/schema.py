@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Optional, Union
 
@@ -12,6 +13,21 @@ from grafq.language import (
     Query,
     ScalarExtension,
     NullType,
+    VariableType,
+    NamedType,
+    ListType,
+    NonNullType,
+)
+from grafq.errors import ValidationError
+from grafq.instrumentation import introspecting
+from grafq.singleflight import SingleFlight
+from grafq.validation import (
+    validate_query,
+    Validator,
+    ValidatorCache,
+    VariablesValidator,
+    compile_input_validator,
+    compile_variable_validator,
 )
 
 
@@ -88,6 +104,12 @@ class SchemaType:
         while core_type._of_type:
             core_type = core_type._of_type
         self._core_type = core_type
+        if kind == "NON_NULL":
+            self._signature = f"{self._of_type}!"
+        elif kind == "LIST":
+            self._signature = f"[{self._of_type}]"
+        else:
+            self._signature = name
 
     @classmethod
     def from_dict(cls, schema: Schema, d: dict) -> SchemaType:
@@ -150,7 +172,7 @@ class SchemaType:
         return self._enum_values
 
     @property
-    def input_fields(self) -> Optional[list[EnumValue]]:
+    def input_fields(self) -> Optional[list[InputValue]]:
         if not self._name:
             return None
         if self._input_fields is Unfetched:
@@ -165,6 +187,9 @@ class SchemaType:
     def core_type(self) -> SchemaType:
         return self._core_type
 
+    def __str__(self) -> str:
+        return self._signature
+
 
 class FieldMeta:
     def __init__(
@@ -184,6 +209,7 @@ class FieldMeta:
         self._type = field_type
         self._is_deprecated = is_deprecated
         self._deprecation_reason = deprecation_reason
+        self._arg_types: dict[str, SchemaType] = {arg.name: arg.type for arg in args}
 
     @property
     def name(self) -> str:
@@ -197,6 +223,10 @@ class FieldMeta:
     def args(self) -> list[InputValue]:
         return self._args
 
+    @property
+    def arg_types(self) -> dict[str, SchemaType]:
+        return self._arg_types
+
     @property
     def type(self) -> SchemaType:
         return self._type
@@ -225,9 +255,9 @@ class FieldMeta:
             ],
             field_type=SchemaType.from_dict(schema, d["type"]),
             is_deprecated=d["isDeprecated"],
-            deprecation_reason=d["deprecationReason"]
-            if "deprecationReason" in d
-            else Unfetched,
+            deprecation_reason=(
+                d["deprecationReason"] if "deprecationReason" in d else Unfetched
+            ),
         )
 
 
@@ -236,7 +266,7 @@ ROOT_QUERY: Query = (
     .select(
         FieldBlueprint("__schema").select(
             FieldBlueprint("queryType").select("name"),
-            FieldBlueprint("types").select("name"),
+            FieldBlueprint("types").select("name", "kind"),
         )
     )
     .build()
@@ -275,164 +305,263 @@ OF_TYPE_FRAGMENT = FieldBlueprint("ofType").select(
 TYPE_FRAGMENT = FieldBlueprint("type").select("name", "kind", OF_TYPE_FRAGMENT)
 
 
+INPUT_VALUE_SELECTION = ("name", "description", TYPE_FRAGMENT, "defaultValue")
+FIELDS_SELECTION = FieldBlueprint("fields", includeDeprecated=True).select(
+    "name",
+    "description",
+    FieldBlueprint("args").select(*INPUT_VALUE_SELECTION),
+    TYPE_FRAGMENT,
+    "isDeprecated",
+    "deprecationReason",
+)
+ENUM_VALUES_SELECTION = FieldBlueprint("enumValues", includeDeprecated=True).select(
+    "name", "description", "isDeprecated", "deprecationReason"
+)
+FULL_INTROSPECTION: Query = (
+    QueryBlueprint()
+    .select(
+        FieldBlueprint("__schema").select(
+            FieldBlueprint("queryType").select("name"),
+            FieldBlueprint("types").select(
+                "kind",
+                "name",
+                "description",
+                FIELDS_SELECTION,
+                FieldBlueprint("inputFields").select(*INPUT_VALUE_SELECTION),
+                FieldBlueprint("interfaces").select("name", "kind", OF_TYPE_FRAGMENT),
+                ENUM_VALUES_SELECTION,
+                FieldBlueprint("possibleTypes").select(
+                    "name", "kind", OF_TYPE_FRAGMENT
+                ),
+            ),
+        )
+    )
+    .build()
+)
+
+
 class Schema:
-    def __init__(self, client: Client, strict: bool = False):
+    def __init__(
+        self,
+        client: Optional[Client] = None,
+        strict: bool = False,
+        introspection: Optional[dict] = None,
+    ):
+        if client is None and introspection is None:
+            raise ValueError("Must provide either a client or an introspection result")
         self._client = client
-        schema = client.get(ROOT_QUERY)["__schema"]
-        self._types: set[str] = {t["name"] for t in schema["types"]}
-        self._root_fields = self.get_type_fields(schema["queryType"]["name"])
+        if introspection is None:
+            with introspecting():
+                schema = client.get(ROOT_QUERY)["__schema"]
+            self._index: dict[str, dict] = {}
+        else:
+            schema = introspection["__schema"]
+            self._index = {t["name"]: t for t in schema["types"]}
+        self._introspection = introspection
+        self._types: dict[str, str] = {t["name"]: t["kind"] for t in schema["types"]}
+        self._lookups: dict[tuple[str, str], object] = {}
+        # lookups of the same type collapse into one request, others run in parallel
+        self._lookup_flights = SingleFlight()
+        self._query_type: str = schema["queryType"]["name"]
+        self._root_fields = self.get_type_fields(self._query_type)
         self._strict = strict
+        self._validators: ValidatorCache = {}
+        self._variables_validators: dict[tuple[str, ...], VariablesValidator] = {}
+
+    @classmethod
+    def introspect(cls, client: Client) -> dict:
+        with introspecting():
+            return client.get(FULL_INTROSPECTION)
+
+    @classmethod
+    def load(
+        cls, path: str, client: Optional[Client] = None, strict: bool = False
+    ) -> Schema:
+        with open(path) as f:
+            return cls(client=client, strict=strict, introspection=json.load(f))
+
+    def save(self, path: str):
+        if self._introspection is None:
+            self._introspection = Schema.introspect(self._client)
+        with open(path, "w") as f:
+            json.dump(self._introspection, f)
 
     @property
     def is_strict(self) -> bool:
         return self._strict
 
+    @property
+    def is_offline(self) -> bool:
+        return self._introspection is not None
+
+    @property
+    def query_type(self) -> str:
+        return self._query_type
+
+    def input_validator(
+        self, value_type: SchemaType, strict: Optional[bool] = None
+    ) -> Validator:
+        if strict is None:
+            strict = self._strict
+        return compile_input_validator(value_type, strict, self._validators)
+
+    def variable_validator(self, var_type: VariableType) -> Validator:
+        return compile_variable_validator(
+            self.resolve_variable_type(var_type), self._validators
+        )
+
+    def variables_validator(self, query: Query) -> VariablesValidator:
+        definitions = query.variable_definitions or ()
+        key = tuple(str(definition) for definition in definitions)
+        if (validator := self._variables_validators.get(key)) is None:
+            validator = VariablesValidator(definitions, self)
+            self._variables_validators[key] = validator
+        return validator
+
+    def resolve_variable_type(self, var_type: VariableType) -> SchemaType:
+        def spec(value_type: VariableType) -> dict:
+            if isinstance(value_type, NonNullType):
+                return {"kind": "NON_NULL", "ofType": spec(value_type.subtype)}
+            if isinstance(value_type, ListType):
+                return {"kind": "LIST", "ofType": spec(value_type.subtype)}
+            if isinstance(value_type, NamedType):
+                if (kind := self.get_type_kind(value_type.name)) is None:
+                    raise TypeError(f"Type does not exist: {value_type.name}")
+                return {"kind": kind, "name": value_type.name}
+            raise TypeError(f"{value_type} is not a variable type")
+
+        return SchemaType.from_dict(self, {"name": None, **spec(var_type)})
+
+    def get_type_names(self) -> list[str]:
+        return list(self._types)
+
+    def get_type_kind(self, name: str) -> Optional[str]:
+        return self._types.get(name)
+
     def is_valid_type(self, name: str) -> bool:
         return name in self._types
 
+    def _lookup(self, name: str, attribute: str, selection, convert):
+        # results are memoized per type, and served from the index when offline
+        key = (name, attribute)
+        if key in self._lookups:
+            return self._lookups[key]
+        return self._lookup_flights.do(
+            key, lambda: self._fetch_lookup(key, selection, convert)
+        )
+
+    def _fetch_lookup(self, key: tuple[str, str], selection, convert):
+        # a previous flight may have finished since the caller checked
+        if key in self._lookups:
+            return self._lookups[key]
+        name, attribute = key
+        if name in self._index:
+            raw = self._index[name].get(attribute)
+        else:
+            with introspecting():
+                result = (
+                    self._client.new_query(with_schema=False)
+                    .select(FieldBlueprint("__type", name=name).select(selection))
+                    .build_and_run()
+                )
+            raw = result["__type"].get(attribute)
+        value = convert(raw) if raw else None
+        self._lookups[key] = value
+        return value
+
     def get_type(self, name: str) -> Optional[SchemaType]:
         if not self.is_valid_type(name):
             return None
-        spec = (
-            self._client.new_query(with_schema=False)
-            .select(
-                FieldBlueprint("__type", name=name).select(
-                    "kind", "name", OF_TYPE_FRAGMENT
+        if name in self._index:
+            raw = self._index[name]
+            return SchemaType.from_dict(
+                self,
+                {
+                    "kind": raw["kind"],
+                    "name": raw["name"],
+                    "description": raw.get("description"),
+                },
+            )
+        with introspecting():
+            spec = (
+                self._client.new_query(with_schema=False)
+                .select(
+                    FieldBlueprint("__type", name=name).select(
+                        "kind", "name", OF_TYPE_FRAGMENT
+                    )
                 )
+                .build_and_run()
             )
-            .build_and_run()
-        )
         type_meta = spec["__type"]
         return SchemaType.from_dict(self, type_meta) if type_meta else None
 
     def get_type_description(self, name: str) -> Optional[str]:
         if not self.is_valid_type(name):
             return None
-        result = (
-            self._client.new_query(with_schema=False)
-            .select(FieldBlueprint("__type", name=name).select("description"))
-            .build_and_run()
-        )
-        return result["__type"]["description"]
+        return self._lookup(name, "description", "description", lambda raw: raw)
 
     def get_type_fields(self, name: str) -> Optional[dict[str, FieldMeta]]:
         if not self.is_valid_type(name):
             return None
-        fields = (
-            self._client.new_query(with_schema=False)
-            .select(
-                FieldBlueprint("__type", name=name).select(
-                    FieldBlueprint("fields", includeDeprecated=True).select(
-                        "name",
-                        "description",
-                        FieldBlueprint("args").select(
-                            "name",
-                            "description",
-                            TYPE_FRAGMENT,
-                            "defaultValue",
-                        ),
-                        TYPE_FRAGMENT,
-                        "isDeprecated",
-                        "deprecationReason",
-                    )
-                )
-            )
-            .build_and_run()
-        )
-        fields = fields["__type"].get("fields")
-        return (
-            {field["name"]: FieldMeta.from_dict(self, field) for field in fields}
-            if fields
-            else None
+        return self._lookup(
+            name,
+            "fields",
+            FIELDS_SELECTION,
+            lambda fields: {
+                field["name"]: FieldMeta.from_dict(self, field) for field in fields
+            },
         )
 
     def get_type_interfaces(self, name: str) -> Optional[list[SchemaType]]:
         if not self.is_valid_type(name):
             return None
-        result = (
-            self._client.new_query(with_schema=False)
-            .select(
-                FieldBlueprint("__type", name=name).select(
-                    FieldBlueprint("interfaces").select(
-                        "name", "kind", OF_TYPE_FRAGMENT
-                    )
-                )
-            )
-            .build_and_run()
-        )
-        interfaces = result["__type"].get("interfaces")
-        return (
-            [SchemaType.from_dict(self, interface) for interface in interfaces]
-            if interfaces
-            else None
+        return self._lookup(
+            name,
+            "interfaces",
+            FieldBlueprint("interfaces").select("name", "kind", OF_TYPE_FRAGMENT),
+            lambda interfaces: [
+                SchemaType.from_dict(self, interface) for interface in interfaces
+            ],
         )
 
     def get_type_possible_types(self, name: str) -> Optional[list[SchemaType]]:
         if not self.is_valid_type(name):
             return None
-        result = (
-            self._client.new_query(with_schema=False)
-            .select(
-                FieldBlueprint("__type", name=name).select(
-                    FieldBlueprint("possibleTypes").select(
-                        "name", "kind", OF_TYPE_FRAGMENT
-                    )
-                )
-            )
-            .build_and_run()
-        )
-        possible_types = result["__type"].get("possibleTypes")
-        return (
-            [
+        return self._lookup(
+            name,
+            "possibleTypes",
+            FieldBlueprint("possibleTypes").select("name", "kind", OF_TYPE_FRAGMENT),
+            lambda possible_types: [
                 SchemaType.from_dict(self, possible_type)
                 for possible_type in possible_types
-            ]
-            if possible_types
-            else None
+            ],
         )
 
     def get_type_enum_values(self, name: str) -> Optional[list[EnumValue]]:
         if not self.is_valid_type(name):
             return None
-        result = (
-            self._client.new_query(with_schema=False)
-            .select(
-                FieldBlueprint("__type", name=name).select(
-                    FieldBlueprint("enumValues", includeDeprecated=True).select(
-                        "name", "description", "isDeprecated", "deprecationReason"
-                    )
-                )
-            )
-            .build_and_run()
-        )
-        enum_values = result["__type"].get("enumValues")
-        return (
-            [EnumValue.from_dict(value) for value in enum_values]
-            if enum_values
-            else None
+        return self._lookup(
+            name,
+            "enumValues",
+            ENUM_VALUES_SELECTION,
+            lambda enum_values: [EnumValue.from_dict(value) for value in enum_values],
         )
 
     def get_type_input_fields(self, name: str) -> Optional[list[InputValue]]:
         if not self.is_valid_type(name):
             return None
-        result = (
-            self._client.new_query(with_schema=False)
-            .select(
-                FieldBlueprint("__type", name=name).select(
-                    FieldBlueprint("inputFields").select(
-                        "name", "description", TYPE_FRAGMENT, "defaultValue"
-                    )
-                )
-            )
-            .build_and_run()
-        )
-        input_fields = result["__type"].get("inputFields")
-        return (
-            [InputValue.from_dict(self, value) for value in input_fields]
-            if input_fields
-            else None
+        return self._lookup(
+            name,
+            "inputFields",
+            FieldBlueprint("inputFields").select(*INPUT_VALUE_SELECTION),
+            lambda input_fields: [
+                InputValue.from_dict(self, value) for value in input_fields
+            ],
         )
 
+    def validate(self, query: Query) -> list[ValidationError]:
+        return validate_query(query, self)
+
     def is_representable(self, value) -> bool:
         if value is None:
             return True
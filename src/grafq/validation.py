@@ -0,0 +1,565 @@
+from __future__ import annotations
+
+from enum import Enum
+from collections.abc import Iterable, Iterator
+from typing import Callable, Optional, TYPE_CHECKING
+
+from grafq.errors import VariableErrors, ValidationError, ValidationErrors
+from grafq.language import (
+    ValueRawType,
+    ID,
+    EnumLiteral,
+    NullType,
+    ScalarExtension,
+    VariableDefinition,
+    VariableType,
+    NamedType,
+    ListType,
+    NonNullType,
+    VarRef,
+    Query,
+    Selection,
+    SelectionType,
+    Field,
+    Directive,
+    FragmentDefinition,
+    FragmentSpread,
+    InlineFragment,
+)
+
+if TYPE_CHECKING:
+    from grafq.schema import Schema, SchemaType, FieldMeta
+
+Validator = Callable[[ValueRawType], bool]
+ValidatorCache = dict[tuple[str, str], Validator]
+
+# literal arguments accept grafq value types, variables accept decoded JSON
+LENIENT = "lenient"
+STRICT = "strict"
+VARIABLE = "variable"
+
+
+def _is_null(value) -> bool:
+    return value is None or isinstance(value, NullType)
+
+
+def _nullable(validator: Validator) -> Validator:
+    def validate(value) -> bool:
+        return _is_null(value) or validator(value)
+
+    return validate
+
+
+def _compile_scalar(name: str, mode: str) -> Validator:
+    if name == "Int":
+        return lambda value: isinstance(value, int) and not isinstance(value, bool)
+    if name == "Float":
+        return lambda value: isinstance(value, (int, float)) and not isinstance(
+            value, bool
+        )
+    if name == "String":
+        return lambda value: isinstance(value, str)
+    if name == "Boolean":
+        return lambda value: isinstance(value, bool)
+    if name == "ID":
+        if mode == STRICT:
+            return lambda value: isinstance(value, ID)
+        if mode == VARIABLE:
+            return lambda value: isinstance(value, (str, int)) and not isinstance(
+                value, bool
+            )
+        return lambda value: isinstance(value, (ID, str))
+    if mode == VARIABLE:
+        # custom scalars are coerced by the server, any JSON value may be valid
+        return lambda value: not _is_null(value)
+    if mode == STRICT:
+        # the user must define a subtype by deriving from ScalarExtension
+        return (
+            lambda value: isinstance(value, ScalarExtension)
+            and type(value).__name__ == name
+        )
+    # in non-strict mode, any scalar value is allowed
+    return lambda value: isinstance(value, (str, int, float, bool, ScalarExtension))
+
+
+def _compile_enum(value_type: SchemaType, mode: str) -> Validator:
+    names = frozenset(value.name for value in value_type.enum_values or ())
+    if mode == VARIABLE:
+        return lambda value: isinstance(value, str) and value in names
+
+    def validate(value) -> bool:
+        if isinstance(value, (Enum, EnumLiteral)):
+            return value.name in names
+        return isinstance(value, str) and value in names
+
+    return validate
+
+
+def compile_input_validator(
+    value_type: SchemaType, strict: bool, cache: ValidatorCache
+) -> Validator:
+    """Compiles a predicate checking literal values against an input type.
+
+    Compiled validators are stored in ``cache``, keyed by type signature, so each
+    distinct input type is only interpreted (and its metadata fetched) once.
+    """
+    return _compile(value_type, STRICT if strict else LENIENT, cache)
+
+
+def compile_variable_validator(
+    value_type: SchemaType, cache: ValidatorCache
+) -> Validator:
+    """Compiles a predicate checking decoded JSON variable values against a type."""
+    return _compile(value_type, VARIABLE, cache)
+
+
+def _compile(value_type: SchemaType, mode: str, cache: ValidatorCache) -> Validator:
+    key = (str(value_type), mode)
+    if (validator := cache.get(key)) is not None:
+        return validator
+    if value_type.kind == "NON_NULL":
+        return _compile_non_null(value_type.of_type, mode, cache)
+    validator = _nullable(_compile_non_null(value_type, mode, cache))
+    cache[key] = validator
+    return validator
+
+
+def _compile_non_null(
+    value_type: SchemaType, mode: str, cache: ValidatorCache
+) -> Validator:
+    key = (f"{value_type}!", mode)
+    if (validator := cache.get(key)) is not None:
+        return validator
+    if value_type.kind == "LIST":
+        item = _compile(value_type.of_type, mode, cache)
+        # input coercion accepts a single item in place of a list of one
+        coerce_single = mode == VARIABLE
+
+        def validator(value) -> bool:
+            if isinstance(value, list):
+                return all(map(item, value))
+            return coerce_single and item(value)
+
+    elif value_type.kind == "SCALAR":
+        validator = _compile_scalar(value_type.name, mode)
+    elif value_type.kind == "ENUM":
+        validator = _compile_enum(value_type, mode)
+    elif value_type.kind == "INPUT_OBJECT":
+        field_validators: dict[str, Validator] = {}
+        required: set[str] = set()
+
+        def validator(value) -> bool:
+            if not isinstance(value, dict):
+                return False
+            for name, field_value in value.items():
+                field_validator = field_validators.get(name)
+                if field_validator is None or not field_validator(field_value):
+                    return False
+            return required.issubset(value.keys())
+
+        # registered before compiling fields, so recursive input types terminate
+        existing = set(cache)
+        cache[key] = validator
+        try:
+            for field in value_type.input_fields or ():
+                field_validators[field.name] = _compile(field.type, mode, cache)
+                if field.type.kind == "NON_NULL" and field.default_value is None:
+                    required.add(field.name)
+        except BaseException:
+            # neither this validator nor those referring to it are complete
+            for added in set(cache) - existing:
+                del cache[added]
+            raise
+        return validator
+    else:
+        validator = lambda value: False
+    cache[key] = validator
+    return validator
+
+
+class VariablesValidator:
+    """Checks variable values against the variable definitions of a query.
+
+    Validators for every definition are compiled upfront, so validating each set
+    of values only costs a handful of predicate calls.
+    """
+
+    def __init__(self, definitions: Iterable[VariableDefinition], schema: Schema):
+        self._validators: dict[str, tuple[VariableDefinition, Validator]] = {
+            definition.name: (
+                definition,
+                schema.variable_validator(definition.type),
+            )
+            for definition in definitions
+        }
+        self._required = frozenset(
+            name
+            for name, (definition, _) in self._validators.items()
+            if isinstance(definition.type, NonNullType)
+            and definition.default_value is None
+        )
+
+    def errors(self, variables: Optional[dict[str, ValueRawType]]) -> list[str]:
+        variables = variables or {}
+        errors = []
+        for name, value in variables.items():
+            if (entry := self._validators.get(name)) is None:
+                errors.append(f"Unknown variable ${name}")
+            elif not entry[1](value):
+                errors.append(
+                    f"Invalid value for variable ${name} of type {entry[0].type}: {value!r}"
+                )
+        if not self._required.issubset(variables.keys()):
+            errors.extend(
+                f"Missing value for required variable ${name}"
+                for name in sorted(self._required.difference(variables.keys()))
+            )
+        return errors
+
+    def validate(self, variables: Optional[dict[str, ValueRawType]]):
+        if errors := self.errors(variables):
+            raise VariableErrors(errors)
+
+    def validate_many(
+        self, batch: Iterable[Optional[dict[str, ValueRawType]]]
+    ) -> dict[int, list[str]]:
+        """Validates many sets of values, returning the errors of each failed item by index."""
+        failures = {}
+        for index, variables in enumerate(batch):
+            if errors := self.errors(variables):
+                failures[index] = errors
+        return failures
+
+
+INPUT_KINDS = frozenset(("SCALAR", "ENUM", "INPUT_OBJECT"))
+LEAF_KINDS = frozenset(("SCALAR", "ENUM"))
+COMPOSITE_KINDS = frozenset(("OBJECT", "INTERFACE", "UNION"))
+# introspection entry points, implicitly available on the query root
+META_ROOT_FIELDS = {"__schema": "__Schema", "__type": "__Type"}
+# directives every server supports, all taking a single Boolean! argument
+CONDITIONAL_DIRECTIVES = frozenset(("include", "skip"))
+
+
+def is_variable_usage_allowed(
+    var_type: VariableType, schema_type: SchemaType, has_default: bool = False
+) -> bool:
+    if schema_type.kind == "NON_NULL":
+        if isinstance(var_type, NonNullType):
+            return is_variable_usage_allowed(var_type.subtype, schema_type.of_type)
+        # a nullable variable may only fill a non-null position if it has a default
+        return has_default and is_variable_usage_allowed(var_type, schema_type.of_type)
+    if isinstance(var_type, NonNullType):
+        return is_variable_usage_allowed(var_type.subtype, schema_type)
+    if schema_type.kind == "LIST":
+        return isinstance(var_type, ListType) and is_variable_usage_allowed(
+            var_type.subtype, schema_type.of_type
+        )
+    if isinstance(var_type, NamedType):
+        return var_type.name == schema_type.name
+    return False
+
+
+def _variable_refs(value: ValueRawType) -> Iterator[VarRef]:
+    if isinstance(value, VarRef):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            yield from _variable_refs(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _variable_refs(item)
+
+
+class _DocumentValidator:
+    def __init__(self, query: Query, schema: Schema):
+        self._query = query
+        self._schema = schema
+        self._definitions: dict[str, VariableDefinition] = {}
+        self._used: set[str] = set()
+        self._fragments: dict[str, FragmentDefinition] = {}
+        self._spreads: dict[str, set[str]] = {}
+        self._spread: set[str] = set()
+        self._errors: list[ValidationError] = []
+
+    def run(self) -> list[ValidationError]:
+        for definition in self._query.variable_definitions or ():
+            self._check_definition(definition)
+        for fragment in self._query.fragments or ():
+            if fragment.name in self._fragments:
+                self._error(f"Fragment {fragment.name} is defined more than once")
+            else:
+                self._fragments[fragment.name] = fragment
+        self._check_selections(
+            self._query.selection_set, self._schema.query_type, [], root=True
+        )
+        for fragment in self._fragments.values():
+            self._check_fragment(fragment)
+        for name in self._definitions:
+            if name not in self._used:
+                self._error(f"Variable ${name} is never used")
+        for name in self._fragments:
+            if name not in self._spread:
+                self._error(f"Fragment {name} is never used")
+        return self._errors
+
+    def _check_fragment(self, fragment: FragmentDefinition):
+        path = [f"...{fragment.name}"]
+        if self._check_type_condition(fragment.type_condition, path):
+            spreads = self._spreads[fragment.name] = set()
+            self._check_selections(
+                fragment.selection_set, fragment.type_condition, path, spreads=spreads
+            )
+        if self._spreads_itself(fragment.name):
+            self._error(f"Fragment {fragment.name} spreads itself", path)
+
+    def _spreads_itself(self, name: str) -> bool:
+        seen, stack = set(), list(self._spreads.get(name, ()))
+        while stack:
+            current = stack.pop()
+            if current == name:
+                return True
+            if current not in seen:
+                seen.add(current)
+                stack.extend(self._spreads.get(current, ()))
+        return False
+
+    def _check_type_condition(self, type_name: str, path: list[str]) -> bool:
+        kind = self._schema.get_type_kind(type_name)
+        if kind is None:
+            self._error(f"Unknown type {type_name} in type condition", path)
+            return False
+        if kind not in COMPOSITE_KINDS:
+            self._error(f"Type condition on non-composite type {type_name}", path)
+            return False
+        return True
+
+    def _possible_types(self, type_name: str) -> set[str]:
+        if self._schema.get_type_kind(type_name) == "OBJECT":
+            return {type_name}
+        return {
+            possible_type.name
+            for possible_type in self._schema.get_type_possible_types(type_name) or ()
+        }
+
+    def _check_spread(self, condition: str, parent: str, label: str, path: list[str]):
+        if condition != parent and not (
+            self._possible_types(condition) & self._possible_types(parent)
+        ):
+            self._error(f"{label} cannot be spread on type {parent}", path)
+
+    def _error(self, message: str, path: Optional[list[str]] = None):
+        self._errors.append(ValidationError(message, path))
+
+    def _check_definition(self, definition: VariableDefinition):
+        if definition.name in self._definitions:
+            self._error(f"Variable ${definition.name} is defined more than once")
+            return
+        self._definitions[definition.name] = definition
+        try:
+            value_type = self._schema.resolve_variable_type(definition.type)
+        except TypeError as e:
+            self._error(f"Invalid type for variable ${definition.name}: {e}")
+            return
+        if value_type.core_type.kind not in INPUT_KINDS:
+            self._error(
+                f"Variable ${definition.name} has non-input type {definition.type}"
+            )
+        elif definition.default_value is not None and not self._schema.input_validator(
+            value_type
+        )(definition.default_value.inner):
+            self._error(
+                f"Mismatched type for default value of variable ${definition.name}: "
+                f"{definition.default_value} for {definition.type}"
+            )
+
+    def _check_selections(
+        self,
+        selections: list[SelectionType],
+        type_name: str,
+        path: list[str],
+        root: bool = False,
+        spreads: Optional[set[str]] = None,
+    ):
+        fields = self._schema.get_type_fields(type_name) or {}
+        for selection in selections:
+            if isinstance(selection, FragmentSpread):
+                self._check_directives(selection.directives, path)
+                self._spread.add(selection.name)
+                if spreads is not None:
+                    spreads.add(selection.name)
+                fragment = self._fragments.get(selection.name)
+                if fragment is None:
+                    self._error(f"Unknown fragment {selection.name}", path)
+                elif self._schema.is_valid_type(fragment.type_condition):
+                    self._check_spread(
+                        fragment.type_condition,
+                        type_name,
+                        f"Fragment {selection.name}",
+                        path,
+                    )
+                continue
+            if isinstance(selection, InlineFragment):
+                self._check_directives(selection.directives, path)
+                condition = selection.type_condition
+                if condition is None:
+                    condition = type_name
+                elif not self._check_type_condition(condition, path):
+                    continue
+                else:
+                    self._check_spread(
+                        condition, type_name, f"Fragment on {condition}", path
+                    )
+                self._check_selections(
+                    selection.selection_set, condition, path, root, spreads
+                )
+                continue
+            field = selection.field
+            field_path = path + [field.alias or field.name]
+            self._check_directives(field.directives, field_path)
+            if field.name == "__typename":
+                if field.arguments or field.selection_set:
+                    self._error(
+                        "Field __typename is a leaf without arguments", field_path
+                    )
+                continue
+            if root and field.name in META_ROOT_FIELDS:
+                self._check_meta_field(field, field_path)
+                continue
+            meta = fields.get(field.name)
+            if meta is None:
+                self._error(
+                    f"Field {field.name} does not exist on type {type_name}", field_path
+                )
+                continue
+            self._check_arguments(field, meta, field_path)
+            core_type = meta.type.core_type
+            if core_type.kind in LEAF_KINDS:
+                if field.selection_set:
+                    self._error(
+                        f"Field {field.name} of type {core_type.name} cannot have a selection",
+                        field_path,
+                    )
+            elif not field.selection_set:
+                self._error(
+                    f"Field {field.name} of type {core_type.name} must have a selection",
+                    field_path,
+                )
+            else:
+                self._check_selections(
+                    field.selection_set, core_type.name, field_path, spreads=spreads
+                )
+
+    def _check_meta_field(self, field: Field, path: list[str]):
+        for argument in field.arguments or ():
+            for ref in _variable_refs(argument.value.inner):
+                self._use_variable(ref, path)
+        type_name = META_ROOT_FIELDS[field.name]
+        if field.selection_set and self._schema.is_valid_type(type_name):
+            self._check_selections(field.selection_set, type_name, path)
+
+    def _check_arguments(self, field: Field, meta: FieldMeta, path: list[str]):
+        provided = set()
+        for argument in field.arguments or ():
+            provided.add(argument.name)
+            arg_type = meta.arg_types.get(argument.name)
+            if arg_type is None:
+                self._error(
+                    f"Invalid argument {argument.name} for field {field.name}", path
+                )
+                continue
+            value = argument.value.inner
+            if isinstance(value, VarRef):
+                if definition := self._use_variable(value, path):
+                    if not is_variable_usage_allowed(
+                        definition.type, arg_type, definition.default_value is not None
+                    ):
+                        self._error(
+                            f"Invalid usage of variable ${value.name} of type {definition.type} "
+                            f"as argument {argument.name} of type {arg_type}",
+                            path,
+                        )
+            elif refs := list(_variable_refs(value)):
+                # nested references are checked by the server once substituted
+                for ref in refs:
+                    self._use_variable(ref, path)
+            elif not self._schema.input_validator(arg_type)(value):
+                self._error(
+                    f"Invalid argument type for {argument.name} at field {field.name}",
+                    path,
+                )
+        for arg in meta.args:
+            if (
+                arg.type.kind == "NON_NULL"
+                and arg.default_value is None
+                and arg.name not in provided
+            ):
+                self._error(
+                    f"Missing required argument {arg.name} for field {field.name}", path
+                )
+
+    def _check_directives(self, directives: Optional[list[Directive]], path: list[str]):
+        seen = set()
+        for directive in directives or ():
+            if directive.name in seen:
+                self._error(f"Directive @{directive.name} is used more than once", path)
+            seen.add(directive.name)
+            if directive.name not in CONDITIONAL_DIRECTIVES:
+                # other directives are deliberately not validated, as the schema
+                # doesn't fetch the directives introspection lists
+                for argument in directive.arguments or ():
+                    for ref in _variable_refs(argument.value.inner):
+                        self._use_variable(ref, path)
+                continue
+            provided = False
+            for argument in directive.arguments or ():
+                if argument.name != "if":
+                    self._error(
+                        f"Invalid argument {argument.name} for directive @{directive.name}",
+                        path,
+                    )
+                    continue
+                provided = True
+                value = argument.value.inner
+                if isinstance(value, VarRef):
+                    definition = self._use_variable(value, path)
+                    if definition and not is_variable_usage_allowed(
+                        definition.type,
+                        self._schema.resolve_variable_type(
+                            NonNullType(NamedType("Boolean"))
+                        ),
+                        definition.default_value is not None,
+                    ):
+                        self._error(
+                            f"Invalid usage of variable ${value.name} of type {definition.type} "
+                            f"as argument if of type Boolean!",
+                            path,
+                        )
+                elif not isinstance(value, bool):
+                    self._error(
+                        f"Invalid argument type for if at directive @{directive.name}",
+                        path,
+                    )
+            if not provided:
+                self._error(
+                    f"Missing required argument if for directive @{directive.name}",
+                    path,
+                )
+
+    def _use_variable(
+        self, ref: VarRef, path: list[str]
+    ) -> Optional[VariableDefinition]:
+        self._used.add(ref.name)
+        definition = self._definitions.get(ref.name)
+        if definition is None:
+            self._error(f"Variable ${ref.name} is not defined", path)
+        return definition
+
+
+def validate_query(query: Query, schema: Schema) -> list[ValidationError]:
+    """Checks a whole query against the schema, collecting every error found."""
+    return _DocumentValidator(query, schema).run()
+
+
+def check_query(query: Query, schema: Schema):
+    if errors := validate_query(query, schema):
+        raise ValidationErrors(errors)
@@ -0,0 +1,153 @@
+from typing import Optional
+
+
+def ref(spec: str) -> dict:
+    if spec.endswith("!"):
+        return {"kind": "NON_NULL", "name": None, "ofType": ref(spec[:-1])}
+    if spec.startswith("["):
+        return {"kind": "LIST", "name": None, "ofType": ref(spec[1:-1])}
+    return {"kind": KINDS[spec], "name": spec, "ofType": None}
+
+
+def input_value(name: str, spec: str, default: Optional[str] = None) -> dict:
+    return {
+        "name": name,
+        "description": None,
+        "type": ref(spec),
+        "defaultValue": default,
+    }
+
+
+def field(name: str, spec: str, *args: dict) -> dict:
+    return {
+        "name": name,
+        "description": None,
+        "args": list(args),
+        "type": ref(spec),
+        "isDeprecated": False,
+        "deprecationReason": None,
+    }
+
+
+def type_(kind: str, name: str, **attributes) -> dict:
+    return {
+        "kind": kind,
+        "name": name,
+        "description": None,
+        "fields": None,
+        "inputFields": None,
+        "interfaces": None,
+        "enumValues": None,
+        "possibleTypes": None,
+        **attributes,
+    }
+
+
+def enum_value(name: str) -> dict:
+    return {
+        "name": name,
+        "description": None,
+        "isDeprecated": False,
+        "deprecationReason": None,
+    }
+
+
+KINDS = {
+    "ID": "SCALAR",
+    "String": "SCALAR",
+    "Int": "SCALAR",
+    "Float": "SCALAR",
+    "Boolean": "SCALAR",
+    "URI": "SCALAR",
+    "Query": "OBJECT",
+    "User": "OBJECT",
+    "Repository": "OBJECT",
+    "Node": "INTERFACE",
+    "State": "ENUM",
+    "SearchFilter": "INPUT_OBJECT",
+}
+
+INTROSPECTION = {
+    "__schema": {
+        "queryType": {"name": "Query"},
+        "types": [
+            *(
+                type_("SCALAR", name)
+                for name, kind in KINDS.items()
+                if kind == "SCALAR"
+            ),
+            type_(
+                "OBJECT",
+                "Query",
+                fields=[
+                    field("viewer", "User!"),
+                    field(
+                        "repository",
+                        "Repository",
+                        input_value("owner", "String!"),
+                        input_value("name", "String!"),
+                    ),
+                    field("node", "Node", input_value("id", "ID!")),
+                    field("nodes", "[Node]!", input_value("ids", "[ID!]!")),
+                    field(
+                        "search",
+                        "[Repository!]!",
+                        input_value("query", "String!"),
+                        input_value("first", "Int", "10"),
+                        input_value("filter", "SearchFilter"),
+                    ),
+                ],
+            ),
+            type_(
+                "OBJECT",
+                "User",
+                fields=[
+                    field("id", "ID!"),
+                    field("login", "String!"),
+                    field("name", "String"),
+                    field("avatarUrl", "URI!", input_value("size", "Int")),
+                    field(
+                        "repositories",
+                        "[Repository!]!",
+                        input_value("first", "Int"),
+                        input_value("states", "[State!]"),
+                    ),
+                ],
+                interfaces=[ref("Node")],
+            ),
+            type_(
+                "OBJECT",
+                "Repository",
+                fields=[
+                    field("id", "ID!"),
+                    field("name", "String!"),
+                    field("owner", "User!"),
+                    field("url", "URI!"),
+                    field("state", "State"),
+                    field("stargazerCount", "Int!"),
+                ],
+                interfaces=[ref("Node")],
+            ),
+            type_(
+                "INTERFACE",
+                "Node",
+                fields=[field("id", "ID!")],
+                possibleTypes=[ref("User"), ref("Repository")],
+            ),
+            type_(
+                "ENUM",
+                "State",
+                enumValues=[enum_value("OPEN"), enum_value("CLOSED")],
+            ),
+            type_(
+                "INPUT_OBJECT",
+                "SearchFilter",
+                inputFields=[
+                    input_value("state", "State!"),
+                    input_value("minStars", "Int"),
+                    input_value("next", "SearchFilter"),
+                ],
+            ),
+        ],
+    }
+}
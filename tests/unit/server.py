@@ -0,0 +1,71 @@
+import json
+import threading
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+# receives (method, payload, headers) and returns (status, body, response headers)
+Responder = Callable[[str, dict, dict], tuple[int, Optional[dict], dict]]
+
+
+class StubServer:
+    """Loopback GraphQL endpoint answering with a configurable responder."""
+
+    def __init__(self, responder: Responder):
+        self.requests: list[tuple[str, dict, dict]] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                params = parse_qs(urlparse(self.path).query)
+                payload = {key: values[0] for key, values in params.items()}
+                if "variables" in payload:
+                    payload["variables"] = json.loads(payload["variables"])
+                if "extensions" in payload:
+                    payload["extensions"] = json.loads(payload["extensions"])
+                self.respond("GET", payload)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                self.respond("POST", json.loads(body))
+
+            def respond(self, method: str, payload: dict):
+                headers = dict(self.headers.items())
+                stub.requests.append((method, payload, headers))
+                status, body, response_headers = responder(method, payload, headers)
+                encoded = json.dumps(body).encode() if body is not None else b""
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(encoded)))
+                    for name, value in response_headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(encoded)
+                except ConnectionError:
+                    # the client gave up waiting, e.g. after a timeout
+                    self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.01,), daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/graphql"
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+from unittest import TestCase, main
+
+from grafq import Query
+from grafq.cache import ResponseCache, SQLiteCacheBackend, cache_key
+from grafq.client import Client
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingClient(Client):
+    def __init__(self, cache):
+        super().__init__("http://localhost/graphql", cache=cache)
+        self.sent = 0
+
+    def _send(self, method, document, variables, timings=None, timeout=None):
+        self.sent += 1
+        return {"data": {"viewer": {"login": "octocat"}}}
+
+
+class TestResponseCache(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResponseCache(max_entries=2, ttl=10, clock=self.clock)
+
+    def test_key_is_canonical(self):
+        self.assertEqual(
+            cache_key("{a}", {"x": 1, "y": [1, 2]}),
+            cache_key("{a}", {"y": [1, 2], "x": 1}),
+        )
+        self.assertNotEqual(cache_key("{a}", {"x": 1}), cache_key("{a}", {"x": 2}))
+        self.assertEqual(cache_key("{a}", None), cache_key("{a}", {}))
+
+    def test_expiry(self):
+        self.cache.set("a", {"a": 1})
+        self.assertEqual({"a": 1}, self.cache.get("a"))
+        self.clock.now += 11
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(1, self.cache.stats.expirations)
+        self.assertEqual(1, self.cache.stats.misses)
+
+    def test_per_operation_ttl(self):
+        self.cache.set_ttl("slow", 100)
+        self.assertEqual(100, self.cache.ttl_for("slow"))
+        self.assertEqual(10, self.cache.ttl_for("other"))
+        self.assertEqual(10, self.cache.ttl_for(None))
+
+    def test_lru_eviction(self):
+        self.cache.set("a", {})
+        self.cache.set("b", {})
+        self.cache.get("a")
+        self.cache.set("c", {})
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertEqual(1, self.cache.stats.evictions)
+
+    def test_sqlite_backend(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.db")
+            backend = SQLiteCacheBackend(path)
+            ResponseCache(clock=self.clock, backend=backend).set("a", {"a": [1]})
+            backend.close()
+            backend = SQLiteCacheBackend(path)
+            cache = ResponseCache(clock=self.clock, backend=backend)
+            self.assertEqual({"a": [1]}, cache.get("a"))
+            self.assertEqual(1, len(cache))
+            self.clock.now += 61
+            cache.clear()
+            self.assertIsNone(cache.get("a"))
+            backend.close()
+
+    def test_client_integration(self):
+        client = CountingClient(self.cache)
+        query = Query().select("viewer.login").build()
+        first = client.post(query)
+        self.assertEqual(first, client.post(query))
+        self.assertEqual(1, client.sent)
+        self.assertEqual(0.5, self.cache.stats.hit_rate)
+
+
+if __name__ == "__main__":
+    main()
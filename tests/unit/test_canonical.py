@@ -0,0 +1,122 @@
+from unittest import TestCase, main
+
+from grafq import Field, Query, Var
+from grafq.canonical import canonicalize, fingerprint
+from grafq.client import Client
+from grafq.language import (
+    Argument,
+    Field as AstField,
+    Query as AstQuery,
+    Selection,
+    Value,
+)
+
+
+class TestCanonicalize(TestCase):
+    def test_orders_fields_and_arguments(self):
+        a = (
+            Query()
+            .select(
+                Field("repository", owner="asmello", name="grafq").select(
+                    "url", "name"
+                ),
+                "viewer.login",
+            )
+            .build()
+        )
+        b = (
+            Query()
+            .select(
+                "viewer.login",
+                Field("repository", name="grafq", owner="asmello").select(
+                    "name", "url"
+                ),
+            )
+            .build()
+        )
+        self.assertNotEqual(str(a), str(b))
+        self.assertEqual(str(canonicalize(a)), str(canonicalize(b)))
+        self.assertEqual(
+            '{repository(name:"grafq",owner:"asmello"){name,url},viewer{login}}',
+            str(canonicalize(a)),
+        )
+        self.assertEqual(fingerprint(a), fingerprint(b))
+
+    def test_merges_duplicates(self):
+        query = AstQuery(
+            selection_set=[
+                Selection(
+                    AstField("viewer", selection_set=[Selection(AstField("login"))])
+                ),
+                Selection(
+                    AstField(
+                        "viewer",
+                        selection_set=[
+                            Selection(AstField("name")),
+                            Selection(AstField("login", alias="login")),
+                        ],
+                    )
+                ),
+                Selection(
+                    AstField(
+                        "viewer", alias="me", selection_set=[Selection(AstField("id"))]
+                    )
+                ),
+            ]
+        )
+        self.assertEqual("{me:viewer{id},viewer{login,name}}", str(canonicalize(query)))
+
+    def test_keeps_conflicting_fields(self):
+        query = AstQuery(
+            selection_set=[
+                Selection(AstField("node", arguments=[Argument("id", Value(value))]))
+                for value in ("b", "a")
+            ]
+        )
+        self.assertEqual('{node(id:"a"),node(id:"b")}', str(canonicalize(query)))
+
+    def test_variables_and_input_objects(self):
+        a = (
+            Query()
+            .var("q", "String!")
+            .var("first", "Int", 10)
+            .select(
+                Field(
+                    "search",
+                    query=Var("q"),
+                    first=Var("first"),
+                    filter={"state": "OPEN", "minStars": 5},
+                ).select("name")
+            )
+            .build()
+        )
+        self.assertEqual(
+            'query($first:Int=10,$q:String!){search(filter:{minStars: 5, state: "OPEN"},first:$first,query:$q){name}}',
+            str(canonicalize(a)),
+        )
+
+    def test_distinguishes_queries(self):
+        a = Query().select("viewer.login").build()
+        b = Query().select("viewer.name").build()
+        self.assertNotEqual(fingerprint(a), fingerprint(b))
+
+
+class RecordingClient(Client):
+    def __init__(self):
+        super().__init__("http://localhost/graphql", canonical=True)
+        self.documents = []
+
+    def _send(self, method, document, variables, timings=None, timeout=None):
+        self.documents.append(document)
+        return {"data": {}}
+
+
+class TestClient(TestCase):
+    def test_sends_canonical_documents(self):
+        client = RecordingClient()
+        client.post(Query().select("viewer.name", "viewer.login").build())
+        self.assertEqual(["{viewer{login,name}}"], client.documents)
+
+
+if __name__ == "__main__":
+    main()
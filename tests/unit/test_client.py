@@ -0,0 +1,214 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase, main
+
+from grafq import Field, Query, Var
+from grafq.bulk import batch_query
+from grafq.client import Client
+from grafq.errors import OperationErrors
+from tests.unit.introspection import INTROSPECTION
+from tests.unit.server import StubServer
+
+
+class FakeClient(Client):
+    """Answers repository(name: $name) queries locally, failing for names starting with "x"."""
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__("http://localhost/graphql")
+        self.delay = delay
+        self.documents = []
+        self.lock = threading.Lock()
+
+    def _send(self, method, document, variables, timings=None, timeout=None):
+        with self.lock:
+            self.documents.append(document)
+        time.sleep(self.delay)
+        data, errors = {}, []
+        for name, value in (variables or {}).items():
+            suffix = name[len("name") :]
+            key = f"b{suffix[1:]}_repository" if suffix else "repository"
+            if value.startswith("x"):
+                errors.append({"message": f"Not found: {value}", "path": [key]})
+                data[key] = None
+            else:
+                data[key] = {"name": value}
+        return {"data": data, "errors": errors} if errors else {"data": data}
+
+
+QUERY = (
+    Query()
+    .var("name", "String!")
+    .select(Field("repository", name=Var("name")).select("name"))
+    .build()
+)
+
+
+class TestRunMany(TestCase):
+    def test_ordered(self):
+        client = FakeClient()
+        names = [f"repo{i}" for i in range(20)]
+        results = list(client.run_many(QUERY, ({"name": n} for n in names)))
+        self.assertEqual(list(range(20)), [result.index for result in results])
+        self.assertEqual(
+            names, [result.data["repository"]["name"] for result in results]
+        )
+        self.assertEqual(1, len(set(client.documents)))
+
+    def test_unordered(self):
+        client = FakeClient(delay=0.01)
+        results = list(
+            client.run_many(
+                QUERY,
+                [{"name": str(i)} for i in range(10)],
+                concurrency=4,
+                ordered=False,
+            )
+        )
+        self.assertEqual(list(range(10)), sorted(result.index for result in results))
+
+    def test_error_capture(self):
+        client = FakeClient()
+        results = list(client.run_many(QUERY, [{"name": "a"}, {"name": "xb"}]))
+        self.assertTrue(results[0].ok)
+        self.assertIsInstance(results[1].error, OperationErrors)
+
+    def test_batched(self):
+        client = FakeClient()
+        variables = [{"name": name} for name in ("a", "xb", "c", "d", "e")]
+        results = list(client.run_many(QUERY, variables, batch_size=2))
+        self.assertEqual(3, len(client.documents))
+        self.assertEqual({"repository": {"name": "a"}}, results[0].data)
+        self.assertEqual(["repository"], results[1].error.errors[0].path)
+        self.assertEqual({"repository": {"name": "c"}}, results[2].data)
+        self.assertEqual({"repository": {"name": "e"}}, results[4].data)
+
+    def test_batched_malformed_response(self):
+        class MalformedClient(FakeClient):
+            def _send(self, method, document, variables, timings=None, timeout=None):
+                return {"data": {}, "errors": ["not an error object"]}
+
+        variables = [{"name": name} for name in ("a", "b", "c")]
+        results = list(MalformedClient().run_many(QUERY, variables, batch_size=2))
+        self.assertEqual([0, 1, 2], [result.index for result in results])
+        self.assertTrue(all(isinstance(r.error, AttributeError) for r in results))
+
+    def test_batch_query(self):
+        self.assertEqual(
+            "query($name_0:String!,$name_1:String!)"
+            "{b0_repository:repository(name:$name_0){name},"
+            "b1_repository:repository(name:$name_1){name}}",
+            str(batch_query(QUERY, 2)),
+        )
+
+
+class IntrospectingClient(Client):
+    """Serves introspection queries from the offline fixture, slowly."""
+
+    def __init__(self):
+        super().__init__("http://localhost/graphql", thread_safe=True)
+        self.documents = []
+
+    def _send(self, method, document, variables, timings=None, timeout=None):
+        self.documents.append(document)
+        time.sleep(0.01)
+        types = INTROSPECTION["__schema"]["types"]
+        if document.startswith("{__schema"):
+            return {
+                "data": {
+                    "__schema": {
+                        "queryType": {"name": "Query"},
+                        "types": [
+                            {"name": t["name"], "kind": t["kind"]} for t in types
+                        ],
+                    }
+                }
+            }
+        name = re.search(r'__type\(name:"(\w+)"\)', document).group(1)
+        return {"data": {"__type": next(t for t in types if t["name"] == name)}}
+
+
+class TestThreadSafety(TestCase):
+    def test_schema_initialized_once(self):
+        client = IntrospectingClient()
+        with ThreadPoolExecutor(8) as executor:
+            schemas = list(executor.map(lambda _: client.schema(), range(8)))
+        self.assertTrue(all(schema is schemas[0] for schema in schemas))
+        self.assertEqual(2, len(client.documents))
+
+    def test_type_lookups_fetched_once(self):
+        client = IntrospectingClient()
+        schema = client.schema()
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(lambda _: schema.get_type_fields("User"), range(8)))
+        self.assertEqual(3, len(client.documents))
+
+    def test_type_lookups_run_in_parallel(self):
+        class BarrierClient(IntrospectingClient):
+            # both lookups must be in flight at once to get past the barrier
+            barrier = threading.Barrier(2, timeout=5)
+
+            def _send(self, method, document, variables, timings=None, timeout=None):
+                if '"User"' in document or '"Repository"' in document:
+                    self.barrier.wait()
+                return super()._send(method, document, variables, timings, timeout)
+
+        client = BarrierClient()
+        schema = client.schema()
+        with ThreadPoolExecutor(2) as executor:
+            fields = list(executor.map(schema.get_type_fields, ["User", "Repository"]))
+        self.assertIn("login", fields[0])
+        self.assertIn("url", fields[1])
+
+    def test_per_thread_sessions(self):
+        client = IntrospectingClient()
+        with ThreadPoolExecutor(4) as executor:
+            barrier = threading.Barrier(4)
+
+            def session(_):
+                barrier.wait(timeout=5)
+                return client.session
+
+            sessions = set(map(id, executor.map(session, range(4))))
+        self.assertEqual(4, len(sessions))
+        self.assertIs(client.session, client.session)
+        client.close()
+
+    def test_run_many_gives_workers_own_sessions(self):
+        class RecordingClient(Client):
+            def _send(self, method, document, variables, timings=None, timeout=None):
+                with lock:
+                    used.add((threading.get_ident(), self.session))
+                time.sleep(0.01)
+                return super()._send(method, document, variables, timings, timeout)
+
+        lock, used = threading.Lock(), set()
+        responder = lambda method, payload, headers: (200, {"data": {}}, {})
+        with StubServer(responder) as server:
+            client = RecordingClient(server.url)
+            original = client.session
+            list(client.run_many(QUERY, [{"name": "a"}] * 8, concurrency=4))
+            self.assertIs(original, client.session)
+            client.close()
+        threads = {thread for thread, _ in used}
+        sessions = {session for _, session in used}
+        self.assertGreater(len(threads), 1)
+        self.assertEqual(len(threads), len(sessions))
+        self.assertNotIn(original, sessions)
+
+    def test_sessions_of_finished_threads_are_dropped(self):
+        responder = lambda method, payload, headers: (200, {"data": {}}, {})
+        with StubServer(responder) as server:
+            client = Client(server.url, thread_safe=True)
+            counts = []
+            for _ in range(5):
+                list(client.run_many(QUERY, [{"name": "a"}] * 8, concurrency=4))
+                counts.append(len(client._sessions))
+            client.close()
+        # the client's own session, and those of the workers still being torn down
+        self.assertLessEqual(max(counts), 5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import copy
+import os
+import tempfile
+import types
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from grafq import InlineFragment, Query, Var
+from grafq.codegen import generate, main as codegen_main
+from grafq.language import ID
+from grafq.response import ResponseObject, wrap
+from grafq.schema import Schema
+from tests.unit.introspection import INTROSPECTION, field
+
+
+def load(schema: Schema) -> types.ModuleType:
+    module = types.ModuleType("generated")
+    exec(compile(generate(schema), "generated.py", "exec"), module.__dict__)
+    return module
+
+
+class TestGeneratedBuilders(TestCase):
+    def setUp(self):
+        self.schema = Schema(introspection=INTROSPECTION)
+        self.generated = load(self.schema)
+
+    def test_matches_schema_builders(self):
+        def build(root):
+            viewer = root.viewer
+            viewer.login
+            viewer.repositories(first=5, states=["OPEN"]).owner.name
+            return (
+                Query()
+                .var("size", "Int")
+                .select(
+                    viewer,
+                    root.viewer.avatarUrl(size=Var("size")),
+                    root.search(query="grafq", filter={"state": "OPEN"}).select(
+                        "url", InlineFragment().select("name")
+                    ),
+                )
+                .build()
+            )
+
+        self.assertEqual(build(self.schema), build(self.generated.root))
+
+    def test_builders_never_consult_the_schema(self):
+        with patch.object(Schema, "_lookup", side_effect=AssertionError), patch.object(
+            Schema, "get_type_fields", side_effect=AssertionError
+        ):
+            generated = self.generated
+            viewer = generated.root.viewer
+            repositories = viewer.repositories(first=1)
+            repositories.select_paths(["owner.login", "name"])
+            self.assertEqual(
+                "viewer{repositories(first:1){owner{login},name}}",
+                str(viewer.build()),
+            )
+            self.assertIsInstance(repositories, generated.Repository)
+            self.assertFalse(hasattr(repositories, "__dict__"))
+
+    def test_validation(self):
+        viewer = self.generated.root.viewer
+        with self.assertRaises(AttributeError):
+            viewer.missing
+        with self.assertRaises(KeyError):
+            viewer["missing"]
+        with self.assertRaises(TypeError):
+            viewer.select_paths(["repositories.missing"])
+        with self.assertRaises(TypeError):
+            viewer.login(size=1)
+        with self.assertRaises(TypeError):
+            viewer.repositories(last=1)
+        with self.assertRaises(TypeError):
+            viewer.repositories(states=["SHUT"])
+        with self.assertRaises(TypeError):
+            self.generated.root.search(query="grafq", filter={"minStars": 1})
+        with self.assertRaises(TypeError):
+            Query().var("first", "String").select(
+                self.generated.root.repository(owner=Var("first"), name="grafq")
+            )
+
+    def test_unrepresentable_names_are_selected_by_key(self):
+        introspection = copy.deepcopy(INTROSPECTION)
+        repository = next(
+            type_
+            for type_ in introspection["__schema"]["types"]
+            if type_["name"] == "Repository"
+        )
+        repository["fields"] += [field("from", "String"), field("select", "String")]
+        generated = load(Schema(introspection=introspection))
+        self.assertFalse(hasattr(generated.Repository, "from"))
+        owner = generated.root.repository(owner="asmello", name="grafq")
+        owner["from"]
+        owner["select"]
+        self.assertEqual(
+            'repository(owner:"asmello",name:"grafq"){from,select}',
+            str(owner.build()),
+        )
+
+
+class TestGeneratedResponses(TestCase):
+    def setUp(self):
+        self.schema = Schema(introspection=INTROSPECTION)
+        self.generated = load(self.schema)
+        viewer = self.generated.root.viewer
+        viewer.login.alias("handle")
+        viewer.repositories(first=2).select("id", "name")
+        self.query = Query().select(viewer).build()
+        self.data = {
+            "viewer": {
+                "handle": "octocat",
+                "repositories": [{"id": "r0", "name": "a"}, {"id": "r1", "name": "b"}],
+            }
+        }
+
+    def test_responses_never_consult_the_schema(self):
+        generated = self.generated
+        with patch.object(Schema, "_lookup", side_effect=AssertionError), patch.object(
+            Schema, "get_type_fields", side_effect=AssertionError
+        ):
+            response = wrap(self.data, self.query, types=generated.RESPONSES)
+            self.assertIsInstance(response, generated.QueryResponse)
+            viewer = response.viewer
+            self.assertIsInstance(viewer, generated.UserResponse)
+            self.assertEqual("octocat", viewer.handle)
+            # properties read fields by name, not by alias
+            with self.assertRaises(AttributeError):
+                viewer.login
+            repositories = list(viewer.repositories)
+            self.assertIsInstance(repositories[0], generated.RepositoryResponse)
+            self.assertEqual([ID("r0"), ID("r1")], [repo.id for repo in repositories])
+            self.assertFalse(hasattr(repositories[0], "__dict__"))
+
+    def test_matches_schema_responses(self):
+        typed = wrap(self.data, self.query, types=self.generated.RESPONSES)
+        dynamic = wrap(self.data, self.query, self.schema)
+        self.assertEqual(
+            [repo.id for repo in dynamic.viewer.repositories],
+            [repo.id for repo in typed.viewer.repositories],
+        )
+        self.assertIsInstance(typed.viewer.repositories[1], ResponseObject)
+
+    def test_main_writes_utf8(self):
+        introspection = copy.deepcopy(INTROSPECTION)
+        user = next(
+            type_
+            for type_ in introspection["__schema"]["types"]
+            if type_["name"] == "User"
+        )
+        user["description"] = "Café owner ☕"
+        with tempfile.TemporaryDirectory() as directory:
+            schema_path = os.path.join(directory, "schema.json")
+            output = os.path.join(directory, "generated.py")
+            Schema(introspection=introspection).save(schema_path)
+            codegen_main([schema_path, output])
+            with open(output, encoding="utf-8") as f:
+                self.assertIn("Café owner ☕", f.read())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import threading
+import time
+from unittest import TestCase, main
+
+from grafq.bulk import dispatch
+from grafq.concurrency import AdaptiveLimiter
+from grafq.errors import RemoteError
+from grafq.metrics import MetricsCollector
+from tests.unit.test_client import QUERY, FakeClient
+
+
+class TestAdaptiveLimiter(TestCase):
+    def test_additive_increase(self):
+        limiter = AdaptiveLimiter(initial=2, max_limit=4)
+        for _ in range(20):
+            limiter.observe(0.01)
+        self.assertEqual(4, limiter.limit)
+
+    def test_backs_off_on_failure(self):
+        limiter = AdaptiveLimiter(initial=8, backoff=0.5)
+        limiter.observe(0.01, ok=False)
+        self.assertEqual(4, limiter.limit)
+        self.assertEqual(1, limiter.stats.decreases)
+
+    def test_backs_off_on_latency(self):
+        limiter = AdaptiveLimiter(initial=8, backoff=0.5, tolerance=2.0, slack=0)
+        limiter.observe(0.01)
+        limiter.observe(0.015)
+        self.assertEqual(8, limiter.limit)
+        limiter.observe(0.05)
+        self.assertEqual(4, limiter.limit)
+
+    def test_one_decrease_per_event(self):
+        limiter = AdaptiveLimiter(initial=8, backoff=0.5)
+        started = time.monotonic()
+        limiter.observe(0.01, ok=False, started=started)
+        limiter.observe(0.01, ok=False, started=started)
+        self.assertEqual(4, limiter.limit)
+        limiter.observe(0.01, ok=False, started=time.monotonic())
+        self.assertEqual(2, limiter.limit)
+
+    def test_bounds(self):
+        limiter = AdaptiveLimiter(initial=1, min_limit=1)
+        limiter.observe(0.01, ok=False)
+        self.assertEqual(1, limiter.limit)
+        with self.assertRaises(ValueError):
+            AdaptiveLimiter(initial=100, max_limit=10)
+
+
+class TestDispatch(TestCase):
+    def test_respects_limit(self):
+        limiter = AdaptiveLimiter(initial=3, max_limit=3)
+        running, peak = 0, 0
+        lock = threading.Lock()
+
+        def work(item):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.005)
+            with lock:
+                running -= 1
+            return item
+
+        self.assertEqual(list(range(30)), sorted(dispatch(range(30), work, limiter)))
+        self.assertEqual(3, peak)
+
+    def test_failed_results(self):
+        limiter = AdaptiveLimiter(initial=8, backoff=0.5)
+        list(dispatch(range(4), lambda item: item, limiter, lambda item: item == 0))
+        self.assertLess(limiter.limit, 8)
+
+    def test_ordered_results_are_bounded(self):
+        released = threading.Event()
+        pulled_while_blocked = 0
+
+        def tasks():
+            nonlocal pulled_while_blocked
+            for item in range(100):
+                if not released.is_set():
+                    pulled_while_blocked += 1
+                yield item
+
+        def work(item):
+            if item == 0:
+                # everything after the first task finishes, and has to be held back
+                released.wait(timeout=5)
+            return item
+
+        timer = threading.Timer(0.2, released.set)
+        timer.start()
+        results = list(dispatch(tasks(), work, 2, ordered=True))
+        timer.cancel()
+        self.assertEqual(list(range(100)), results)
+        self.assertLessEqual(pulled_while_blocked, 8)
+
+
+class FlakyClient(FakeClient):
+    def _send(self, method, document, variables, timings=None, timeout=None):
+        if variables["name"] == "down":
+            raise RemoteError("unavailable")
+        return super()._send(method, document, variables, timings, timeout)
+
+
+class TestRunMany(TestCase):
+    def test_adaptive(self):
+        client = FlakyClient()
+        limiter = AdaptiveLimiter(initial=4)
+        collector = MetricsCollector().watch_limiter(limiter)
+        names = ["down", *(f"repo{i}" for i in range(10)), "xmissing"]
+        results = list(client.run_many(QUERY, ({"name": n} for n in names), limiter))
+        self.assertEqual(len(names), len(results))
+        self.assertIsInstance(results[0].error, RemoteError)
+        self.assertEqual(1, limiter.stats.decreases)
+        self.assertEqual(limiter.limit, collector.snapshot()["concurrency_limit"])
+
+
+if __name__ == "__main__":
+    main()
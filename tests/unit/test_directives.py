@@ -0,0 +1,186 @@
+from unittest import TestCase, main
+
+from grafq import Field, Fragment, InlineFragment, Query, Var
+from grafq.bulk import batch_query
+from grafq.canonical import canonicalize
+from grafq.fragments import expand_fragments
+from grafq.normalized import NormalizedCache, is_included
+from grafq.parser import parse
+from grafq.schema import Schema
+from tests.unit.introspection import INTROSPECTION
+
+
+def toggled_query():
+    return (
+        Query()
+        .name("Viewer")
+        .var("full", "Boolean!")
+        .select(
+            Field("viewer").select(
+                "id",
+                "__typename",
+                "login",
+                Field("name").include(Var("full")),
+                InlineFragment().skip(Var("full")).select("avatarUrl"),
+            )
+        )
+        .build()
+    )
+
+
+def spread_query():
+    return (
+        Query()
+        .var("full", "Boolean!")
+        .select(
+            Field("viewer").select(
+                "login",
+                Fragment("Profile", on="User")
+                .select("name", "login")
+                .include(Var("full")),
+            )
+        )
+        .build()
+    )
+
+
+class TestDirectiveRendering(TestCase):
+    def test_field_and_inline_fragment(self):
+        query = toggled_query()
+        self.assertEqual(
+            "query Viewer($full:Boolean!){viewer{id,__typename,login,"
+            "name@include(if:$full),...@skip(if:$full){avatarUrl}}}",
+            str(query),
+        )
+        self.assertEqual(
+            "query Viewer($full: Boolean!) {\n"
+            "  viewer {\n"
+            "    id\n"
+            "    __typename\n"
+            "    login\n"
+            "    name @include(if: $full)\n"
+            "    ... @skip(if: $full) {\n"
+            "      avatarUrl\n"
+            "    }\n"
+            "  }\n"
+            "}",
+            query.pretty(),
+        )
+
+    def test_fragment_spread(self):
+        query = spread_query()
+        self.assertEqual(
+            "query($full:Boolean!){viewer{login,...Profile@include(if:$full)}}"
+            "fragment Profile on User{name,login}",
+            str(query),
+        )
+        self.assertIn("...Profile @include(if: $full)", query.pretty())
+        self.assertEqual(str(query), str(parse(str(query))))
+        self.assertEqual(
+            "{viewer{login,...on User@include(if:$full){name,login}}}",
+            str(expand_fragments(query)).split("query($full:Boolean!)")[1],
+        )
+
+    def test_custom_directive(self):
+        field = Field("avatarUrl").directive("cached", ttl=60).build()
+        self.assertEqual("avatarUrl@cached(ttl:60)", str(field))
+
+    def test_invalid_condition(self):
+        with self.assertRaises(TypeError):
+            Field("name").include("yes")
+
+    def test_is_included(self):
+        directives = Field("name").include(Var("a")).skip(Var("b")).build().directives
+        self.assertTrue(is_included(directives, {"a": True, "b": False}))
+        self.assertFalse(is_included(directives, {"a": False, "b": False}))
+        self.assertFalse(is_included(directives, {"a": True, "b": True}))
+        self.assertTrue(is_included(None, {}))
+
+
+class TestDirectiveValidation(TestCase):
+    def setUp(self):
+        self.schema = Schema(introspection=INTROSPECTION)
+
+    def messages(self, query) -> list[str]:
+        return [error.message for error in self.schema.validate(query)]
+
+    def test_valid(self):
+        self.assertEqual([], self.messages(toggled_query()))
+
+    def test_fragment_spread(self):
+        self.assertEqual([], self.messages(spread_query()))
+        query = (
+            Query()
+            .var("full", "String")
+            .select(
+                Field("viewer").select(
+                    Fragment("Profile", on="User").select("name").skip(Var("full"))
+                )
+            )
+            .build()
+        )
+        self.assertEqual(
+            [
+                "Invalid usage of variable $full of type String as argument if of type Boolean!"
+            ],
+            self.messages(query),
+        )
+
+    def test_invalid(self):
+        query = (
+            Query()
+            .var("full", "String")
+            .select(
+                Field("viewer").select(
+                    Field("login").include(Var("full")),
+                    Field("name").directive("skip", when=True),
+                    Field("id").include(True),
+                )
+            )
+            .build()
+        )
+        self.assertEqual(
+            [
+                "Invalid usage of variable $full of type String as argument if of type Boolean!",
+                "Invalid argument when for directive @skip",
+                "Missing required argument if for directive @skip",
+            ],
+            self.messages(query),
+        )
+
+
+class TestDirectivePasses(TestCase):
+    def test_normalized_cache_ignores_excluded_fields(self):
+        cache = NormalizedCache()
+        query = toggled_query()
+        viewer = {"id": "u1", "__typename": "User", "login": "octocat", "name": "Mona"}
+        cache.write(query, {"viewer": viewer}, {"full": True})
+        self.assertEqual(({"viewer": viewer}, None), cache.read(query, {"full": True}))
+        # the skipped fragment never ran, so its fields are still missing
+        self.assertIsNotNone(cache.read(query, {"full": False})[1])
+
+    def test_batch_renames_directive_variables(self):
+        batched = batch_query(toggled_query(), 2)
+        self.assertIn("name@include(if:$full_1)", str(batched))
+        self.assertIn("...@skip(if:$full_0)", str(batched))
+
+    def test_canonical_keeps_conditional_fields_apart(self):
+        query = (
+            Query()
+            .select(
+                Field("viewer").select(
+                    InlineFragment().include(Var("a")).select("name"),
+                    InlineFragment().include(Var("a")).select("login"),
+                    "login",
+                )
+            )
+            .build()
+        )
+        self.assertEqual(
+            "{viewer{login,...@include(if:$a){login,name}}}",
+            str(canonicalize(query)),
+        )
+
+
+if __name__ == "__main__":
+    main()
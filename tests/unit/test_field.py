@@ -2,6 +2,8 @@ from unittest import TestCase, main
 
 from grafq import Field
 from grafq.language import Argument, Value, Field as FrozenField
+from grafq.schema import Schema
+from tests.unit.introspection import INTROSPECTION
 
 
 class TestField(TestCase):
@@ -42,5 +44,89 @@ class TestField(TestCase):
         self.assertEqual("alt:test", str(field))
 
 
+class TestClone(TestCase):
+    def test_clone_is_independent(self):
+        base = Field("viewer").select(
+            "login", Field("repositories", first=1).select("name", "owner.login")
+        )
+        clone = base.clone()
+        clone.select(Field("repositories", first=5).select("url"))
+        clone.arg("as", "admin")
+        base.select("name")
+        self.assertEqual(
+            "viewer{login,repositories(first:1){name,owner{login}},name}",
+            str(base.build()),
+        )
+        self.assertEqual(
+            'viewer(as:"admin"){login,repositories(first:5){name,owner{login},url}}',
+            str(clone.build()),
+        )
+
+    def test_only_modified_path_is_copied(self):
+        base = Field("viewer").select("login", "repositories.name", "avatarUrl")
+        clone = base.clone()
+        self.assertIs(base._children, clone._children)
+        clone.select("repositories.url")
+        self.assertIsNot(base._children, clone._children)
+        self.assertIs(
+            base._children["avatarUrl"]._children,
+            clone._children["avatarUrl"]._children,
+        )
+        self.assertIsNot(
+            base._children["repositories"]._children,
+            clone._children["repositories"]._children,
+        )
+
+    def test_writes_through_earlier_references_stay_in_the_original(self):
+        base = Field("viewer").select("login", Field("repos").select("name"))
+        repos = base._children["repos"]
+        name = repos._children["name"]
+        clone = base.clone()
+        repos.arg("first", 3)
+        name.alias("title")
+        self.assertEqual("viewer{login,repos(first:3){title:name}}", str(base.build()))
+        self.assertEqual("viewer{login,repos{name}}", str(clone.build()))
+
+    def test_writes_through_clone_references_stay_in_the_clone(self):
+        schema = Schema(introspection=INTROSPECTION)
+        base = schema.viewer.select("login")
+        base.repositories.select("name")
+        clone = base.clone()
+        repositories = clone.repositories
+        again = clone.clone()
+        repositories(first=3)
+        base.repositories(first=1)
+        self.assertEqual("viewer{login,repositories(first:1){name}}", str(base.build()))
+        self.assertEqual(
+            "viewer{login,repositories(first:3){name}}", str(clone.build())
+        )
+        self.assertEqual("viewer{login,repositories{name}}", str(again.build()))
+
+    def test_typed_clone(self):
+        schema = Schema(introspection=INTROSPECTION)
+        base = schema.viewer.select("login")
+        base.repositories(first=1).select("name")
+        clone = base.clone()
+        self.assertIs(base._schema, clone._schema)
+        clone.repositories(first=10)
+        clone.avatarUrl(size=64)
+        self.assertEqual("viewer{login,repositories(first:1){name}}", str(base.build()))
+        self.assertEqual(
+            "viewer{login,repositories(first:10){name},avatarUrl(size:64)}",
+            str(clone.build()),
+        )
+
+    def test_nested_clone_keeps_ancestors(self):
+        schema = Schema(introspection=INTROSPECTION)
+        base = schema.viewer.select("login")
+        nested = base.repositories.clone()
+        nested(first=3)
+        self.assertIsNot(base, nested.root())
+        self.assertEqual(
+            "viewer{login,repositories(first:3)}", str(nested.root().build())
+        )
+        self.assertEqual("viewer{login,repositories}", str(base.build()))
+
+
 if __name__ == "__main__":
     main()
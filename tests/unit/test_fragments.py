@@ -0,0 +1,278 @@
+from unittest import TestCase, main
+
+from grafq import Field, Fragment, InlineFragment, Query
+from grafq.fragments import expand_fragments, extract_fragments, response_keys
+from grafq.language import (
+    Field as AstField,
+    FragmentDefinition,
+    FragmentSpread,
+    InlineFragment as AstInlineFragment,
+    Query as AstQuery,
+    Selection,
+)
+from grafq.normalized import NormalizedCache
+from grafq.schema import Schema
+
+from tests.unit.introspection import INTROSPECTION
+
+REPOSITORY = (
+    "id",
+    "name",
+    "url",
+    "state",
+    "stargazerCount",
+    "owner.id",
+    "owner.login",
+    "owner.name",
+)
+
+
+class TestFragmentRendering(TestCase):
+    def test_spread_and_definition(self):
+        query = AstQuery(
+            [
+                Selection(
+                    AstField("viewer", selection_set=[FragmentSpread("UserFields")])
+                )
+            ],
+            fragments=[
+                FragmentDefinition("UserFields", "User", [Selection(AstField("login"))])
+            ],
+        )
+        self.assertEqual(
+            "{viewer{...UserFields}}fragment UserFields on User{login}", str(query)
+        )
+        self.assertEqual(
+            "{\n  viewer {\n    ...UserFields\n  }\n}\n\n"
+            "fragment UserFields on User {\n  login\n}",
+            query.pretty(),
+        )
+
+    def test_inline_fragment(self):
+        field = AstField(
+            "node",
+            selection_set=[
+                AstInlineFragment([Selection(AstField("login"))], "User"),
+                AstInlineFragment([Selection(AstField("name"))]),
+            ],
+        )
+        self.assertEqual("node{...on User{login},...{name}}", str(field))
+
+
+class TestFragmentBlueprints(TestCase):
+    def setUp(self):
+        self.schema = Schema(introspection=INTROSPECTION)
+
+    def test_definitions_are_collected(self):
+        owner = Fragment("OwnerFields", on="User").select("login")
+        repository = Fragment("RepositoryFields", on="Repository").select(
+            "name", Field("owner").select(owner)
+        )
+        query = (
+            Query()
+            .select(
+                Field("viewer").select(owner, Field("repositories").select(repository)),
+                Field("repository", owner="asmello", name="grafq").select(repository),
+            )
+            .build()
+        )
+        self.assertEqual(
+            "{viewer{repositories{...RepositoryFields},...OwnerFields},"
+            'repository(owner:"asmello",name:"grafq"){...RepositoryFields}}'
+            "fragment OwnerFields on User{login}"
+            "fragment RepositoryFields on Repository{name,owner{...OwnerFields}}",
+            str(query),
+        )
+        self.assertEqual([], self.schema.validate(query))
+
+    def test_conflicting_definitions(self):
+        with self.assertRaises(TypeError):
+            Query().select(
+                Field("viewer").select(Fragment("UserFields", on="User").select("id")),
+                Field("repository").select(
+                    Field("owner").select(
+                        Fragment("UserFields", on="User").select("login")
+                    )
+                ),
+            ).build()
+
+    def test_inline_fragments(self):
+        query = (
+            Query(schema=self.schema)
+            .select(
+                Field("node", id="1").select(
+                    "id",
+                    InlineFragment(on="User").select("login"),
+                    InlineFragment(on="Repository").select("name"),
+                )
+            )
+            .build(identify=False)
+        )
+        self.assertEqual(
+            '{node(id:"1"){id,...on User{login},...on Repository{name}}}', str(query)
+        )
+        self.assertEqual([], self.schema.validate(query))
+
+
+class TestExpandAndExtract(TestCase):
+    def setUp(self):
+        self.schema = Schema(introspection=INTROSPECTION)
+
+    def build(self, fragments: bool, **kwargs):
+        return (
+            Query(schema=self.schema)
+            .select(
+                Field("viewer").select(Field("repositories").select(*REPOSITORY)),
+                Field("repository", owner="asmello", name="grafq").select(*REPOSITORY),
+                Field("search", query="grafq").select(*REPOSITORY),
+            )
+            .build(fragments=fragments, **kwargs)
+        )
+
+    def test_extracts_repeated_subtrees(self):
+        plain = self.build(False, identify=False)
+        query = self.build(True, identify=False)
+        self.assertEqual(
+            "{viewer{repositories{...RepositoryFields}},"
+            'repository(owner:"asmello",name:"grafq"){...RepositoryFields},'
+            'search(query:"grafq"){...RepositoryFields}}'
+            "fragment RepositoryFields on Repository"
+            "{id,name,url,state,stargazerCount,owner{id,login,name}}",
+            str(query),
+        )
+        self.assertLess(len(str(query)), len(str(plain)))
+        self.assertEqual([], self.schema.validate(query))
+
+    def test_small_subtrees_are_kept(self):
+        query = (
+            Query(schema=self.schema)
+            .select("viewer.login", Field("repository").select("owner.login"))
+            .build(identify=False)
+        )
+        self.assertEqual(query, extract_fragments(query, self.schema))
+
+    def test_extraction_requires_schema(self):
+        with self.assertRaises(RuntimeError):
+            Query().select("viewer.login").build(fragments=True)
+
+    def test_expand_rejects_cycles(self):
+        query = AstQuery(
+            [Selection(AstField("viewer", selection_set=[FragmentSpread("A")]))],
+            fragments=[FragmentDefinition("A", "User", [FragmentSpread("A")])],
+        )
+        with self.assertRaises(ValueError):
+            expand_fragments(query)
+
+    def test_response_keys(self):
+        query = self.build(True)
+        self.assertEqual(
+            ["viewer", "repository", "search"], list(response_keys(query.selection_set))
+        )
+
+
+class TestFragmentValidation(TestCase):
+    def setUp(self):
+        self.schema = Schema(introspection=INTROSPECTION)
+
+    def messages(self, query: AstQuery) -> list[str]:
+        return [error.message for error in self.schema.validate(query)]
+
+    def test_unknown_and_unused_fragments(self):
+        query = AstQuery(
+            [Selection(AstField("viewer", selection_set=[FragmentSpread("Missing")]))],
+            fragments=[
+                FragmentDefinition("Unused", "User", [Selection(AstField("login"))])
+            ],
+        )
+        self.assertEqual(
+            ["Unknown fragment Missing", "Fragment Unused is never used"],
+            self.messages(query),
+        )
+
+    def test_type_conditions(self):
+        query = AstQuery(
+            [
+                Selection(
+                    AstField(
+                        "viewer",
+                        selection_set=[
+                            FragmentSpread("RepositoryFields"),
+                            AstInlineFragment([Selection(AstField("id"))], "State"),
+                        ],
+                    )
+                )
+            ],
+            fragments=[
+                FragmentDefinition(
+                    "RepositoryFields", "Repository", [Selection(AstField("login"))]
+                )
+            ],
+        )
+        self.assertEqual(
+            [
+                "Fragment RepositoryFields cannot be spread on type User",
+                "Type condition on non-composite type State",
+                "Field login does not exist on type Repository",
+            ],
+            self.messages(query),
+        )
+
+    def test_interface_conditions(self):
+        query = AstQuery(
+            [
+                Selection(
+                    AstField(
+                        "viewer",
+                        selection_set=[
+                            AstInlineFragment([Selection(AstField("id"))], "Node")
+                        ],
+                    )
+                )
+            ]
+        )
+        self.assertEqual([], self.messages(query))
+
+
+class TestNormalizedFragments(TestCase):
+    def test_reads_through_inline_fragments(self):
+        schema = Schema(introspection=INTROSPECTION)
+        query = (
+            Query(schema=schema)
+            .select(
+                Field("node", id="1").select(
+                    InlineFragment(on="User").select("login"),
+                    InlineFragment(on="Repository").select("name"),
+                )
+            )
+            .build()
+        )
+        cache = NormalizedCache()
+        cache.write(query, {"node": {"__typename": "User", "id": "1", "login": "a"}})
+        data, missing = cache.read(query)
+        self.assertIsNone(missing)
+        self.assertEqual({"node": {"login": "a"}}, data)
+
+    def test_interface_conditions_are_remembered(self):
+        query = AstQuery(
+            [
+                Selection(
+                    AstField(
+                        "viewer",
+                        selection_set=[
+                            Selection(AstField("__typename")),
+                            AstInlineFragment([Selection(AstField("id"))], "Node"),
+                        ],
+                    )
+                )
+            ]
+        )
+        cache = NormalizedCache()
+        self.assertIsNotNone(cache.read(query)[1])
+        cache.write(query, {"viewer": {"__typename": "User", "id": "1"}})
+        self.assertEqual(
+            ({"viewer": {"__typename": "User", "id": "1"}}, None), cache.read(query)
+        )
+
+
+if __name__ == "__main__":
+    main()
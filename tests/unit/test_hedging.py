@@ -0,0 +1,149 @@
+import itertools
+import time
+from unittest import TestCase, main
+
+from grafq.client import Client
+from grafq.errors import DeadlineExceeded
+from grafq.hedging import HedgePolicy
+from grafq.language import Field, Query, Selection
+from tests.unit.server import StubServer
+
+QUERY = Query(
+    selection_set=[
+        Selection(Field("viewer", selection_set=[Selection(Field("login"))]))
+    ]
+)
+DATA = {"viewer": {"login": "octocat"}}
+
+
+def slow_first(delay: float):
+    counter = itertools.count()
+
+    def respond(method, payload, headers):
+        if next(counter) == 0:
+            time.sleep(delay)
+        return 200, {"data": DATA}, {}
+
+    return respond
+
+
+class TestHedgePolicy(TestCase):
+    def test_needs_samples(self):
+        policy = HedgePolicy(min_samples=3)
+        policy.observe(0.1)
+        self.assertIsNone(policy.delay())
+
+    def test_percentile(self):
+        policy = HedgePolicy(percentile=0.9, min_samples=1)
+        for i in range(1, 11):
+            policy.observe(i / 100)
+        self.assertAlmostEqual(0.09, policy.delay())
+
+    def test_min_delay(self):
+        policy = HedgePolicy(min_samples=1, min_delay=0.5)
+        policy.observe(0.1)
+        self.assertEqual(0.5, policy.delay())
+
+    def test_invalid_percentile(self):
+        with self.assertRaises(ValueError):
+            HedgePolicy(percentile=1)
+
+
+class TestDeadlines(TestCase):
+    def test_per_call_timeout(self):
+        with StubServer(slow_first(1.0)) as server:
+            client = Client(server.url)
+            with self.assertRaises(DeadlineExceeded):
+                client.post(QUERY, timeout=0.1)
+            self.assertEqual(DATA, client.post(QUERY, timeout=1.0))
+            client.close()
+
+    def test_client_timeout(self):
+        with StubServer(slow_first(1.0)) as server:
+            client = Client(server.url, timeout=0.1)
+            with self.assertRaises(DeadlineExceeded):
+                client.get(QUERY)
+            client.close()
+
+    def test_run_many_timeout(self):
+        for batch_size in (1, 2):
+            with StubServer(slow_first(1.0)) as server:
+                client = Client(server.url)
+                results = list(
+                    client.run_many(
+                        QUERY,
+                        [None] * 2 * batch_size,
+                        concurrency=1,
+                        batch_size=batch_size,
+                        timeout=0.1,
+                    )
+                )
+                client.close()
+            errors = [type(result.error) for result in results]
+            self.assertEqual([DeadlineExceeded] * batch_size, errors[:batch_size])
+            self.assertTrue(all(result.ok for result in results[batch_size:]))
+
+    def test_run_many_client_timeout(self):
+        with StubServer(slow_first(1.0)) as server:
+            client = Client(server.url, timeout=0.1)
+            results = list(client.run_many(QUERY, [None, None], concurrency=1))
+            client.close()
+        self.assertIsInstance(results[0].error, DeadlineExceeded)
+        self.assertEqual(DATA, results[1].data)
+
+
+class TestHedging(TestCase):
+    def test_hedge_wins(self):
+        policy = HedgePolicy(min_samples=1)
+        policy.observe(0.02)
+        timings = []
+        with StubServer(slow_first(1.0)) as server:
+            client = Client(server.url, hedge=policy, hooks=[timings.append])
+            start = time.perf_counter()
+            self.assertEqual(DATA, client.post(QUERY))
+            self.assertLess(time.perf_counter() - start, 0.5)
+            self.assertEqual(2, len(server.requests))
+            client.close()
+        self.assertEqual(1, policy.stats.hedged)
+        self.assertEqual(1, policy.stats.won)
+        [timing] = timings
+        self.assertTrue(timing.hedged)
+        self.assertGreater(timing.network, 0.02)
+
+    def test_fast_primary_not_hedged(self):
+        policy = HedgePolicy(min_samples=1)
+        policy.observe(1.0)
+        with StubServer(slow_first(0.0)) as server:
+            client = Client(server.url, hedge=policy)
+            self.assertEqual(DATA, client.post(QUERY))
+            self.assertEqual(1, len(server.requests))
+            client.close()
+        self.assertEqual(0, policy.stats.hedged)
+
+    def test_warm_up(self):
+        policy = HedgePolicy(min_samples=2)
+        with StubServer(slow_first(0.0)) as server:
+            client = Client(server.url, hedge=policy)
+            client.post(QUERY)
+            client.post(QUERY)
+            client.close()
+        self.assertEqual(2, policy.stats.requests)
+        self.assertIsNotNone(policy.delay())
+
+    def test_deadline(self):
+        policy = HedgePolicy(min_samples=1)
+        policy.observe(0.01)
+
+        def respond(method, payload, headers):
+            time.sleep(1.0)
+            return 200, {"data": DATA}, {}
+
+        with StubServer(respond) as server:
+            client = Client(server.url, hedge=policy, timeout=0.2)
+            with self.assertRaises(DeadlineExceeded):
+                client.post(QUERY)
+            client.close()
+
+
+if __name__ == "__main__":
+    main()
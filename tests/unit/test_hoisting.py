@@ -0,0 +1,139 @@
+from enum import Enum
+from unittest import TestCase, main
+
+from grafq import Field, Var
+from grafq.blueprints import QueryBlueprint
+from grafq.client import Client
+from grafq.language import Null
+from grafq.schema import Schema
+from tests.unit.introspection import INTROSPECTION
+
+
+class State(Enum):
+    OPEN = 1
+    CLOSED = 2
+
+
+class RecordingClient(Client):
+    def __init__(self):
+        super().__init__("http://localhost/graphql")
+        self.sent = []
+
+    def _send(self, method, document, variables, timings=None, timeout=None):
+        self.sent.append((document, variables))
+        return {"data": {}}
+
+
+class TestHoisting(TestCase):
+    def setUp(self):
+        self.schema = Schema(introspection=INTROSPECTION)
+
+    def blueprint(self, client=None) -> QueryBlueprint:
+        return QueryBlueprint(client=client, schema=self.schema)
+
+    def test_hoists_typed_arguments(self):
+        query = (
+            self.blueprint()
+            .select(
+                Field("repository", owner="asmello", name="grafq").select("url"),
+                Field("viewer").select(Field("avatarUrl", size=64)),
+            )
+            .build(hoist=True)
+        )
+        self.assertEqual(
+            "query($owner:String!,$name:String!,$size:Int)"
+            "{repository(owner:$owner,name:$name){url},viewer{avatarUrl(size:$size)}}",
+            str(query),
+        )
+        self.assertEqual(
+            {"owner": "asmello", "name": "grafq", "size": 64}, query.variables
+        )
+
+    def test_same_document_for_all_values(self):
+        def build(name):
+            return (
+                self.blueprint()
+                .select(Field("repository", owner="asmello", name=name).select("url"))
+                .build(hoist=True)
+            )
+
+        self.assertEqual(str(build("grafq")), str(build("other")))
+        self.assertEqual("other", build("other").variables["name"])
+
+    def test_complex_values(self):
+        query = (
+            self.blueprint()
+            .select(
+                Field(
+                    "search",
+                    query="grafq",
+                    filter={"state": State.OPEN, "minStars": Null},
+                ).select("name"),
+                Field("viewer").select(
+                    Field("repositories", states=[State.OPEN, State.CLOSED]).select(
+                        "name"
+                    )
+                ),
+            )
+            .build(hoist=True)
+        )
+        self.assertIn("$filter:SearchFilter", str(query))
+        self.assertIn("$states:[State!]", str(query))
+        self.assertEqual(
+            {
+                "query": "grafq",
+                "filter": {"state": "OPEN", "minStars": None},
+                "states": ["OPEN", "CLOSED"],
+            },
+            query.variables,
+        )
+
+    def test_keeps_variables_and_avoids_clashes(self):
+        query = (
+            self.blueprint()
+            .var("name", "String!")
+            .select(
+                Field("repository", owner="asmello", name=Var("name")).select(
+                    Field("owner").select(
+                        Field("repositories", first=1).select("name")
+                    ),
+                ),
+                Field("search", query="x", first=5).select("name"),
+            )
+            .build(hoist=True)
+        )
+        self.assertEqual(
+            "query($name:String!,$owner:String!,$first:Int,$query:String!,$first2:Int)"
+            "{repository(owner:$owner,name:$name){owner{repositories(first:$first){name}}},"
+            "search(query:$query,first:$first2){name}}",
+            str(query),
+        )
+
+    def test_unknown_fields_stay_inline(self):
+        query = (
+            self.blueprint()
+            .select(Field("unknown", arg=1).select("x"))
+            .build(hoist=True)
+        )
+        self.assertEqual("{unknown(arg:1){x}}", str(query))
+        self.assertIsNone(query.variables)
+
+    def test_requires_schema(self):
+        with self.assertRaises(RuntimeError):
+            QueryBlueprint().select(Field("viewer", x=1)).build(hoist=True)
+
+    def test_bound_variables_are_sent(self):
+        client = RecordingClient()
+        query = (
+            self.blueprint(client)
+            .select(Field("repository", owner="asmello", name="grafq").select("url"))
+            .build(hoist=True)
+        )
+        query.run()
+        client.post(query, {"name": "other"})
+        self.assertEqual({"owner": "asmello", "name": "grafq"}, client.sent[0][1])
+        self.assertEqual({"owner": "asmello", "name": "other"}, client.sent[1][1])
+
+
+if __name__ == "__main__":
+    main()
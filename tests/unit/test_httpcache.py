@@ -0,0 +1,164 @@
+import hashlib
+from unittest import TestCase, main
+
+from grafq import Field, Query, Var
+from grafq.client import Client
+from grafq.httpcache import HTTPCache
+from tests.unit.server import StubServer
+
+QUERY = (
+    Query()
+    .var("size", "Int")
+    .select(Field("viewer").select("login", Field("avatarUrl", size=Var("size"))))
+    .build()
+)
+DATA = {"viewer": {"login": "octocat", "avatarUrl": "https://example.com/a.png"}}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class GraphQLServer:
+    """Responder supporting persisted queries and entity tags."""
+
+    def __init__(self, cache_control=None):
+        self.documents = {}
+        self.cache_control = cache_control
+
+    def __call__(self, method, payload, headers):
+        document = payload.get("query")
+        persisted = payload.get("extensions", {}).get("persistedQuery")
+        if persisted is not None:
+            if document is None:
+                document = self.documents.get(persisted["sha256Hash"])
+                if document is None:
+                    return 200, {"errors": [{"message": "PersistedQueryNotFound"}]}, {}
+            else:
+                self.documents[persisted["sha256Hash"]] = document
+        assert payload.get("variables", {}).get("size") in (None, 64)
+        response_headers = {"ETag": '"v1"'}
+        if self.cache_control:
+            response_headers["Cache-Control"] = self.cache_control
+        if method == "GET" and headers.get("If-None-Match") == '"v1"':
+            return 304, None, response_headers
+        return 200, {"data": DATA}, response_headers
+
+
+class TestMethodSelection(TestCase):
+    def test_get_encodes_variables_as_json(self):
+        with StubServer(GraphQLServer()) as server:
+            client = Client(server.url)
+            self.assertEqual(DATA, client.get(QUERY, {"size": 64}))
+            method, payload, _ = server.requests[0]
+            self.assertEqual("GET", method)
+            self.assertEqual({"size": 64}, payload["variables"])
+            client.close()
+
+    def test_auto(self):
+        timings = []
+        with StubServer(GraphQLServer()) as server:
+            client = Client(server.url, hooks=[timings.append])
+            client.execute(QUERY, {"size": 64})
+            short = Client(server.url, max_url_length=50, hooks=[timings.append])
+            short.execute(QUERY, {"size": 64})
+            self.assertEqual(["GET", "POST"], [r[0] for r in server.requests])
+            client.close()
+            short.close()
+        self.assertEqual(["GET", "POST"], [t.method for t in timings])
+
+
+class TestPersistedQueries(TestCase):
+    def test_registers_then_sends_hash(self):
+        responder = GraphQLServer()
+        with StubServer(responder) as server:
+            client = Client(server.url, persisted_queries=True)
+            self.assertEqual(DATA, client.execute(QUERY, {"size": 64}))
+            self.assertEqual(DATA, client.execute(QUERY, {"size": 64}))
+            client.close()
+        payloads = [payload for _, payload, _ in server.requests]
+        self.assertEqual(3, len(payloads))
+        self.assertNotIn("query", payloads[0])
+        self.assertIn("query", payloads[1])
+        self.assertNotIn("query", payloads[2])
+        digest = hashlib.sha256(str(QUERY).encode()).hexdigest()
+        self.assertEqual(
+            digest, payloads[2]["extensions"]["persistedQuery"]["sha256Hash"]
+        )
+        self.assertEqual({digest}, set(responder.documents))
+
+    def test_post(self):
+        with StubServer(GraphQLServer()) as server:
+            client = Client(server.url, persisted_queries=True)
+            client.post(QUERY, {"size": 64})
+            client.post(QUERY, {"size": 64})
+            client.close()
+        self.assertEqual(["POST"] * 3, [r[0] for r in server.requests])
+        self.assertNotIn("query", server.requests[2][1])
+
+
+class TestConditionalRequests(TestCase):
+    def test_not_modified(self):
+        timings = []
+        with StubServer(GraphQLServer()) as server:
+            client = Client(server.url, http_cache=HTTPCache(), hooks=[timings.append])
+            self.assertEqual(DATA, client.get(QUERY, {"size": 64}))
+            self.assertEqual(DATA, client.get(QUERY, {"size": 64}))
+            client.close()
+        self.assertEqual('"v1"', server.requests[1][2]["If-None-Match"])
+        self.assertTrue(timings[1].not_modified)
+        self.assertEqual(0, timings[1].bytes_received)
+
+    def test_evicted_before_not_modified(self):
+        cache = HTTPCache()
+        responder = GraphQLServer()
+
+        def respond(method, payload, headers):
+            # evicts the entry a conditional request is based on, before its 304
+            cache.clear()
+            return responder(method, payload, headers)
+
+        with StubServer(respond) as server:
+            client = Client(server.url, http_cache=cache)
+            self.assertEqual(DATA, client.get(QUERY, {"size": 64}))
+            self.assertEqual(DATA, client.get(QUERY, {"size": 64}))
+            client.close()
+        self.assertEqual('"v1"', server.requests[1][2]["If-None-Match"])
+        self.assertEqual(1, len(cache))
+
+    def test_max_age(self):
+        clock = Clock()
+        with StubServer(GraphQLServer("public, max-age=60")) as server:
+            client = Client(server.url, http_cache=HTTPCache(clock=clock))
+            client.get(QUERY, {"size": 64})
+            client.get(QUERY, {"size": 64})
+            self.assertEqual(1, len(server.requests))
+            clock.now = 61
+            self.assertEqual(DATA, client.get(QUERY, {"size": 64}))
+            self.assertEqual(2, len(server.requests))
+            client.close()
+
+    def test_no_store(self):
+        cache = HTTPCache()
+        cache.store("u", {"Cache-Control": "no-store", "ETag": '"x"'}, DATA)
+        self.assertEqual(0, len(cache))
+        cache.store("u", {"etag": '"x"'}, DATA)
+        self.assertEqual('"x"', cache.get("u").etag)
+        self.assertFalse(cache.is_fresh(cache.get("u")))
+
+    def test_post_not_cached(self):
+        with StubServer(GraphQLServer()) as server:
+            client = Client(server.url, http_cache=HTTPCache())
+            client.post(QUERY, {"size": 64})
+            client.post(QUERY, {"size": 64})
+            client.close()
+        self.assertNotIn("If-None-Match", server.requests[1][2])
+        self.assertEqual(0, len(client.http_cache))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+from unittest import TestCase, main
+
+from grafq.client import Client
+from grafq.errors import OperationErrors
+from tests.unit.introspection import INTROSPECTION
+from tests.unit.server import StubServer
+
+
+def respond(method, payload, headers):
+    if "broken" in payload["query"]:
+        return 200, {"errors": [{"message": "broken", "path": ["broken"]}]}, {}
+    if "__schema" in payload["query"]:
+        types = INTROSPECTION["__schema"]["types"]
+        return (
+            200,
+            {
+                "data": {
+                    "__schema": {
+                        "queryType": {"name": "Query"},
+                        "types": [
+                            {"name": t["name"], "kind": t["kind"]} for t in types
+                        ],
+                    }
+                }
+            },
+            {},
+        )
+    if "__type" in payload["query"]:
+        return 200, {"data": {"__type": INTROSPECTION["__schema"]["types"][6]}}, {}
+    return 200, {"data": {"viewer": {"login": "octocat"}}}, {}
+
+
+class TestInstrumentation(TestCase):
+    def setUp(self):
+        self.server = StubServer(respond).__enter__()
+        self.timings = []
+        self.client = Client(self.server.url, hooks=[self.timings.append])
+
+    def tearDown(self):
+        self.client.close()
+        self.server.__exit__()
+
+    def test_breakdown(self):
+        self.client.new_query(with_schema=False).name("Me").select(
+            "viewer.login"
+        ).build_and_run()
+        [timings] = self.timings
+        self.assertEqual("Me", timings.operation_name)
+        self.assertEqual("POST", timings.method)
+        self.assertGreater(timings.build, 0)
+        self.assertGreater(timings.render, 0)
+        self.assertGreater(timings.network, 0)
+        self.assertGreater(timings.decode, 0)
+        self.assertEqual(len('{"query": "{viewer{login}}"}'), timings.bytes_sent)
+        self.assertEqual(
+            len('{"data": {"viewer": {"login": "octocat"}}}'), timings.bytes_received
+        )
+        self.assertGreaterEqual(timings.total, timings.network)
+        self.assertFalse(timings.introspection)
+
+    def test_errors(self):
+        with self.assertRaises(OperationErrors):
+            self.client.new_query(with_schema=False).select("broken").build_and_run()
+        [timings] = self.timings
+        self.assertIsInstance(timings.error, OperationErrors)
+        self.assertGreater(timings.error_parsing, 0)
+
+    def test_introspection_round_trips(self):
+        self.client.schema()
+        self.assertEqual(2, self.client.instrumentation.introspection_round_trips)
+        self.assertTrue(all(timings.introspection for timings in self.timings))
+
+    def test_disabled_without_hooks(self):
+        client = Client(self.server.url)
+        self.assertFalse(client.instrumentation.enabled)
+        client.new_query(with_schema=False).select("viewer.login").build_and_run()
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import sys
+from enum import Enum, IntEnum
+from unittest import TestCase, main
+
+from grafq.language import ID, Null, ScalarExtension, Value, VarRef
+
+
+class State(Enum):
+    OPEN = "open"
+
+
+class Level(IntEnum):
+    HIGH = 1
+
+
+class TestValueSerialization(TestCase):
+    def test_scalars(self):
+        self.assertEqual("42", str(Value(42)))
+        self.assertEqual("1.5", str(Value(1.5)))
+        self.assertEqual("true", str(Value(True)))
+        self.assertEqual("false", str(Value(False)))
+        self.assertEqual("null", str(Value(Null)))
+        self.assertEqual("$x", str(Value(VarRef("x"))))
+        self.assertEqual('"abc"', str(Value(ID("abc"))))
+        self.assertEqual('"x"', str(Value(ScalarExtension("x"))))
+
+    def test_escapes_strings(self):
+        self.assertEqual(r'"say \"hi\"\\n"', str(Value('say "hi"\\n')))
+        self.assertEqual(r'"a\nb\tc\u0001"', str(Value("a\nb\tc\x01")))
+        self.assertEqual('"héllo"', str(Value("héllo")))
+        self.assertEqual(r'"\""', str(Value(ID('"'))))
+
+    def test_enums_by_name(self):
+        self.assertEqual("OPEN", str(Value(State.OPEN)))
+        self.assertEqual("HIGH", str(Value(Level.HIGH)))
+        self.assertEqual("[OPEN, HIGH]", str(Value([State.OPEN, Level.HIGH])))
+
+    def test_non_finite_floats(self):
+        with self.assertRaises(ValueError):
+            str(Value(float("nan")))
+        with self.assertRaises(ValueError):
+            str(Value([1.0, float("inf")]))
+
+    def test_lists_and_objects(self):
+        self.assertEqual("[]", str(Value([])))
+        self.assertEqual("{}", str(Value({})))
+        self.assertEqual('["a", "b\\""]', str(Value(["a", 'b"'])))
+        self.assertEqual("[1, true, null]", str(Value([1, True, Null])))
+        self.assertEqual(
+            '{a: [1, {b: "c"}], d: $e, f: OPEN}',
+            str(Value({"a": [1, {"b": "c"}], "d": VarRef("e"), "f": State.OPEN})),
+        )
+        self.assertEqual("[1, 2]", str(Value([Value(1), Value(2)])))
+
+    def test_deep_nesting(self):
+        value = 1
+        depth = sys.getrecursionlimit() * 2
+        for _ in range(depth):
+            value = [value]
+        self.assertEqual("[" * depth + "1" + "]" * depth, str(Value(value)))
+
+
+if __name__ == "__main__":
+    main()
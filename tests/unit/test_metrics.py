@@ -0,0 +1,126 @@
+from unittest import TestCase, main
+
+from grafq.cache import ResponseCache
+from grafq.client import Client
+from grafq.errors import OperationErrors, RemoteError
+from grafq.instrumentation import OperationTimings
+from grafq.metrics import Histogram, MetricsCollector
+from grafq.normalized import NormalizedCache
+from tests.unit.server import StubServer
+
+
+def respond(method, payload, headers):
+    if "broken" in payload["query"]:
+        return 200, {"errors": [{"message": "broken", "path": ["broken"]}]}, {}
+    return 200, {"data": {"viewer": {"login": "octocat"}}}, {}
+
+
+class TestHistogram(TestCase):
+    def test_buckets(self):
+        histogram = Histogram([0.1, 1.0])
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        self.assertEqual(
+            [(0.1, 2), (1.0, 3), (float("inf"), 4)], histogram.cumulative()
+        )
+        self.assertEqual(4, histogram.count)
+        self.assertAlmostEqual(2.65, histogram.sum)
+        self.assertEqual(0.1, histogram.quantile(0.5))
+        self.assertEqual(float("inf"), histogram.quantile(0.99))
+
+
+class TestMetricsCollector(TestCase):
+    def record(self, collector, **attributes):
+        timings = OperationTimings("POST", **attributes)
+        collector.on_start(timings)
+        collector(timings)
+
+    def test_snapshot(self):
+        collector = MetricsCollector(buckets=[0.1, 1.0])
+        self.record(collector, operation_name="Me", network=0.05)
+        self.record(collector, operation_name="Me", network=0.5)
+        self.record(collector, operation_name="Me", cached=True)
+        self.record(collector, operation_name="Me", error=OperationErrors([]))
+        self.record(collector, error=RemoteError("down"))
+        snapshot = collector.snapshot()
+        me = snapshot["operations"]["Me"]
+        self.assertEqual(4, me["count"])
+        self.assertEqual(1, me["cached"])
+        self.assertEqual({"OperationErrors": 1}, me["errors"])
+        self.assertEqual(0.25, me["error_rate"])
+        self.assertEqual(3, me["latency"]["count"])
+        self.assertEqual(1.0, me["latency"]["p95"])
+        self.assertEqual(
+            {"RemoteError": 1}, snapshot["operations"]["anonymous"]["errors"]
+        )
+        self.assertEqual(0, snapshot["in_flight"])
+
+    def test_in_flight(self):
+        collector = MetricsCollector()
+        collector.on_start(OperationTimings("POST"))
+        self.assertEqual(1, collector.snapshot()["in_flight"])
+
+    def test_prometheus(self):
+        collector = MetricsCollector(buckets=[0.1])
+        self.record(collector, operation_name="Me", network=0.05)
+        self.record(collector, operation_name="Me", error=OperationErrors([]))
+        text = collector.to_prometheus()
+        self.assertIn(
+            'grafq_operation_duration_seconds_bucket{operation="Me",le="0.1"} 2', text
+        )
+        self.assertIn(
+            'grafq_operation_duration_seconds_bucket{operation="Me",le="+Inf"} 2', text
+        )
+        self.assertIn('grafq_operation_duration_seconds_count{operation="Me"} 2', text)
+        self.assertIn(
+            'grafq_operation_errors_total{operation="Me",type="OperationErrors"} 1',
+            text,
+        )
+        self.assertIn("grafq_operations_in_flight 0", text)
+
+    def test_failures_before_sending_are_finished(self):
+        class FailingCache(NormalizedCache):
+            def read(self, query, variables):
+                raise RuntimeError("corrupt cache")
+
+        collector = MetricsCollector()
+        client = Client("http://localhost/graphql", normalized_cache=FailingCache())
+        collector.attach(client)
+        query = client.new_query(with_schema=False).name("Me").select("viewer.login")
+        with self.assertRaises(RuntimeError):
+            query.build_and_run()
+        snapshot = collector.snapshot()
+        self.assertEqual(0, snapshot["in_flight"])
+        self.assertEqual({"RuntimeError": 1}, snapshot["operations"]["Me"]["errors"])
+
+    def test_client(self):
+        with StubServer(respond) as server:
+            client = Client(server.url, cache=ResponseCache())
+            collector = MetricsCollector().attach(client)
+            query = (
+                client.new_query(with_schema=False).name("Me").select("viewer.login")
+            )
+            query.build_and_run()
+            query.build_and_run()
+            with self.assertRaises(OperationErrors):
+                client.new_query(with_schema=False).name("Broken").select(
+                    "broken"
+                ).build_and_run()
+            client.close()
+        snapshot = collector.snapshot()
+        self.assertEqual(2, snapshot["operations"]["Me"]["count"])
+        self.assertEqual(1, snapshot["operations"]["Me"]["cached"])
+        self.assertEqual(
+            {"OperationErrors": 1}, snapshot["operations"]["Broken"]["errors"]
+        )
+        self.assertEqual(1, snapshot["response_cache_hits"])
+        self.assertEqual(2, snapshot["response_cache_misses"])
+        self.assertEqual(0, snapshot["in_flight"])
+        exported = collector.to_prometheus()
+        self.assertIn("# TYPE grafq_response_cache_hits_total counter", exported)
+        self.assertIn("grafq_response_cache_hits_total 1", exported)
+        self.assertIn("# TYPE grafq_response_cache_hit_rate gauge", exported)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+from unittest import TestCase, main
+
+from grafq import Field, Query, Var
+from grafq.client import Client
+from grafq.normalized import NormalizedCache, with_identity_fields
+from grafq.schema import Schema
+from tests.unit.introspection import INTROSPECTION
+
+VIEWER = {"viewer": {"__typename": "User", "id": "u1", "login": "octocat"}}
+REPOSITORY = {
+    "repository": {
+        "__typename": "Repository",
+        "id": "r1",
+        "name": "grafq",
+        "owner": {"__typename": "User", "id": "u1", "login": "octocat"},
+    }
+}
+
+
+class RecordingClient(Client):
+    def __init__(self):
+        super().__init__("http://localhost/graphql", normalized_cache=NormalizedCache())
+        self.documents = []
+
+    def _send(self, method, document, variables, timings=None, timeout=None):
+        self.documents.append(document)
+        data = {}
+        if "viewer" in document:
+            data.update(VIEWER)
+        if "repository" in document:
+            data.update(REPOSITORY)
+        return {"data": data}
+
+
+def viewer_query():
+    return Query().select(Field("viewer").select("id", "__typename", "login")).build()
+
+
+def repository_query():
+    return (
+        Query()
+        .var("name", "String!")
+        .select(
+            Field("repository", owner="octocat", name=Var("name")).select(
+                "id",
+                "__typename",
+                "name",
+                "owner.id",
+                "owner.__typename",
+                "owner.login",
+            )
+        )
+        .build()
+    )
+
+
+class TestNormalizedCache(TestCase):
+    def setUp(self):
+        self.cache = NormalizedCache()
+
+    def test_round_trip(self):
+        self.cache.write(viewer_query(), VIEWER)
+        data, missing = self.cache.read(viewer_query())
+        self.assertIsNone(missing)
+        self.assertEqual(VIEWER, data)
+
+    def test_entities_are_shared(self):
+        self.cache.write(repository_query(), REPOSITORY, {"name": "grafq"})
+        self.assertEqual(2, len(self.cache))
+        self.assertEqual("octocat", self.cache.entity("User", "u1")["login"])
+        data, missing = self.cache.read(viewer_query())
+        self.assertIsNotNone(missing)
+        self.cache.write(
+            viewer_query(),
+            {"viewer": {"__typename": "User", "id": "u1", "login": "renamed"}},
+        )
+        data, _ = self.cache.read(repository_query(), {"name": "grafq"})
+        self.assertEqual("renamed", data["repository"]["owner"]["login"])
+
+    def test_arguments_are_part_of_key(self):
+        self.cache.write(repository_query(), REPOSITORY, {"name": "grafq"})
+        _, missing = self.cache.read(repository_query(), {"name": "other"})
+        self.assertEqual(["name"], [d.name for d in missing.variable_definitions])
+
+    def test_partial(self):
+        self.cache.write(viewer_query(), VIEWER)
+        query = (
+            Query()
+            .var("name", "String!")
+            .select(
+                Field("viewer").select("id", "__typename", "login"),
+                Field("repository", owner="octocat", name=Var("name")).select("id"),
+            )
+            .build()
+        )
+        data, missing = self.cache.read(query, {"name": "grafq"})
+        self.assertEqual(VIEWER, data)
+        self.assertEqual(
+            'query($name:String!){repository(owner:"octocat",name:$name){id}}',
+            str(missing),
+        )
+
+    def test_identity_fields(self):
+        query = Query().select("viewer.login", "repository.owner.login").build()
+        self.assertEqual(
+            "{viewer{login,__typename},repository{owner{login,__typename},__typename}}",
+            str(with_identity_fields(query)),
+        )
+        schema = Schema(introspection=INTROSPECTION)
+        self.assertEqual(
+            "{viewer{login,__typename,id},repository{owner{login,__typename,id},__typename,id}}",
+            str(with_identity_fields(query, schema)),
+        )
+
+
+class TestClientIntegration(TestCase):
+    def test_fetches_only_missing(self):
+        client = RecordingClient()
+        client.new_query(with_schema=False).select("viewer.login").build_and_run()
+        data = (
+            client.new_query(with_schema=False)
+            .select("viewer.login", Field("repository", name="grafq").select("name"))
+            .build_and_run()
+        )
+        self.assertEqual(
+            [
+                "{viewer{login,__typename}}",
+                '{repository(name:"grafq"){name,__typename}}',
+            ],
+            client.documents,
+        )
+        self.assertEqual(["viewer", "repository"], list(data))
+        client.new_query(with_schema=False).select("viewer.login").build_and_run()
+        self.assertEqual(2, len(client.documents))
+
+
+if __name__ == "__main__":
+    main()
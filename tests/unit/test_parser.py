@@ -0,0 +1,124 @@
+from unittest import TestCase, main
+
+from grafq import Field, Fragment, InlineFragment, Query, Var
+from grafq.canonical import canonicalize
+from grafq.errors import GraphQLSyntaxError
+from grafq.language import EnumLiteral, Null, VarRef
+from grafq.parser import parse
+from grafq.schema import Schema
+from tests.unit.introspection import INTROSPECTION
+
+DOCUMENT = """
+# stored query
+query Search($query: String! = "grafq", $first: Int) {
+  search(query: $query, first: $first, filter: {state: OPEN, minStars: 10}) {
+    title: name
+    owner {
+      ...OwnerFields
+      repositories(states: [OPEN]) @include(if: true) {
+        url
+      }
+    }
+  }
+}
+
+fragment OwnerFields on User {
+  login
+}
+"""
+
+
+class TestParse(TestCase):
+    def test_round_trips_built_queries(self):
+        owner = Fragment("OwnerFields", on="User").select("login")
+        query = (
+            Query()
+            .name("Viewer")
+            .var("size", "Int!", default=100)
+            .var("full", "Boolean!")
+            .select(
+                Field("viewer").select(
+                    owner,
+                    Field("avatarUrl", size=Var("size")).alias("avatar"),
+                    Field("name").include(Var("full")),
+                    InlineFragment(on="User").skip(Var("full")).select("bio"),
+                    Field("repositories", first=5, after=Null).select("nodes.name"),
+                )
+            )
+            .build(shorthand=False)
+        )
+        self.assertEqual(query, parse(str(query)))
+        self.assertEqual(query, parse(query.pretty()))
+
+    def test_values(self):
+        query = parse(
+            '{f(a: -1, b: 1.5e3, c: "\\u00e9\\n", d: [true, null, [X]], e: {k: $v})}'
+        )
+        arguments = {
+            argument.name: argument.value.inner
+            for argument in query.selection_set[0].field.arguments
+        }
+        self.assertEqual(
+            {
+                "a": -1,
+                "b": 1500.0,
+                "c": "é\n",
+                "d": [True, Null, [EnumLiteral("X")]],
+                "e": {"k": VarRef("v")},
+            },
+            arguments,
+        )
+
+    def test_block_strings(self):
+        query = parse('{f(a: """\n    first\n      second \\""" \n  """)}')
+        self.assertEqual(
+            'f(a:"first\\n  second \\"\\"\\" ")', str(query.selection_set[0])
+        )
+
+    def test_stored_documents_are_usable(self):
+        schema = Schema(introspection=INTROSPECTION)
+        query = parse(DOCUMENT)
+        self.assertEqual([], schema.validate(query))
+        self.assertEqual(
+            'query Search($query:String!="grafq",$first:Int){search(query:$query,'
+            "first:$first,filter:{state: OPEN, minStars: 10}){title:name,owner{"
+            "...OwnerFields,repositories(states:[OPEN])@include(if:true){url}}}}"
+            "fragment OwnerFields on User{login}",
+            str(query),
+        )
+        self.assertEqual(canonicalize(query), canonicalize(parse(str(query))))
+        invalid = parse(DOCUMENT.replace("state: OPEN", "state: SHUT"))
+        self.assertEqual(
+            ["Invalid argument type for filter at field search"],
+            [error.message for error in schema.validate(invalid)],
+        )
+
+    def test_parses_are_cached(self):
+        self.assertIs(parse(DOCUMENT), parse(DOCUMENT))
+
+    def test_syntax_errors(self):
+        cases = {
+            "{viewer": "Expected a name, found end of document at line 1, column 8",
+            "{\n  viewer(first: 01)\n}": "Unexpected character '0' at line 2, column 17",
+            '{viewer(name: "a)}': "Unterminated string at line 1, column 15",
+            "query($a: Int = $b) {a}": (
+                "Variables are not allowed in constant values at line 1, column 17"
+            ),
+            "{a} {b}": (
+                "Documents with more than one operation are not supported "
+                "at line 1, column 5"
+            ),
+            "mutation {a}": "Unsupported operation mutation at line 1, column 1",
+            "fragment F on User {a}": (
+                "Document contains no query at line 1, column 23"
+            ),
+        }
+        for document, message in cases.items():
+            with self.subTest(document=document):
+                with self.assertRaises(GraphQLSyntaxError) as context:
+                    parse(document)
+                self.assertEqual(message, str(context.exception))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+from unittest import TestCase, main
+
+from grafq import Field, Query, Var
+from grafq.client import Client
+from grafq.partial import failed_subtree, locate, merge, prune
+
+QUERY = (
+    Query()
+    .var("owner", "String!")
+    .select(
+        "viewer.login",
+        Field("repository", owner=Var("owner"), name="grafq").select(
+            "name", "owner.login"
+        ),
+        Field("search", query="grafq").select("name", "state"),
+    )
+    .build()
+)
+
+
+class ScriptedClient(Client):
+    """Replies with queued responses, recording the documents it was sent."""
+
+    def __init__(self, *responses):
+        super().__init__("http://localhost/graphql")
+        self.responses = list(responses)
+        self.sent = []
+
+    def _send(self, method, document, variables, timings=None, timeout=None):
+        self.sent.append((document, variables))
+        return self.responses.pop(0)
+
+
+FIRST = {
+    "data": {
+        "viewer": {"login": "octocat"},
+        "repository": None,
+        "search": [{"name": "a", "state": "OPEN"}, {"name": "b", "state": None}],
+    },
+    "errors": [
+        {"message": "timeout", "path": ["repository", "owner", "login"]},
+        {"message": "timeout", "path": ["search", 1, "state"]},
+    ],
+}
+
+
+class TestPaths(TestCase):
+    def test_locate(self):
+        field = locate(QUERY, ["repository", "owner", "login"])
+        self.assertEqual("login", field.name)
+        self.assertEqual("state", locate(QUERY, ["search", 1, "state"]).name)
+        self.assertIsNone(locate(QUERY, ["missing"]))
+        self.assertIsNone(locate(QUERY, None))
+
+    def test_failed_subtree(self):
+        data = FIRST["data"]
+        self.assertEqual(
+            ["repository"], failed_subtree(data, ["repository", "owner", "login"])
+        )
+        self.assertEqual(
+            ["search", "state"], failed_subtree(data, ["search", 1, "state"])
+        )
+        self.assertEqual([], failed_subtree(None, ["viewer"]))
+        self.assertEqual([], failed_subtree(data, None))
+
+    def test_prune(self):
+        pruned = prune(QUERY, [["repository"], ["search", "state"]])
+        self.assertEqual(
+            'query($owner:String!){repository(owner:$owner,name:"grafq"){name,owner{login}},search(query:"grafq"){state}}',
+            str(pruned),
+        )
+        self.assertEqual(
+            "{viewer{login}}", str(prune(QUERY, [["viewer", "login"], ["viewer"]]))
+        )
+        self.assertIs(QUERY, prune(QUERY, [["viewer"], []]))
+
+    def test_merge(self):
+        self.assertEqual(
+            {"a": [{"x": 1, "y": 2}], "b": 3},
+            merge({"a": [{"x": 1, "y": None}], "b": 3}, {"a": [{"y": 2}]}),
+        )
+        self.assertEqual({"a": {"x": 1}}, merge({"a": None}, {"a": {"x": 1}}))
+
+
+class TestRunPartial(TestCase):
+    def test_returns_data_and_errors(self):
+        client = ScriptedClient(FIRST)
+        result = client.run_partial(QUERY, {"owner": "asmello"})
+        self.assertFalse(result.ok)
+        self.assertEqual({"login": "octocat"}, result.data["viewer"])
+        self.assertEqual(2, len(result.errors))
+        self.assertEqual("login", result.field_for(result.errors[0]).name)
+        self.assertEqual(0, result.retries)
+
+    def test_retries_failed_subtrees(self):
+        client = ScriptedClient(
+            FIRST,
+            {
+                "data": {
+                    "repository": {"name": "grafq", "owner": {"login": "asmello"}},
+                    "search": [{"state": "OPEN"}, {"state": "CLOSED"}],
+                }
+            },
+        )
+        result = client.run_partial(QUERY, {"owner": "asmello"}, retries=2)
+        self.assertTrue(result.ok)
+        self.assertEqual(1, result.retries)
+        self.assertEqual(
+            {
+                "viewer": {"login": "octocat"},
+                "repository": {"name": "grafq", "owner": {"login": "asmello"}},
+                "search": [
+                    {"name": "a", "state": "OPEN"},
+                    {"name": "b", "state": "CLOSED"},
+                ],
+            },
+            result.data,
+        )
+        document, variables = client.sent[1]
+        self.assertNotIn("viewer", document)
+        self.assertEqual({"owner": "asmello"}, variables)
+
+    def test_gives_up_after_retries(self):
+        client = ScriptedClient(FIRST, FIRST, FIRST)
+        result = client.run_partial(QUERY, {"owner": "asmello"}, retries=2)
+        self.assertEqual(2, result.retries)
+        self.assertEqual(2, len(result.errors))
+        self.assertEqual(3, len(client.sent))
+
+    def test_request_errors_retry_whole_query(self):
+        client = ScriptedClient(
+            {"data": None, "errors": [{"message": "boom"}]}, {"data": FIRST["data"]}
+        )
+        result = client.run_partial(QUERY, {"owner": "asmello"}, retries=1)
+        self.assertTrue(result.ok)
+        self.assertEqual(client.sent[0], client.sent[1])
+
+
+if __name__ == "__main__":
+    main()
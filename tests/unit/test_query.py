@@ -1,7 +1,10 @@
+import gc
 from unittest import TestCase, main
 
-from grafq import Field, Query
+from grafq import Field, InlineFragment, Query
 from grafq.language import NamedType, VarRef
+from grafq.schema import Schema
+from tests.unit.introspection import INTROSPECTION
 
 
 class TestQueryBuilder(TestCase):
@@ -105,5 +108,116 @@ class TestQueryBuilder(TestCase):
         )
 
 
+class TestIncrementalBuild(TestCase):
+    def test_unchanged_query_is_reused(self):
+        blueprint = Query().select("viewer.login", "repository.name")
+        self.assertIs(blueprint.build(), blueprint.build())
+        self.assertIsNot(blueprint.build(), blueprint.build(shorthand=False))
+
+    def test_only_changed_path_is_rebuilt(self):
+        schema = Schema(introspection=INTROSPECTION)
+        viewer = schema.viewer.select("login")
+        viewer.repositories(first=1).select("name")
+        repository = schema.repository(owner="asmello", name="grafq").select("url")
+        blueprint = Query(schema=schema).select(viewer, repository)
+        before = blueprint.build()
+        viewer.repositories(first=5)
+        after = blueprint.build()
+        self.assertEqual(
+            '{viewer{login,repositories(first:5){name}},repository(owner:"asmello",'
+            'name:"grafq"){url}}',
+            str(after),
+        )
+        self.assertIs(before.selection_set[1].field, after.selection_set[1].field)
+        self.assertIs(
+            before.selection_set[0].field.selection_set[0].field,
+            after.selection_set[0].field.selection_set[0].field,
+        )
+        self.assertIsNot(before.selection_set[0].field, after.selection_set[0].field)
+
+    def test_changes_through_references_invalidate(self):
+        inner = Field("repositories").select("name")
+        toggled = InlineFragment().select("login")
+        blueprint = Query().select(Field("viewer").select(inner, toggled))
+        self.assertEqual(
+            "{viewer{repositories{name},...{login}}}", str(blueprint.build())
+        )
+        inner.arg("first", 2)
+        toggled.select("name")
+        self.assertEqual(
+            "{viewer{repositories(first:2){name},...{login,name}}}",
+            str(blueprint.build()),
+        )
+
+    def test_clones_keep_their_own_builds(self):
+        base = Field("viewer").select("login", "repositories.name")
+        built = base.build()
+        clone = base.clone()
+        clone.select(Field("repositories", first=3))
+        self.assertIs(built, base.build())
+        self.assertEqual(
+            "viewer{login,repositories(first:3){name}}", str(clone.build())
+        )
+        self.assertIs(
+            built.selection_set[0].field, clone.build().selection_set[0].field
+        )
+
+    def test_shared_blueprints_dont_keep_queries_alive(self):
+        owner = Field("owner").select("login")
+        for _ in range(10_000):
+            Query().select(Field("repository").select(owner)).build()
+        gc.collect()
+        self.assertLessEqual(len(owner._dependents), 1)
+        blueprint = Query().select(Field("repository").select(owner))
+        owner.select("url")
+        self.assertEqual("{repository{owner{login,url}}}", str(blueprint.build()))
+
+
+class TestSelectPaths(TestCase):
+    PATHS = ["viewer.login", "viewer.repositories.name", "repository.url", "viewer.id"]
+
+    def test_matches_select(self):
+        self.assertEqual(
+            str(Query().select(*self.PATHS).build()),
+            str(Query().select_paths(self.PATHS).build()),
+        )
+
+    def test_merges_into_existing_fields(self):
+        repositories = Field("repositories", first=3).select("name")
+        blueprint = Query().select(Field("viewer").select(repositories))
+        blueprint.build()
+        blueprint.select_paths(["viewer.repositories.url", "viewer.login"])
+        self.assertEqual(
+            "{viewer{repositories(first:3){name,url},login}}", str(blueprint.build())
+        )
+        self.assertEqual("repositories(first:3){name,url}", str(repositories.build()))
+
+    def test_validation(self):
+        schema = Schema(introspection=INTROSPECTION)
+        blueprint = Query(schema=schema).select_paths(
+            ["viewer.login", "viewer.repositories.name"], validate=True
+        )
+        self.assertEqual([], schema.validate(blueprint.build()))
+        with self.assertRaises(TypeError):
+            Query(schema=schema).select_paths(["viewer.nope"], validate=True)
+        with self.assertRaises(TypeError):
+            Query(schema=schema).select_paths(["nope"], validate=True)
+        with self.assertRaises(RuntimeError):
+            Query().select_paths(self.PATHS, validate=True)
+
+    def test_typed_fields_check_paths(self):
+        schema = Schema(introspection=INTROSPECTION)
+        viewer = schema.viewer.select_paths(["login", "repositories.name"])
+        self.assertEqual("viewer{login,repositories{name}}", str(viewer.build()))
+        with self.assertRaises(TypeError):
+            viewer.select_paths(["repositories.nope"])
+
+    def test_clones_are_isolated(self):
+        base = Field("viewer").select("repositories.name")
+        clone = base.clone().select_paths(["repositories.url", "login"])
+        self.assertEqual("viewer{repositories{name}}", str(base.build()))
+        self.assertEqual("viewer{repositories{name,url},login}", str(clone.build()))
+
+
 if __name__ == "__main__":
     main()
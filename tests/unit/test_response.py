@@ -0,0 +1,172 @@
+import re
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from grafq import Field, InlineFragment, Query
+from grafq.client import Client
+from grafq.errors import RemoteError
+from grafq.language import ID, ScalarExtension
+from grafq.response import ResponseList, ResponseObject, _Shape, unwrap, wrap
+from grafq.schema import Schema
+from tests.unit.introspection import INTROSPECTION
+
+
+class URI(ScalarExtension):
+    pass
+
+
+def repositories_query(schema: Schema):
+    return (
+        Query(schema=schema)
+        .select(
+            Field("viewer").select(
+                Field("login").alias("handle"),
+                Field("repositories").select("id", "url", "state"),
+            ),
+            Field("node", id="1").select(InlineFragment(on="User").select("login")),
+        )
+        .build()
+    )
+
+
+def repositories_data(size: int) -> dict:
+    return {
+        "viewer": {
+            "handle": "octocat",
+            "repositories": [
+                {"id": f"r{index}", "url": f"https://x/{index}", "state": "OPEN"}
+                for index in range(size)
+            ],
+        },
+        "node": {"login": "mona"},
+    }
+
+
+class TestResponseObjects(TestCase):
+    def setUp(self):
+        self.schema = Schema(introspection=INTROSPECTION)
+
+    def test_typed_access(self):
+        data = repositories_data(2)
+        response = wrap(data, repositories_query(self.schema), self.schema)
+        self.assertEqual("octocat", response.viewer.handle)
+        repositories = response.viewer.repositories
+        self.assertIsInstance(repositories, ResponseList)
+        self.assertEqual(2, len(repositories))
+        self.assertEqual(ID("r1"), repositories[1].id)
+        self.assertEqual("URI", type(repositories[0].url).__name__)
+        self.assertEqual("https://x/0", repositories[0].url.value)
+        # enums are returned as decoded
+        self.assertEqual("OPEN", repositories[0].state)
+        self.assertEqual("mona", response.node.login)
+        self.assertEqual(["r0", "r1"], [item["id"].value for item in repositories])
+
+    def test_nested_lists_are_iterated_as_lists(self):
+        data = repositories_data(2)
+        rows = data["viewer"]["repositories"]
+        data["viewer"]["repositories"] = [rows, None, []]
+        response = wrap(data, repositories_query(self.schema), self.schema)
+        first, missing, empty = response.viewer.repositories
+        self.assertIsInstance(first, ResponseList)
+        self.assertEqual([ID("r0"), ID("r1")], [row.id for row in first])
+        self.assertIsNone(missing)
+        self.assertEqual([], list(empty))
+
+    def test_views_share_the_decoded_data(self):
+        data = repositories_data(1)
+        response = wrap(data, repositories_query(self.schema), self.schema)
+        self.assertIs(data, unwrap(response))
+        self.assertIs(
+            data["viewer"]["repositories"], unwrap(response.viewer.repositories)
+        )
+        data["viewer"]["handle"] = "mona"
+        self.assertEqual("mona", response.viewer.handle)
+        self.assertEqual({"handle", "repositories"}, set(response.viewer))
+
+    def test_schema_is_consulted_per_selection_set(self):
+        response = wrap(
+            repositories_data(1000), repositories_query(self.schema), self.schema
+        )
+        with patch.object(
+            _Shape, "_resolve", autospec=True, side_effect=_Shape._resolve
+        ) as resolutions:
+            ids = [repository.id for repository in response.viewer.repositories]
+        self.assertEqual(1000, len(ids))
+        # the root, the viewer and the repositories
+        self.assertEqual(3, resolutions.call_count)
+
+    def test_custom_converters(self):
+        response = wrap(
+            repositories_data(1),
+            repositories_query(self.schema),
+            self.schema,
+            scalars={"URI": str.upper},
+        )
+        self.assertEqual("HTTPS://X/0", response.viewer.repositories[0].url)
+
+    def test_without_schema_or_query(self):
+        data = {"viewer": {"__typename": "User", "tags": [{"name": "a"}, None]}}
+        response = wrap(data)
+        self.assertIsInstance(response.viewer, ResponseObject)
+        self.assertEqual("User", getattr(response.viewer, "__typename"))
+        self.assertEqual("a", response.viewer.tags[0].name)
+        self.assertIsNone(response.viewer.tags[1])
+        with self.assertRaises(AttributeError):
+            response.missing
+        with self.assertRaises(KeyError):
+            response["missing"]
+
+
+class ResponseClient(Client):
+    """Serves introspection from the offline fixture, and fixed data otherwise."""
+
+    def __init__(self):
+        super().__init__("http://localhost/graphql", response_objects=True)
+        self.documents = []
+        self.failing = False
+
+    def _send(self, method, document, variables, timings=None, timeout=None):
+        self.documents.append(document)
+        types = INTROSPECTION["__schema"]["types"]
+        if document.startswith("{__schema"):
+            return {
+                "data": {
+                    "__schema": {
+                        "queryType": {"name": "Query"},
+                        "types": [
+                            {"name": t["name"], "kind": t["kind"]} for t in types
+                        ],
+                    }
+                }
+            }
+        if found := re.search(r'__type\(name:"(\w+)"\)', document):
+            if self.failing:
+                raise RemoteError("introspection unavailable")
+            name = found.group(1)
+            return {"data": {"__type": next(t for t in types if t["name"] == name)}}
+        return {"data": repositories_data(1)}
+
+
+class TestClientResponses(TestCase):
+    def test_responses_are_wrapped(self):
+        client = ResponseClient()
+        client.schema()
+        # built without the schema, so its types are only looked up on response
+        query = repositories_query(None)
+        response = client.post(query)
+        self.assertIsInstance(response, ResponseObject)
+        requests = len(client.documents)
+        self.assertEqual(ID("r0"), response.viewer.repositories[0].id)
+        self.assertEqual("https://x/0", response.viewer.repositories[0].url.value)
+        self.assertEqual(requests, len(client.documents))
+
+    def test_lookup_errors_raised_on_response(self):
+        client = ResponseClient()
+        client.schema()
+        client.failing = True
+        with self.assertRaises(RemoteError):
+            client.post(repositories_query(None))
+
+
+if __name__ == "__main__":
+    main()
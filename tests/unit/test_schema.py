@@ -0,0 +1,147 @@
+import json
+import os
+import tempfile
+from unittest import TestCase, main
+
+from grafq import Field, Query, Var
+from grafq.schema import Schema
+from tests.unit.introspection import INTROSPECTION
+
+
+class TestOfflineSchema(TestCase):
+    def setUp(self):
+        self.schema = Schema(introspection=INTROSPECTION)
+
+    def test_requires_source(self):
+        with self.assertRaises(ValueError):
+            Schema()
+
+    def test_get_type(self):
+        meta = self.schema.get_type("Repository")
+        self.assertEqual("OBJECT", meta.kind)
+        self.assertIn("stargazerCount", meta.fields)
+
+    def test_lookups_are_memoized(self):
+        self.assertIs(
+            self.schema.get_type_fields("User"), self.schema.get_type_fields("User")
+        )
+
+    def test_enum_values(self):
+        names = [value.name for value in self.schema.get_type_enum_values("State")]
+        self.assertEqual(["OPEN", "CLOSED"], names)
+
+    def test_possible_types(self):
+        names = [t.name for t in self.schema.get_type_possible_types("Node")]
+        self.assertEqual(["User", "Repository"], names)
+
+    def test_typed_blueprint(self):
+        selection = self.schema.repository(owner="asmello", name="grafq").owner.login
+        self.assertEqual(
+            'repository(owner:"asmello",name:"grafq"){owner{login}}',
+            str(selection.root().build()),
+        )
+
+    def test_typed_argument_validation(self):
+        with self.assertRaises(TypeError):
+            _ = self.schema.search(query="grafq", filter={"state": "MERGED"})
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "schema.json")
+            self.schema.save(path)
+            with open(path) as f:
+                self.assertEqual(INTROSPECTION, json.load(f))
+            loaded = Schema.load(path)
+        self.assertTrue(loaded.is_offline)
+        self.assertEqual("Query", loaded.query_type)
+
+
+class TestQueryValidation(TestCase):
+    def setUp(self):
+        self.schema = Schema(introspection=INTROSPECTION)
+
+    def messages(self, query):
+        return [error.message for error in self.schema.validate(query.build())]
+
+    def test_valid(self):
+        query = (
+            Query()
+            .var("owner", "String!")
+            .select(
+                Field("repository", owner=Var("owner"), name="grafq").select(
+                    "name", "__typename", "owner.login"
+                ),
+                Field("viewer").select(Field("avatarUrl", size=200)),
+            )
+        )
+        self.assertEqual([], self.messages(query))
+
+    def test_collects_all_errors(self):
+        query = Query().select(
+            "viewer.foo",
+            "viewer.login.bar",
+            "viewer.repositories",
+            Field("repository", owner=42).select("name"),
+        )
+        self.assertEqual(
+            [
+                "Field foo does not exist on type User",
+                "Field login of type String cannot have a selection",
+                "Field repositories of type Repository must have a selection",
+                "Invalid argument type for owner at field repository",
+                "Missing required argument name for field repository",
+            ],
+            self.messages(query),
+        )
+
+    def test_error_paths(self):
+        errors = self.schema.validate(
+            Query().select(Field("viewer").select(Field("login").alias("l"))).build()
+        )
+        self.assertEqual([], errors)
+        errors = self.schema.validate(Query().select("viewer.foo").build())
+        self.assertEqual(["viewer", "foo"], errors[0].path)
+
+    def test_variables(self):
+        query = (
+            Query()
+            .var("unused", "Int")
+            .var("size", "String")
+            .var("bad", "User")
+            .select(
+                Field("viewer").select(
+                    Field("avatarUrl", size=Var("size")),
+                    Field("repositories", first=Var("missing")).select("name"),
+                )
+            )
+        )
+        self.assertEqual(
+            [
+                "Variable $bad has non-input type User",
+                "Invalid usage of variable $size of type String as argument size of type Int",
+                "Variable $missing is not defined",
+                "Variable $unused is never used",
+                "Variable $bad is never used",
+            ],
+            self.messages(query),
+        )
+
+    def test_variable_nullability(self):
+        query = (
+            Query()
+            .var("name", "String")
+            .var("owner", "String", default="asmello")
+            .select(
+                Field("repository", owner=Var("owner"), name=Var("name")).select("id")
+            )
+        )
+        self.assertEqual(
+            [
+                "Invalid usage of variable $name of type String as argument name of type String!"
+            ],
+            self.messages(query),
+        )
+
+
+if __name__ == "__main__":
+    main()
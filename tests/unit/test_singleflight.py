@@ -0,0 +1,71 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase, main
+
+from grafq import Query
+from grafq.client import Client
+from grafq.singleflight import SingleFlight
+
+
+class BlockingClient(Client):
+    def __init__(self):
+        super().__init__("http://localhost/graphql", deduplicate=True)
+        self.release = threading.Event()
+        self.sent = 0
+
+    def _send(self, method, document, variables, timings=None, timeout=None):
+        self.sent += 1
+        self.release.wait(timeout=5)
+        return {"data": {"viewer": {"login": "octocat"}}}
+
+
+class TestSingleFlight(TestCase):
+    def test_collapses_concurrent_calls(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(timeout=5)
+            return object()
+
+        with ThreadPoolExecutor(4) as executor:
+            leader = executor.submit(flight.do, "key", slow)
+            started.wait(timeout=5)
+            followers = [executor.submit(flight.do, "key", slow) for _ in range(3)]
+            while flight.stats.collapsed < 3:
+                time.sleep(0.001)
+            release.set()
+            results = {id(f.result()) for f in [leader, *followers]}
+        self.assertEqual(1, len(results))
+        self.assertEqual(1, flight.stats.calls)
+        self.assertEqual(0, flight.in_flight)
+
+    def test_shares_errors(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            flight.do("key", fail)
+        self.assertEqual(0, flight.in_flight)
+        self.assertEqual("ok", flight.do("key", lambda: "ok"))
+
+    def test_client(self):
+        client = BlockingClient()
+        query = Query().select("viewer.login").build()
+        with ThreadPoolExecutor(8) as executor:
+            futures = [executor.submit(client.post, query) for _ in range(8)]
+            while client.single_flight.stats.collapsed < 7:
+                time.sleep(0.001)
+            client.release.set()
+            results = [future.result() for future in futures]
+        self.assertEqual(1, client.sent)
+        self.assertTrue(all(result is results[0] for result in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+from unittest import TestCase, main
+
+from grafq.errors import VariableErrors
+from grafq.language import ID, Null, ScalarExtension, Value
+from grafq.language import VariableDefinition, NamedType, ListType, NonNullType
+from grafq.schema import EnumValue, InputValue, SchemaType
+from grafq.validation import (
+    VariablesValidator,
+    compile_input_validator,
+    compile_variable_validator,
+)
+
+
+class FakeTypeSource:
+    def __init__(self):
+        self.fetches = 0
+
+    def get_type_enum_values(self, name: str):
+        self.fetches += 1
+        return [EnumValue("OPEN", None), EnumValue("CLOSED", None)]
+
+    def get_type_input_fields(self, name: str):
+        self.fetches += 1
+        return [
+            InputValue("field", named(self, "ENUM", "OrderField", non_null=True)),
+            InputValue("limit", named(self, "SCALAR", "Int")),
+            InputValue("next", named(self, "INPUT_OBJECT", "Order")),
+        ]
+
+
+def named(source, kind: str, name: str, non_null: bool = False) -> SchemaType:
+    inner = {"kind": kind, "name": name}
+    if non_null:
+        return SchemaType(source, "NON_NULL", of_type=inner)
+    return SchemaType(source, kind, name)
+
+
+class FakeSchema:
+    kinds = {"Int": "SCALAR", "ID": "SCALAR", "State": "ENUM", "Order": "INPUT_OBJECT"}
+
+    def __init__(self):
+        self.source = FakeTypeSource()
+        self.cache = {}
+
+    def variable_validator(self, var_type):
+        def spec(value_type):
+            if isinstance(value_type, NonNullType):
+                return {"kind": "NON_NULL", "ofType": spec(value_type.subtype)}
+            if isinstance(value_type, ListType):
+                return {"kind": "LIST", "ofType": spec(value_type.subtype)}
+            return {"kind": self.kinds[value_type.name], "name": value_type.name}
+
+        value_type = SchemaType.from_dict(self.source, {"name": None, **spec(var_type)})
+        return compile_variable_validator(value_type, self.cache)
+
+
+class TestInputValidator(TestCase):
+    def setUp(self):
+        self.source = FakeTypeSource()
+        self.cache = {}
+
+    def compile(self, value_type, strict=False):
+        return compile_input_validator(value_type, strict, self.cache)
+
+    def test_scalars(self):
+        validate_int = self.compile(named(self.source, "SCALAR", "Int"))
+        self.assertTrue(validate_int(42))
+        self.assertFalse(validate_int(True))
+        self.assertFalse(validate_int("42"))
+        validate_float = self.compile(named(self.source, "SCALAR", "Float"))
+        self.assertTrue(validate_float(4.2))
+        self.assertTrue(validate_float(4))
+
+    def test_nullability(self):
+        self.assertTrue(self.compile(named(self.source, "SCALAR", "Int"))(Null))
+        validate = self.compile(named(self.source, "SCALAR", "Int", non_null=True))
+        self.assertFalse(validate(Null))
+        self.assertFalse(validate(None))
+        self.assertTrue(validate(1))
+
+    def test_id(self):
+        value_type = named(self.source, "SCALAR", "ID")
+        self.assertTrue(self.compile(value_type)("abc"))
+        self.assertFalse(self.compile(value_type, strict=True)("abc"))
+        self.assertTrue(self.compile(value_type, strict=True)(ID("abc")))
+
+    def test_extension(self):
+        class URI(ScalarExtension):
+            pass
+
+        value_type = named(self.source, "SCALAR", "URI")
+        self.assertTrue(self.compile(value_type)("https://github.com/"))
+        self.assertFalse(self.compile(value_type, strict=True)("https://github.com/"))
+        self.assertTrue(self.compile(value_type, strict=True)(URI("https://x.y/")))
+
+    def test_list(self):
+        value_type = SchemaType(
+            self.source,
+            "LIST",
+            of_type={"kind": "NON_NULL", "ofType": {"kind": "SCALAR", "name": "Int"}},
+        )
+        validate = self.compile(value_type)
+        self.assertTrue(validate([]))
+        self.assertTrue(validate([1, 2, 3]))
+        self.assertFalse(validate([1, "2"]))
+        self.assertFalse(validate([1, Null]))
+        self.assertFalse(validate(1))
+
+    def test_enum(self):
+        validate = self.compile(named(self.source, "ENUM", "State"))
+        self.assertTrue(validate("OPEN"))
+        self.assertFalse(validate("MERGED"))
+        self.assertFalse(validate(["OPEN"]))
+
+    def test_input_object(self):
+        validate = self.compile(named(self.source, "INPUT_OBJECT", "Order"))
+        self.assertTrue(validate({"field": "OPEN", "limit": 3}))
+        self.assertTrue(validate({"field": "OPEN", "next": {"field": "CLOSED"}}))
+        self.assertFalse(validate({"limit": 3}))
+        self.assertFalse(validate({"field": "OPEN", "other": 3}))
+        self.assertFalse(validate({"field": "OPEN", "next": {"field": "MERGED"}}))
+
+    def test_compiled_once(self):
+        value_type = named(self.source, "INPUT_OBJECT", "Order")
+        validate = self.compile(value_type)
+        validate({"field": "OPEN"})
+        fetches = self.source.fetches
+        self.assertIs(
+            validate, self.compile(named(self.source, "INPUT_OBJECT", "Order"))
+        )
+        validate({"field": "CLOSED", "next": {"field": "OPEN"}})
+        self.assertEqual(fetches, self.source.fetches)
+
+    def test_failed_compilation_not_cached(self):
+        class FailingTypeSource(FakeTypeSource):
+            failures = 1
+
+            def get_type_enum_values(self, name: str):
+                if self.failures:
+                    self.failures -= 1
+                    raise RuntimeError("lookup failed")
+                return super().get_type_enum_values(name)
+
+            def get_type_input_fields(self, name: str):
+                # the recursive field first, so it's compiled before the failure
+                return list(reversed(super().get_type_input_fields(name)))
+
+        source = FailingTypeSource()
+        with self.assertRaises(RuntimeError):
+            self.compile(named(source, "INPUT_OBJECT", "Order"))
+        self.assertEqual({}, self.cache)
+        validate = self.compile(named(source, "INPUT_OBJECT", "Order"))
+        self.assertTrue(validate({"field": "OPEN", "next": {"field": "CLOSED"}}))
+        self.assertFalse(validate({"next": {"field": "CLOSED"}}))
+        self.assertFalse(validate({"field": "OPEN", "next": {"limit": 1}}))
+
+
+class TestVariablesValidator(TestCase):
+    def setUp(self):
+        self.validator = VariablesValidator(
+            [
+                VariableDefinition("id", NonNullType(NamedType("ID"))),
+                VariableDefinition("first", NamedType("Int"), Value(10)),
+                VariableDefinition("states", ListType(NonNullType(NamedType("State")))),
+                VariableDefinition("order", NamedType("Order")),
+            ],
+            FakeSchema(),
+        )
+
+    def test_valid(self):
+        self.assertEqual([], self.validator.errors({"id": 42}))
+        self.assertEqual(
+            [],
+            self.validator.errors(
+                {"id": "abc", "first": None, "states": ["OPEN"], "order": None}
+            ),
+        )
+
+    def test_list_coercion(self):
+        self.assertEqual([], self.validator.errors({"id": "a", "states": "OPEN"}))
+
+    def test_missing_required(self):
+        self.assertEqual(
+            ["Missing value for required variable $id"],
+            self.validator.errors({"first": 1}),
+        )
+
+    def test_unknown_and_invalid(self):
+        errors = self.validator.errors({"id": "a", "last": 1, "first": "1"})
+        self.assertEqual(2, len(errors))
+        self.assertIn("Unknown variable $last", errors)
+
+    def test_input_object(self):
+        self.assertEqual(
+            [], self.validator.errors({"id": "a", "order": {"field": "OPEN"}})
+        )
+        self.assertEqual(
+            1, len(self.validator.errors({"id": "a", "order": {"field": "open"}}))
+        )
+
+    def test_validate_raises(self):
+        with self.assertRaises(VariableErrors) as context:
+            self.validator.validate({})
+        self.assertEqual(
+            ["Missing value for required variable $id"], context.exception.errors
+        )
+
+    def test_validate_many(self):
+        failures = self.validator.validate_many(
+            [{"id": "a"}, {"first": 1}, {"id": "b"}, {"id": True}]
+        )
+        self.assertEqual([1, 3], list(failures))
+
+
+if __name__ == "__main__":
+    main()